@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for Personal Coach. Run individual modules with
+`python -m benchmarks.<name>`; `python -m benchmarks.suite` runs the
+end-to-end suite on data from `benchmarks.generator` and writes JSON results.
+"""
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Upload size and transcription latency of raw 44.1 kHz WAV recordings versus
+the 16 kHz encoded uploads (FLAC, Ogg/Opus), with silence trimmed.
+
+Recordings are synthetic speech-like signals (modulated harmonics with
+pauses, plus leading and trailing silence). Transcription runs against the
+local LLM backend with an emulated uplink, so upload size shows up in
+latency the way it does on a real connection.
+
+Usage:
+    python -m benchmarks.bench_audio_encoding [--durations 10 60 300] [--upload-kbps 2000]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+CAPTURE_RATE = 44100
+
+
+def speech_like(seconds, rate, rng):
+    """
+    Voiced bursts of a few harmonics with a wandering pitch, separated by
+    short pauses, framed by a second of room noise on each side.
+    """
+    t = np.arange(int(rate * seconds)) / rate
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = (np.sin(2 * np.pi * 4 * t) > -0.2) & (np.sin(2 * np.pi * 0.25 * t) > -0.7)
+    signal = 0.2 * voice * syllables + rng.normal(0, 0.002, t.size)
+    room = lambda: rng.normal(0, 0.002, rate)
+    return np.concatenate([room(), signal, room()]).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--durations', type=int, nargs='+', default=[10, 60, 300])
+    parser.add_argument('--upload-kbps', type=float, default=2000)
+    args = parser.parse_args()
+
+    os.environ['LLM_BACKEND'] = 'local'
+    os.environ['LOCAL_LLM_LATENCY_MS'] = '0'
+    os.environ['LOCAL_LLM_JITTER_MS'] = '0'
+    os.environ['LOCAL_LLM_UPLOAD_KBPS'] = str(args.upload_kbps)
+    from src.audio.encoder import AudioEncoder, soxr
+    from src.audio.transcriber import Transcriber
+    logging.getLogger().setLevel(logging.WARNING)
+
+    rng = np.random.default_rng(7)
+    variants = [('wav 44.1k', None), ('flac 16k', AudioEncoder('flac')), ('ogg/opus 16k', AudioEncoder('ogg'))]
+    transcribers = {name: Transcriber(encoder=encoder) for name, encoder in variants}
+
+    print(f"resampler: {'soxr' if soxr else 'numpy'}, uplink {args.upload_kbps:.0f} kbit/s")
+    print(f"{'recording':>10} {'upload':>13} {'bytes':>11} {'size':>7} {'encode ms':>10} {'latency ms':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for seconds in args.durations:
+            path = os.path.join(tmp, f"note-{seconds}s.wav")
+            sf.write(path, speech_like(seconds, CAPTURE_RATE, rng), CAPTURE_RATE, subtype='PCM_16')
+            raw_size = os.path.getsize(path)
+            raw_latency = None
+            for name, encoder in variants:
+                encode_ms = 0.0
+                size = raw_size
+                if encoder:
+                    start = time.perf_counter()
+                    size = len(encoder.encode_file(path)[1])
+                    encode_ms = (time.perf_counter() - start) * 1000
+                start = time.perf_counter()
+                transcribers[name].transcribe(path)
+                latency = (time.perf_counter() - start) * 1000
+                raw_latency = raw_latency or latency
+                print(f"{seconds:>9}s {name:>13} {size:>11,} {size / raw_size:>6.1%} {encode_ms:>10.0f} "
+                      f"{latency:>8.0f} ({latency / raw_latency:.0%})")
+
+
+if __name__ == '__main__':
+    main()
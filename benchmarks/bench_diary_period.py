@@ -0,0 +1,100 @@
+"""
+Before/after timings for diary period queries: the original
+date(substr(timestamp, 1, 10)) filter versus the indexed ts_epoch range scan.
+
+Builds a legacy (pre-migration) diary, times the old queries, migrates it
+(backfilling ts_epoch), then times the current DiaryEntry methods.
+
+Usage:
+    python -m benchmarks.bench_diary_period [--entries 100000]
+"""
+import argparse
+import datetime
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from src.data.diary_entry import DiaryEntry, period_start
+from src.data.storage import StorageEngine
+
+LEGACY_PERIOD_SQL = '''
+    SELECT id, timestamp, content
+    FROM diary_entries
+    WHERE date(substr(timestamp, 1, 10)) >= date(?)
+    ORDER BY timestamp DESC
+'''
+LEGACY_EXISTS_SQL = 'SELECT COUNT(*) FROM diary_entries WHERE date(substr(timestamp, 1, 10)) >= date(?)'
+LEGACY_DATES_SQL = 'SELECT DISTINCT date(timestamp) FROM diary_entries ORDER BY date(timestamp) DESC'
+
+PERIOD_PLAN_SQL = 'EXPLAIN QUERY PLAN SELECT id FROM diary_entries WHERE ts_epoch >= ? ORDER BY ts_epoch DESC, id DESC'
+
+PERIODS = ['day', 'week', 'month', 'year']
+
+
+def build_legacy_diary(db_path, count, years=3):
+    now = datetime.datetime.now()
+    span = years * 365 * 24 * 3600
+    rng = random.Random(42)
+    timestamps = sorted(now - datetime.timedelta(seconds=rng.randrange(span)) for _ in range(count))
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('CREATE TABLE diary_entries (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, content TEXT)')
+        conn.executemany('INSERT INTO diary_entries (timestamp, content) VALUES (?, ?)',
+                         ((ts.strftime("%Y-%m-%dT%H:%M:%S.%f"), f"Synthetic diary entry number {i}")
+                          for i, ts in enumerate(timestamps)))
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'user_data.db')
+        build_legacy_diary(db_path, args.entries)
+        engine = StorageEngine(db_path)
+        conn = engine.connection()
+
+        before = {}
+        for period in PERIODS:
+            start = period_start(period).strftime('%Y-%m-%d')
+            before[period] = best_of(lambda: conn.execute(LEGACY_PERIOD_SQL, (start,)).fetchall(), args.repeat)
+            before[f'has_{period}'] = best_of(lambda: conn.execute(LEGACY_EXISTS_SQL, (start,)).fetchone(), args.repeat)
+        before['entry_dates'] = best_of(lambda: conn.execute(LEGACY_DATES_SQL).fetchall(), args.repeat)
+
+        migrate_start = time.perf_counter()
+        engine.ensure_schema()
+        migrate_ms = (time.perf_counter() - migrate_start) * 1000
+
+        diary = DiaryEntry(tmp)
+        after = {}
+        for period in PERIODS:
+            after[period] = best_of(lambda: diary.get_entries_for_period(period), args.repeat)
+            after[f'has_{period}'] = best_of(lambda: diary.has_entries_for_period(period), args.repeat)
+        after['entry_dates'] = best_of(diary.get_entry_dates, args.repeat)
+        plan = conn.execute(PERIOD_PLAN_SQL, (0,)).fetchall()
+        diary.storage.close()
+        engine.close()
+
+    print(f"{args.entries} entries, migration + backfill: {migrate_ms:.0f} ms")
+    print(f"{'query':>14} {'before ms':>10} {'after ms':>10}")
+    for name in before:
+        print(f"{name:>14} {before[name]:10.2f} {after[name]:10.2f}")
+    print("period plan:", '; '.join(row[3] for row in plan))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Full-text diary search on a large diary: trigger-maintained FTS5 index
+versus a LIKE scan, plus the per-entry cost of keeping the index in sync.
+
+Usage:
+    python -m benchmarks.bench_diary_search [--entries 100000]
+"""
+import argparse
+import datetime
+import logging
+import random
+import tempfile
+import time
+
+from src.data.diary_entry import DiaryEntry
+
+WORDS = ("today work family run gym sleep tired happy meeting project deadline prayer church friend "
+         "call mother father walk coffee budget savings book read write garden rain sun headache "
+         "back pain doctor appointment dinner travel plan goal habit morning evening focus stress").split()
+
+QUERIES = ["back pain", "doctor appointment", "prayer", "budget savings deadline", "headache"]
+
+
+def make_vocabulary(rng, size=20000):
+    # Place topic words at mid ranks so their frequencies follow a Zipf curve
+    filler = {''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(3, 9))) for _ in range(size)}
+    vocabulary = list(filler)
+    rng.shuffle(vocabulary)
+    for word in WORDS:
+        vocabulary.insert(rng.randint(50, 2000), word)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    return vocabulary, weights
+
+
+def fill_diary(diary, count):
+    rng = random.Random(7)
+    vocabulary, weights = make_vocabulary(rng)
+    start = datetime.datetime.now() - datetime.timedelta(days=3 * 365)
+    rows = []
+    for i in range(count):
+        ts = start + datetime.timedelta(minutes=15 * i)
+        content = ' '.join(rng.choices(vocabulary, weights, k=40))
+        rows.append((ts.strftime("%Y-%m-%dT%H:%M:%S.%f"), content, int(ts.timestamp())))
+    begin = time.perf_counter()
+    with diary.storage.transaction() as conn:
+        conn.executemany('INSERT INTO diary_entries (timestamp, content, ts_epoch) VALUES (?, ?, ?)', rows)
+    return time.perf_counter() - begin
+
+
+def like_search(diary, query, limit):
+    return diary.storage.execute(
+        'SELECT id FROM diary_entries WHERE content LIKE ? ORDER BY ts_epoch DESC LIMIT ?',
+        (f"%{query}%", limit)).fetchall()
+
+
+def best_ms(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        diary = DiaryEntry(tmp)
+        fill_seconds = fill_diary(diary, args.entries)
+        print(f"{args.entries} entries inserted with FTS triggers in {fill_seconds:.2f}s "
+              f"({fill_seconds / args.entries * 1e6:.0f} us/entry)")
+        print(f"single save_entry (incremental index update): {best_ms(lambda: diary.save_entry('back pain after the gym')):.2f} ms")
+        print(f"{'query':>26} {'fts5 ms':>9} {'LIKE ms':>9}")
+        for query in QUERIES:
+            fts_ms = best_ms(lambda: diary.search(query, args.limit))
+            like_ms = best_ms(lambda: like_search(diary, query, args.limit))
+            print(f"{query:>26} {fts_ms:9.2f} {like_ms:9.2f}")
+        diary.storage.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Growth of the user_profile/user_info fact tables over many chat sessions.
+Each simulated session reports a handful of facts drawn from a fixed set
+of true facts about the user, in varying wordings (the way the model
+restates what it already knows), plus the occasional genuinely new one.
+
+Reports, every --every sessions: rows stored, the time of one
+update_info call, the time of the get_info read the UI renders, and the
+size of the prompt section built from the facts.
+
+Usage:
+    python -m benchmarks.bench_fact_store [--sessions 2000] [--facts 5] [--every 250]
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+
+from src.data.user_info import UserInfo
+from src.utils.config import get_config
+
+SUBJECTS = ("hiking", "the piano", "chess", "gardening", "cycling", "pottery", "yoga", "running", "baking", "reading")
+TEMPLATES = ("Enjoys {}", "The user enjoys {}", "enjoys {}.", "User enjoys {}", "Really enjoys {}")
+
+
+def session_facts(rng, count, session):
+    facts = [rng.choice(TEMPLATES).format(rng.choice(SUBJECTS)) for _ in range(count)]
+    # One in ten sessions learns something genuinely new
+    if session % 10 == 0:
+        name = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(8)).capitalize()
+        facts.append(f"Has a friend named {name}")
+    return facts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--facts', type=int, default=5, help="facts reported per session")
+    parser.add_argument('--every', type=int, default=250, help="report interval in sessions")
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    config = get_config()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as folder:
+        info = UserInfo(folder)
+        print(f"{'sessions':>8} {'rows':>6} {'upsert ms':>10} {'read ms':>8} {'prompt chars':>13}")
+        for session in range(1, args.sessions + 1):
+            start = time.perf_counter()
+            info.update_info(session_facts(rng, args.facts, session))
+            upsert_ms = (time.perf_counter() - start) * 1000
+            if session % args.every == 0:
+                start = time.perf_counter()
+                info.get_info(config['fact_display_limit'])
+                read_ms = (time.perf_counter() - start) * 1000
+                prompt = "\n".join(f"- {fact}" for fact in info.top_facts(config['fact_prompt_limit']))
+                print(f"{session:>8} {info.count():>6} {upsert_ms:>10.2f} {read_ms:>8.2f} {len(prompt):>13}")
+        restated = sum(1 for fact in info.get_info() if not fact['item'].startswith("Has a friend"))
+        print(f"{args.sessions // 10} new facts, {restated} rows for the {len(SUBJECTS)} restated ones; "
+              f"{args.sessions * args.facts + args.sessions // 10} rows without dedup")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Embedding retrieval over a large diary: cost of building the vector index
+from scratch, of keeping it current on save_entry, of reopening it, and of
+a top-k cosine search over every entry.
+
+Usage:
+    python -m benchmarks.bench_retrieval [--entries 100000] [--top-k 5]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+
+from benchmarks.bench_diary_search import QUERIES, best_ms, fill_diary
+from src.data.diary_entry import DiaryEntry
+from src.data.tenant import Tenant
+from src.data.vector_index import VECTORS_FILE, VectorIndex
+from src.utils.tracing import percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--top-k', type=int, default=5)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tenant = Tenant(tmp)
+        diary = DiaryEntry(tenant)
+        fill_diary(diary, args.entries)
+
+        start = time.perf_counter()
+        diary.vectors.sync()
+        seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(os.path.join(tmp, VECTORS_FILE)) / 1e6
+        print(f"indexed {args.entries} entries in {seconds:.2f}s ({args.entries / seconds:.0f} entries/s), "
+              f"{diary.vectors.embedder.key}, {size_mb:.0f} MB mapped")
+
+        diary.index_vectors = False
+        plain_ms = best_ms(lambda: diary.save_entry('back pain after the gym'), repeat=50)
+        diary.index_vectors = True
+        indexed_ms = best_ms(lambda: diary.save_entry('back pain after the gym'), repeat=50)
+        print(f"save_entry {plain_ms:.2f} ms without the index, {indexed_ms:.2f} ms with it")
+
+        embedder = diary.vectors.embedder
+        tenant.close()
+        start = time.perf_counter()
+        reopened = VectorIndex(tmp, tenant.db_path, embedder)
+        reopened.search(QUERIES[0], args.top_k)
+        print(f"reopen + first search: {(time.perf_counter() - start) * 1000:.1f} ms")
+        reopened.close()
+
+        print(f"{'query':>26} {'best ms':>8} {'p95 ms':>8}  top score")
+        for query in QUERIES:
+            timings = []
+            for _ in range(20):
+                start = time.perf_counter()
+                related = diary.find_related(query, args.top_k)
+                timings.append(time.perf_counter() - start)
+            print(f"{query:>26} {min(timings) * 1000:8.2f} {percentile(timings, 95) * 1000:8.2f}  "
+                  f"{related[0]['score']:.3f}")
+        tenant.close()
+
+
+if __name__ == '__main__':
+    main()
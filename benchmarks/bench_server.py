@@ -0,0 +1,146 @@
+"""
+Load test of the service mode (`main.py --serve`). Starts the service on a
+synthetic user_data.db with the offline LLM backend, then runs closed-loop
+clients (each with its own chat session and keep-alive connection) at
+rising concurrency and reports requests/sec and latency percentiles.
+With --users N the clients are spread over N tenants.
+
+Usage:
+    python -m benchmarks.bench_server [--concurrency 1 2 4 8 16 32] [--requests 64]
+                                      [--latency-ms 300] [--endpoint chat|diary] [--users 1]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks.generator import generate
+from src.utils.config import get_config
+from src.utils.tracing import percentile
+
+USERS = ['default'] + [f'user{index}' for index in range(1, 1000)]
+
+
+class Client:
+    """
+    Bare keep-alive HTTP/1.1 client, so the load generator itself adds as
+    little overhead as possible.
+    """
+
+    def __init__(self, host, port, user='default'):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nX-User-Id: {self.user}\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+        await self.writer.drain()
+        head = (await self.reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(head[0].split(' ')[1])
+        headers = dict(line.lower().split(': ', 1) for line in head[1:] if line)
+        data = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        return status, json.loads(data) if data else None
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+async def run_level(host, port, concurrency, total, endpoint, users):
+    latencies, errors = [], 0
+    remaining = [total]
+
+    async def worker(index):
+        nonlocal errors
+        client = Client(host, port, USERS[index % users])
+        _, session = await client.request('POST', '/sessions')
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            if endpoint == 'chat':
+                status, body = await client.request('POST', '/chat', {
+                    'session_id': session['session_id'], 'message': f"Client {index}: how am I doing today?"})
+                failed = status != 200 or 'error' in body
+            else:
+                status, body = await client.request('GET', '/diary?limit=50')
+                failed = status != 200
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+        await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+    }
+
+
+async def run(config, args):
+    from src.server import start_service
+    service, server = await start_service(config, '127.0.0.1', 0)
+    results = []
+    try:
+        # One turn per user first, so context loading is not part of the measurement
+        await run_level(server.host, server.port, args.users, args.users, 'chat', args.users)
+        for concurrency in args.concurrency:
+            total = max(args.requests, concurrency)
+            result = await run_level(server.host, server.port, concurrency, total, args.endpoint, args.users)
+            results.append(result)
+            print(f"concurrency {result['concurrency']:>3}  {result['rps']:8.2f} req/s  "
+                  f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+                  f"errors {result['errors']}")
+    finally:
+        await server.close()
+        service.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--requests', type=int, default=64, help="requests per concurrency level")
+    parser.add_argument('--endpoint', choices=['chat', 'diary'], default='chat')
+    parser.add_argument('--users', type=int, default=1, help="tenants the clients are spread over")
+    parser.add_argument('--entries', type=int, default=2000, help="diary entries per user")
+    parser.add_argument('--latency-ms', type=float, default=300, help="latency of the stand-in LLM")
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    os.environ['LLM_BACKEND'] = 'local'
+    os.environ['LOCAL_LLM_LATENCY_MS'] = str(args.latency_ms)
+    os.environ['LOCAL_LLM_JITTER_MS'] = '0'
+    os.environ['LOCAL_LLM_TOKENS_PER_SECOND'] = '0'
+    os.environ['LLM_CACHE_ENABLED'] = 'False'
+    config = get_config()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as folder:
+        for user in USERS[:args.users]:
+            os.makedirs(os.path.join(folder, user))
+            generate(os.path.join(folder, user), args.entries)
+        config = dict(config, user_data_folder=folder)
+        results = asyncio.run(run(config, args))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'endpoint': args.endpoint, 'users': args.users, 'llm_latency_ms': args.latency_ms,
+                       'levels': results}, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark: connection-per-call SQLite access (the previous data layer)
+versus the pooled WAL StorageEngine.
+
+Usage:
+    python -m benchmarks.bench_storage [--ops 2000]
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import tempfile
+import time
+
+from src.data.storage import StorageEngine
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS diary_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT,
+        content TEXT
+    )
+'''
+
+
+def _timestamp():
+    return datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def run_per_call(db_path, ops):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(SCHEMA)
+    start = time.perf_counter()
+    for i in range(ops):
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('INSERT INTO diary_entries (timestamp, content) VALUES (?, ?)', (_timestamp(), f"entry {i}"))
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('SELECT COUNT(*) FROM diary_entries').fetchone()
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('SELECT id, timestamp, content FROM diary_entries ORDER BY id DESC LIMIT 20').fetchall()
+    return time.perf_counter() - start
+
+
+def run_pooled(db_path, ops):
+    engine = StorageEngine(db_path)
+    with engine.transaction() as conn:
+        conn.execute(SCHEMA)
+    start = time.perf_counter()
+    for i in range(ops):
+        with engine.transaction() as conn:
+            conn.execute('INSERT INTO diary_entries (timestamp, content) VALUES (?, ?)', (_timestamp(), f"entry {i}"))
+        with engine.transaction() as conn:
+            conn.execute('SELECT COUNT(*) FROM diary_entries').fetchone()
+        with engine.transaction() as conn:
+            conn.execute('SELECT id, timestamp, content FROM diary_entries ORDER BY id DESC LIMIT 20').fetchall()
+    elapsed = time.perf_counter() - start
+    engine.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ops', type=int, default=2000, help="iterations of insert + count + page read")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            'per-call connect': run_per_call(os.path.join(tmp, 'per_call.db'), args.ops),
+            'pooled WAL engine': run_pooled(os.path.join(tmp, 'pooled.db'), args.ops),
+        }
+
+    total_ops = args.ops * 3
+    for name, elapsed in results.items():
+        print(f"{name:>18}: {total_ops / elapsed:10.0f} ops/sec ({elapsed:.3f}s for {total_ops} ops)")
+    print(f"{'speedup':>18}: {results['per-call connect'] / results['pooled WAL engine']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Throughput and accuracy of near-duplicate task detection (MinHash + LSH)
+on 100k suggested tasks: 20k distinct tasks, each suggested five times in
+different wordings, arriving in small batches the way chat turns add them.
+
+Reports tasks/sec over the run in 10k-task segments (insert cost should
+stay flat as the index grows), how many paraphrases were merged, and how
+many distinct tasks were wrongly merged into another. The same load with
+dedup off is timed for comparison.
+
+Usage:
+    python -m benchmarks.bench_task_dedup [--tasks 100000] [--variants 5] [--batch 5]
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+
+from src.data.task_manager import TaskManager
+
+SYLLABLES = ("ba", "ko", "ri", "tan", "mel", "so", "vu", "den", "la", "pi", "gor", "ne", "shi", "tum", "ra",
+             "lo", "fen", "di", "mar", "ku")
+FILLERS = ("today", "this week", "tomorrow morning", "again", "if you can")
+SEGMENT = 10000
+
+
+def vocabulary(rng, size=3000):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))))
+    return sorted(words)
+
+
+def paraphrase(task, rng):
+    words = task.split()
+    change = rng.randrange(4)
+    if change == 0:
+        words.append(rng.choice(FILLERS))
+    elif change == 1:
+        words[0] = words[0].capitalize()
+        words[-1] += rng.choice(".!")
+    elif change == 2 and len(words) > 5:
+        words.pop(rng.randrange(1, len(words)))
+    else:
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    return " ".join(words)
+
+
+def workload(count, variants, rng):
+    words = vocabulary(rng)
+    bases = [" ".join(rng.choice(words) for _ in range(rng.randint(5, 8))) for _ in range(count // variants)]
+    tasks = [(base_id, base if variant == 0 else paraphrase(base, rng))
+             for base_id, base in enumerate(bases) for variant in range(variants)]
+    rng.shuffle(tasks)
+    return bases, tasks
+
+
+def run(folder, tasks, batch, dedup):
+    manager = TaskManager(folder, dedup=dedup)
+    segments, counts = [], {'added': 0, 'merged': 0, 'flagged': 0}
+    start = segment_start = time.perf_counter()
+    for offset in range(0, len(tasks), batch):
+        result = manager.add_tasks([text for _, text in tasks[offset:offset + batch]])
+        for key in counts:
+            counts[key] += result[key]
+        done = offset + batch
+        if done % SEGMENT == 0 or done >= len(tasks):
+            now = time.perf_counter()
+            segments.append(round(SEGMENT / (now - segment_start)))
+            segment_start = now
+    return manager, time.perf_counter() - start, segments, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--variants', type=int, default=5, help="wordings of each distinct task")
+    parser.add_argument('--batch', type=int, default=5, help="tasks per add_tasks call")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    bases, tasks = workload(args.tasks, args.variants, random.Random(args.seed))
+    base_of = {}
+    for base_id, text in tasks:
+        base_of.setdefault(text, base_id)
+
+    with tempfile.TemporaryDirectory() as plain_folder:
+        _, plain_seconds, _, _ = run(plain_folder, tasks, args.batch, 'off')
+    with tempfile.TemporaryDirectory() as folder:
+        manager, seconds, segments, counts = run(folder, tasks, args.batch, 'merge')
+        rows = manager.get_tasks()
+
+    surviving = {base_of[row['task']] for row in rows}
+    wrongly_merged = len(bases) - len(surviving)
+    duplicates = len(tasks) - len(bases)
+    print(f"{len(tasks)} tasks ({len(bases)} distinct x {args.variants} wordings), batches of {args.batch}")
+    print(f"dedup off   {plain_seconds:7.2f} s  {len(tasks) / plain_seconds:9.0f} tasks/s")
+    print(f"dedup merge {seconds:7.2f} s  {len(tasks) / seconds:9.0f} tasks/s")
+    print(f"tasks/s per {SEGMENT} inserted: {segments}")
+    print(f"rows kept {len(rows)}, merged {counts['merged']} of {duplicates} paraphrases "
+          f"({counts['merged'] / duplicates:.1%}), distinct tasks wrongly merged {wrongly_merged}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+UI stall time of re-rendering a Tasks/Profile/Info tab against its row
+count: the old full rebuild (delete everything, one insert per row) versus
+the diff-based RowView, for the updates a chat turn typically makes: one
+row added, one row changed (a task completed or mentioned again), one row
+moved to the top (a fact seen again). Timings include update_idletasks,
+i.e. how long the Tk main loop is blocked.
+
+Needs a display; without one only the diff planning cost is reported.
+
+Usage:
+    python -m benchmarks.bench_ui_render [--rows 100 1000 10000 50000] [--repeat 3]
+"""
+import argparse
+import time
+
+from src.ui.row_view import RowView, plan_render
+
+SCENARIOS = ('add', 'change', 'move')
+
+
+def task_rows(count):
+    return [(index, f"[ ] {index}: Suggested task number {index}, something to do this week\n")
+            for index in range(count)]
+
+
+def scenario(rows, name):
+    if name == 'add':
+        return rows + [(len(rows), f"[ ] {len(rows)}: A task from the latest turn\n")]
+    middle = len(rows) // 2
+    if name == 'change':
+        key, text = rows[middle]
+        return rows[:middle] + [(key, text.replace("[ ]", "[X]"))] + rows[middle + 1:]
+    return [rows[middle]] + rows[:middle] + rows[middle + 1:]
+
+
+def best_ms(fn, setup, repeat):
+    timings = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def bench_widget(root, counts, repeat):
+    import tkinter as tk
+    text = tk.Text(root)
+    text.pack()
+
+    def legacy(rows):
+        text.delete(1.0, tk.END)
+        for _, line in rows:
+            text.insert(tk.END, line)
+        root.update_idletasks()
+
+    print(f"{'rows':>7} {'full rebuild ms':>16} " + " ".join(f"{'diff ' + name + ' ms':>16}" for name in SCENARIOS))
+    for count in counts:
+        rows = task_rows(count)
+        full = best_ms(lambda: legacy(rows), lambda: None, repeat)
+        diffed = []
+        for name in SCENARIOS:
+            view = RowView(text, f'bench{count}{name}')
+            updated = scenario(rows, name)
+
+            def reset():
+                text.delete(1.0, tk.END)
+                view.keys, view.texts = [], {}
+                view.render(rows)
+                root.update_idletasks()
+
+            def render():
+                view.render(updated)
+                root.update_idletasks()
+            diffed.append(best_ms(render, reset, repeat))
+        print(f"{count:>7} {full:>16.2f} " + " ".join(f"{ms:>16.2f}" for ms in diffed))
+    text.destroy()
+
+
+def bench_planning(counts, repeat):
+    print(f"{'rows':>7} " + " ".join(f"{'plan ' + name + ' ms':>16}" for name in SCENARIOS))
+    for count in counts:
+        rows = task_rows(count)
+        keys, texts = [key for key, _ in rows], dict(rows)
+        timings = [best_ms(lambda: plan_render(keys, texts, scenario(rows, name)), lambda: None, repeat)
+                   for name in SCENARIOS]
+        print(f"{count:>7} " + " ".join(f"{ms:>16.2f}" for ms in timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        print(f"Widget timings skipped (no display: {e})")
+        root = None
+    if root is not None:
+        bench_widget(root, args.rows, args.repeat)
+        root.destroy()
+    bench_planning(args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Synthetic user data for benchmarks: fills a user_data.db with diary entries
+spread over several years plus tasks, profile and info rows. Output is
+deterministic for a given seed.
+
+Usage:
+    python -m benchmarks.generator FOLDER [--entries 100000] [--years 3]
+"""
+import argparse
+import datetime
+import logging
+import os
+import random
+import time
+
+from src.data.storage import get_storage
+
+WORDS = ("today", "work", "meeting", "family", "run", "tired", "happy", "project", "deadline", "friend",
+         "walk", "read", "sleep", "coffee", "plan", "goal", "stress", "calm", "call", "gym", "budget",
+         "prayer", "gratitude", "idea", "learn", "write", "cook", "travel", "weekend", "focus")
+BATCH_SIZE = 10000
+
+
+def sentence_pool(rng, size=2000):
+    pool = []
+    for _ in range(size):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 18))]
+        pool.append(" ".join(words).capitalize() + ".")
+    return pool
+
+
+def diary_rows(count, years, rng, now=None):
+    """
+    (timestamp, content, ts_epoch) rows, oldest first. The newest few land
+    today so the day-level context is never empty.
+    """
+    now = now or datetime.datetime.now()
+    span = years * 365 * 24 * 3600
+    offsets = sorted((rng.randrange(span) for _ in range(count)), reverse=True)
+    midnight_offset = int((now - now.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds())
+    for i in range(1, min(3, count) + 1):
+        offsets[-i] = rng.randrange(max(midnight_offset, 1))
+    offsets.sort(reverse=True)
+    pool = sentence_pool(rng)
+    for offset in offsets:
+        moment = now - datetime.timedelta(seconds=offset, microseconds=rng.randrange(1000000))
+        content = " ".join(rng.choice(pool) for _ in range(rng.randint(2, 8)))
+        yield moment.strftime("%Y-%m-%dT%H:%M:%S.%f"), content, int(moment.timestamp())
+
+
+def generate(user_data_folder, entries=10000, tasks=None, profile=None, info=None, years=3, seed=42):
+    """
+    Populate `user_data_folder`/user_data.db. Tasks, profile and info rows
+    default to sizes proportional to the diary. Returns the row counts written.
+    """
+    rng = random.Random(seed)
+    tasks = entries // 20 if tasks is None else tasks
+    profile = entries // 100 if profile is None else profile
+    info = entries // 100 if info is None else info
+    storage = get_storage(os.path.join(user_data_folder, 'user_data.db'))
+    storage.ensure_schema()
+    pool = sentence_pool(rng, 200)
+
+    rows = diary_rows(entries, years, rng)
+    while True:
+        batch = [row for _, row in zip(range(BATCH_SIZE), rows)]
+        if not batch:
+            break
+        with storage.transaction() as conn:
+            conn.executemany('INSERT INTO diary_entries (timestamp, content, ts_epoch) VALUES (?, ?, ?)', batch)
+
+    timestamp = datetime.datetime.now().isoformat()
+    with storage.transaction() as conn:
+        conn.executemany('INSERT INTO tasks (task, completed) VALUES (?, ?)',
+                         [(rng.choice(pool), int(rng.random() < 0.4)) for _ in range(tasks)])
+        conn.executemany('INSERT INTO user_profile (item, timestamp) VALUES (?, ?)',
+                         [(rng.choice(pool), timestamp) for _ in range(profile)])
+        conn.executemany('INSERT INTO user_info (item, timestamp) VALUES (?, ?)',
+                         [(rng.choice(pool), timestamp) for _ in range(info)])
+    return {'entries': entries, 'tasks': tasks, 'profile': profile, 'info': info, 'years': years}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder')
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--tasks', type=int, default=None)
+    parser.add_argument('--profile', type=int, default=None)
+    parser.add_argument('--info', type=int, default=None)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    os.makedirs(args.folder, exist_ok=True)
+    start = time.perf_counter()
+    counts = generate(args.folder, args.entries, args.tasks, args.profile, args.info, args.years, args.seed)
+    print(f"Generated {counts} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+End-to-end benchmark suite. Generates a synthetic user_data.db, then times
+diary period queries, tab rendering, user-context loading and chat turns
+against the offline LLM backend. Results are written as JSON; pass a
+previous run as --baseline to flag regressions.
+
+Usage:
+    python -m benchmarks.suite [--entries 10000] [--output results.json]
+                               [--baseline previous.json] [--tolerance 0.2]
+
+Tab rendering needs a display and the audio stack; it is reported as
+skipped when either is missing.
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.generator import generate
+from src.ai import backend
+from src.ai.chat import ChatBot
+from src.utils.config import get_config
+
+PERIODS = ['day', 'week', 'month', 'year']
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {'min_ms': round(min(timings), 3), 'median_ms': round(statistics.median(timings), 3)}
+
+
+def bench_queries(folder, repeat):
+    from src.data.diary_entry import DiaryEntry
+    diary = DiaryEntry(folder)
+    results = {}
+    for period in PERIODS:
+        results[f'get_entries_for_period.{period}'] = timed(lambda: diary.get_entries_for_period(period), repeat)
+    return results
+
+
+def bench_ui(config, repeat):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        return {'skipped': f"no display: {e}"}
+    try:
+        from src.ui.main_window import MainWindow
+        window = MainWindow(root, config)
+    except Exception as e:
+        root.destroy()
+        return {'skipped': f"main window unavailable: {e}"}
+
+    def rendered(fn):
+        def run():
+            fn()
+            root.update_idletasks()
+        return run
+
+    results = {
+        'update_diary.reload': timed(rendered(window.diary_view.reload), repeat),
+        'update_diary.refresh': timed(rendered(window.update_diary), repeat),
+        'update_tasks': timed(rendered(window.update_tasks), repeat),
+        'update_user_profile': timed(rendered(window.update_user_profile), repeat),
+        'update_user_info': timed(rendered(window.update_user_info), repeat),
+    }
+    root.destroy()
+    return results
+
+
+def bench_chat(folder, turns, repeat):
+    start = time.perf_counter()
+    bot = ChatBot(folder)
+    bot.wait_for_context()
+    results = {'load_user_context.cold': {'min_ms': round((time.perf_counter() - start) * 1000, 3)}}
+    results['load_user_context.warm'] = timed(bot.load_user_context, repeat)
+
+    for mode, on_token in (('plain', None), ('streamed', lambda text: None)):
+        timings = []
+        for turn in range(turns):
+            start = time.perf_counter()
+            response = bot.get_response(f"Benchmark turn {turn}: how am I doing?", on_token=on_token)
+            timings.append((time.perf_counter() - start) * 1000)
+            if 'error' in response:
+                raise RuntimeError(f"get_response failed: {response['error']}")
+        results[f'get_response.{mode}'] = {'min_ms': round(min(timings), 3),
+                                           'median_ms': round(statistics.median(timings), 3)}
+    results['llm_requests'] = backend.local_server(get_config()).stats['requests']
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Metrics whose min_ms grew by more than `tolerance` (a fraction) over the baseline.
+    """
+    regressions = []
+    for section, metrics in results.items():
+        for name, current in metrics.items():
+            previous = baseline.get(section, {}).get(name)
+            if not isinstance(current, dict) or not isinstance(previous, dict):
+                continue
+            if previous.get('min_ms') and current['min_ms'] > previous['min_ms'] * (1 + tolerance):
+                regressions.append((f"{section}.{name}", previous['min_ms'], current['min_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=10000)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--turns', type=int, default=5)
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    # The offline backend stands in for the API; LLM response caching would
+    # hide the work being measured
+    os.environ['LLM_BACKEND'] = 'local'
+    os.environ.setdefault('LOCAL_LLM_LATENCY_MS', '0')
+    os.environ.setdefault('LOCAL_LLM_JITTER_MS', '0')
+    os.environ.setdefault('LOCAL_LLM_TOKENS_PER_SECOND', '0')
+    os.environ['LLM_CACHE_ENABLED'] = 'False'
+    config = get_config()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        dataset = generate(folder, args.entries, years=args.years)
+        dataset['generate_s'] = round(time.perf_counter() - start, 2)
+        config = dict(config, user_data_folder=folder, recordings_folder=os.path.join(folder, 'recordings'))
+        os.makedirs(config['recordings_folder'], exist_ok=True)
+
+        results = {
+            'queries': bench_queries(folder, args.repeat),
+            'ui': bench_ui(config, args.repeat),
+            'chat': bench_chat(folder, args.turns, args.repeat),
+        }
+
+    report = {'environment': environment(), 'dataset': dataset, 'results': results}
+    for section, metrics in results.items():
+        for name, value in metrics.items():
+            shown = f"{value['min_ms']:10.2f} ms" if isinstance(value, dict) else value
+            print(f"{section:>8}  {name:<32} {shown}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
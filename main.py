@@ -1,12 +1,43 @@
-import tkinter as tk
-from src.ui.main_window import MainWindow
-from src.utils.config import get_config
+import argparse
 
 def main():
-    config = get_config()
-    root = tk.Tk()
-    app = MainWindow(root, config)
+    parser = argparse.ArgumentParser(description="Personal coach")
+    parser.add_argument('--serve', action='store_true', help="run headless as an HTTP/JSON service instead of the desktop app")
+    parser.add_argument('--host', default=None, help="service bind address (default: SERVER_HOST or 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=None, help="service port (default: SERVER_PORT or 8080)")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print an import and init time breakdown once the window is up, then exit")
+    args = parser.parse_args()
+
+    # Imported after parsing so --profile-startup sees (nearly) every import
+    from src.utils.startup import StartupProfiler
+    profiler = StartupProfiler(imports=args.profile_startup)
+    with profiler.phase('config'):
+        from src.utils.config import get_config
+        from src.utils import tracing
+        config = get_config()
+        tracing.configure(config)
+        if args.profile_startup:
+            tracing.tracer.enabled = True
+    if args.serve:
+        from src.server import serve
+        serve(config, args.host, args.port)
+        return
+
+    with profiler.phase('import ui'):
+        import tkinter as tk
+        from src.ui.main_window import MainWindow
+    with profiler.phase('create root window'):
+        root = tk.Tk()
+    with profiler.phase('init MainWindow'):
+        app = MainWindow(root, config)
+    with profiler.phase('first paint'):
+        root.update()
+    if args.profile_startup:
+        print(profiler.report(tracing.tracer.spans()))
+        root.destroy()
+        return
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,2 +1,10 @@
-from .chat import ChatBot
-from .context_extractor import ContextExtractor
\ No newline at end of file
+from ..utils.lazy import lazy_exports
+
+__getattr__ = lazy_exports(__name__, {
+    'ChatBot': '.chat',
+    'ContextExtractor': '.context_extractor',
+    'ContextRollup': '.context_rollup',
+    'IncrementalSummarizer': '.incremental_summarizer',
+    'CachedClient': '.cached_client',
+})
+__all__ = ['ChatBot', 'ContextExtractor', 'ContextRollup', 'IncrementalSummarizer', 'CachedClient']
@@ -0,0 +1,97 @@
+import logging
+import threading
+
+BACKENDS = ('openai', 'local')
+
+_local_server = None
+_local_server_lock = threading.Lock()
+
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+
+def create_client(config):
+    """
+    OpenAI-compatible client for the backend selected by config['llm_backend'].
+
+    'openai' talks to the OpenAI API (or llm_base_url, if set). 'local' talks
+    to the offline stand-in server: the one at llm_base_url when given,
+    otherwise one started in-process on first use.
+    """
+    # Imported here: the SDK takes a few hundred ms to import, which the
+    # window should not wait for
+    from openai import OpenAI
+    backend = config.get('llm_backend', 'openai')
+    if backend == 'openai':
+        return OpenAI(api_key=config['openai_api_key'], base_url=config.get('llm_base_url') or None)
+    if backend == 'local':
+        base_url = config.get('llm_base_url') or local_server(config).url
+        return OpenAI(api_key=config.get('openai_api_key') or 'local', base_url=base_url,
+                      max_retries=config.get('local_llm_max_retries', 0))
+    raise ValueError(f"Unknown LLM backend '{backend}'. Expected one of: {', '.join(BACKENDS)}")
+
+
+def create_async_client(config):
+    """
+    AsyncOpenAI counterpart of create_client(), for the asyncio service mode.
+    """
+    from openai import AsyncOpenAI
+    backend = config.get('llm_backend', 'openai')
+    if backend == 'openai':
+        return AsyncOpenAI(api_key=config['openai_api_key'], base_url=config.get('llm_base_url') or None)
+    if backend == 'local':
+        base_url = config.get('llm_base_url') or local_server(config).url
+        return AsyncOpenAI(api_key=config.get('openai_api_key') or 'local', base_url=base_url,
+                           max_retries=config.get('local_llm_max_retries', 0))
+    raise ValueError(f"Unknown LLM backend '{backend}'. Expected one of: {', '.join(BACKENDS)}")
+
+
+class LazyClient:
+    """
+    Stands in for a create_client() client and builds it on first use, so
+    the openai import happens on whichever thread first calls the API
+    (usually the background context loader) rather than during startup.
+    """
+
+    def __init__(self, config):
+        self._config = dict(config)
+        self._client = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = create_client(self._config)
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+
+def shared_client(config):
+    """
+    The process-wide client for the backend selected in `config`, shared by
+    the chat, context extraction and transcription so they reuse one HTTP
+    connection pool. Created lazily; see LazyClient.
+    """
+    key = (config.get('llm_backend', 'openai'), config.get('openai_api_key'), config.get('llm_base_url'))
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = LazyClient(config)
+            _shared_clients[key] = client
+        return client
+
+
+def local_server(config):
+    """
+    The process-wide in-process stand-in server, started on first call.
+    """
+    global _local_server
+    with _local_server_lock:
+        if _local_server is None:
+            from .local_server import server_from_config
+            _local_server = server_from_config(config).start()
+            logging.info(f"Using the local LLM backend at {_local_server.url}")
+        return _local_server
@@ -0,0 +1,82 @@
+import json
+import hashlib
+import logging
+
+# Request parameters that never change the completion itself
+UNCACHED_PARAMS = ('stream', 'timeout', 'extra_headers')
+
+
+class CachedClient:
+    """
+    Drop-in wrapper around an OpenAI client that serves repeated chat
+    completions from an LLMCache.
+
+    Requests are keyed by a hash of every parameter that shapes the answer
+    (model, messages, functions, ...). Streaming requests and calls made with
+    cache_bypass=True always go to the API. Everything other than
+    chat.completions (audio, embeddings, ...) is passed through untouched.
+    """
+
+    def __init__(self, client, cache):
+        self._client = client
+        self.cache = cache
+        self.chat = _CachedChat(self)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class _CachedChat:
+    def __init__(self, owner):
+        self._owner = owner
+        self.completions = _CachedCompletions(owner)
+
+    def __getattr__(self, name):
+        return getattr(self._owner._client.chat, name)
+
+
+class _CachedCompletions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def __getattr__(self, name):
+        return getattr(self._owner._client.chat.completions, name)
+
+    def create(self, cache_bypass=False, **kwargs):
+        client, cache = self._owner._client, self._owner.cache
+        if cache_bypass or kwargs.get('stream'):
+            cache.record_bypass()
+            return client.chat.completions.create(**kwargs)
+
+        key = request_key(kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            from openai.types.chat import ChatCompletion
+            logging.info(f"LLM cache hit for {kwargs.get('model')}. {cache.report()}")
+            return ChatCompletion.model_validate_json(cached)
+
+        response = client.chat.completions.create(**kwargs)
+        try:
+            cache.put(key, kwargs.get('model'), response.model_dump_json())
+        except Exception as e:
+            logging.error(f"Error caching LLM response: {e}")
+        return response
+
+
+def request_key(params):
+    relevant = {name: value for name, value in params.items() if name not in UNCACHED_PARAMS}
+    payload = json.dumps(relevant, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def cached_client(client, tenant, config):
+    """
+    Wrap `client` with the persistent response cache unless it is disabled in config.
+    """
+    if not config.get('llm_cache_enabled', True):
+        return client
+    from ..data.llm_cache import LLMCache
+    cache = LLMCache(tenant,
+                     ttl_seconds=config.get('llm_cache_ttl_hours', 720) * 3600,
+                     max_bytes=int(config.get('llm_cache_max_mb', 50) * 1024 * 1024))
+    return CachedClient(client, cache)
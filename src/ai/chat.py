@@ -1,45 +1,160 @@
 import json
-from openai import OpenAI
 from ..utils.config import get_config
+from ..utils.tracing import span
+from .backend import shared_client
+from .cached_client import CachedClient, cached_client
 from .context_extractor import ContextExtractor
+from .context_rollup import ContextRollup
+from .incremental_summarizer import IncrementalSummarizer
+from .prompt_builder import PromptBuilder, TokenCounter
+from .stream_parser import JsonStringFieldStreamer
 from ..data.diary_entry import DiaryEntry
 from ..data.user_profile import UserProfile
+from ..data.user_info import UserInfo
+from ..data.summary_cache import SummaryCache
+from ..data.tenant import as_tenant
+from ..utils.turn_executor import TurnCancelled
 import logging
-import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.INFO)
 
+COACHING_FUNCTION = {
+    "name": "provide_coaching_response",
+    "description": "Act as a comprehensive AI personal coach to empower the user's holistic growth and well-being. Provide insightful, empathetic, and actionable guidance across various life domains including personal development, professional growth, emotional well-being, physical health, spiritual growth, financial management, and interpersonal relationships. Analyze the user's input, current profile, and historical data to offer tailored advice, set meaningful goals, suggest practical tasks, and track progress. Your role is to inspire, motivate, and support the user in realizing their full potential and achieving a balanced, fulfilling life.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "output": {
+                "type": "string",
+                "description": "Main response to the user, including personalized advice, encouragement, and reflections based on their input and overall context."
+            },
+            "user_profile": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "New insights about the user's personality, behaviors, strengths, challenges, and growth areas, derived from the current conversation."
+            },
+            "tasks": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Actionable and meaningful tasks or goals for the user, designed to promote growth and progress in relevant areas of their life."
+            },
+            "new_user_info": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Array of strings containing new factual information about the user gathered from the current conversation, excluding information already present in the context."
+            }
+        },
+        "required": ["output", "user_profile", "tasks", "new_user_info"]
+    }
+}
+
+COACHING_INSTRUCTION = "Please focus primarily on responding to my latest entry, while considering the context of previous entries and user information."
+
+# Older turns are folded into the rolling summary in batches of this many,
+# so the summarization call runs once every few turns rather than every turn
+HISTORY_FOLD_BATCH = 4
+
+APOLOGY_OUTPUT = "I apologize, but I've encountered an unexpected issue. Let's try that again."
+
+
+class Conversation:
+    """
+    Turn history of one chat session: recent turns verbatim, older ones
+    folded into a rolling summary.
+    """
+
+    def __init__(self):
+        self.history = []
+        self.summary = None
+
+
+def error_response(error):
+    return {
+        "output": APOLOGY_OUTPUT,
+        "user_profile": [],
+        "tasks": [],
+        "new_user_info": [],
+        "error": str(error)
+    }
+
+
 class ChatBot:
-    def __init__(self, user_data_folder):
+    def __init__(self, tenant):
         config = get_config()
-        self.client = OpenAI(api_key=config['openai_api_key'])
+        self.tenant = as_tenant(tenant)
+        self.client = cached_client(shared_client(config), self.tenant, config)
+        # Coaching turns must stay fresh unless caching them is opted into
+        bypass = isinstance(self.client, CachedClient) and not config.get('llm_cache_chat', False)
+        self._chat_cache_options = {'cache_bypass': True} if bypass else {}
         self.model = config['openai_gpt_model']
-        self.conversation_history = []
-        self.context_extractor = ContextExtractor()
-        self.diary_entry = DiaryEntry(user_data_folder)
-        self.user_profile = UserProfile(user_data_folder)
-        self.user_context = self.load_user_context()
+        self.conversation = Conversation()
+        self.history_turns = config.get('history_turns', 8)
+        self.prompt_builder = PromptBuilder(TokenCounter(self.model), config.get('prompt_token_budget', 12000))
+        self.context_extractor = ContextExtractor(self.tenant, client=self.client)
+        self.diary_entry = DiaryEntry(self.tenant)
+        self.user_profile = UserProfile(self.tenant)
+        self.user_info = UserInfo(self.tenant)
+        self.fact_prompt_limit = config.get('fact_prompt_limit', 20)
+        self.retrieval = config.get('retrieval_enabled', True)
+        self.retrieval_top_k = config.get('retrieval_top_k', 5)
+        self.retrieval_max_chars = config.get('retrieval_max_chars', 2000)
+        self.retrieval_min_score = config.get('retrieval_min_score', 0.15)
+        self.context_rollup = ContextRollup(self.context_extractor, self.diary_entry, self.user_profile,
+                                            max_workers=config.get('context_workers', 4))
+        self.summarizer = IncrementalSummarizer(self.context_extractor, SummaryCache(self.tenant))
+        self.user_context = ""
+        self._context_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="context-loader")
+        self._context_future = None
+        self.start_context_loading()
+
+    def start_context_loading(self):
+        """
+        Load the user context in the background so construction never waits on
+        the LLM. get_response() waits for it only if it is still in flight.
+        """
+        self._context_future = self._context_loader.submit(self.load_user_context)
+        if self.retrieval:
+            # Entries added since the last run get embedded before the first turn needs them
+            self._context_loader.submit(self.sync_vectors)
+        return self._context_future
+
+    def sync_vectors(self):
+        try:
+            self.diary_entry.vectors.sync()
+        except Exception as e:
+            logging.error(f"Error updating the diary embedding index: {e}", exc_info=True)
+
+    def is_context_ready(self):
+        return self._context_future is None or self._context_future.done()
+
+    def add_context_ready_callback(self, callback):
+        """
+        Call `callback()` once the context has loaded (immediately if it already has).
+        Runs on the loader thread, so UI callers must hop back with `after`.
+        """
+        self._context_future.add_done_callback(lambda future: callback())
+
+    def wait_for_context(self):
+        future = self._context_future
+        if future is not None:
+            try:
+                self.user_context = future.result()
+            except Exception as e:
+                logging.error(f"Error loading user context: {e}", exc_info=True)
+        return self.user_context
 
     def load_user_context(self):
         logging.info("Loading user context")
+        periods = ['day', 'week', 'month', 'year']
+        self.context_rollup.prepare(periods)
         contexts = {}
-        for period in ['day', 'week', 'month', 'year']:
-            if self.user_profile.context_needs_update(period):
-                entries = self.diary_entry.get_entries_for_period(period)
-                if entries:
-                    context = self.context_extractor.extract_context(entries, period, contexts)
-                    if context:
-                        self.user_profile.store_context(context, period)
-                        contexts[period] = context
-                else:
-                    logging.info(f"No entries found for period: {period}")
+        for period in periods:
+            context = self.context_rollup.get_context(period)
+            if context:
+                contexts[period] = context
             else:
-                context = self.user_profile.get_latest_context(period)
-                if context:
-                    contexts[period] = context
-                    logging.info(f"Using cached context for period: {period}")
-                else:
-                    logging.info(f"No cached context found for period: {period}")
+                logging.info(f"No entries found for period: {period}")
         
         return self.combine_contexts(contexts)
 
@@ -49,89 +164,177 @@ class ChatBot:
             combined_context += f"{period.capitalize()}: {context}\n\n"
         return combined_context.strip()
 
-    def get_response(self, user_input):
-        self.conversation_history.append({"role": "user", "content": user_input})
-        logging.info(f"User input: {user_input}")
+    def get_response(self, user_input, on_token=None, retrieval=None, timeout=None):
+        """
+        Coaching response for the user's latest input. With `on_token`, the
+        completion is streamed and on_token(text) receives the `output` field
+        piece by piece as it is generated; the full parsed response is still
+        returned at the end. `retrieval` overrides the configured choice of
+        adding the past entries most related to the input to the prompt.
+        `timeout` (seconds) bounds the completion request.
+        """
+        request_options = {'timeout': timeout} if timeout is not None else {}
+        messages, today_entries = self.build_messages(user_input, self.conversation, retrieval)
+
+        try:
+            with span('llm.get_response', model=self.model, streamed=bool(on_token)) as stage:
+                if on_token:
+                    arguments = self._stream_function_arguments(messages, on_token, request_options)
+                else:
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        functions=[COACHING_FUNCTION],
+                        function_call={"name": "provide_coaching_response"},
+                        **self._chat_cache_options,
+                        **request_options
+                    )
+                    function_call = response.choices[0].message.function_call
+                    if not function_call or function_call.name != "provide_coaching_response":
+                        raise ValueError("Unexpected response format from OpenAI API")
+                    arguments = function_call.arguments
+                    if response.usage:
+                        stage.tag(prompt_tokens=response.usage.prompt_tokens,
+                                  completion_tokens=response.usage.completion_tokens)
+                stage.tag(chars=len(arguments))
+
+            return self.finish_turn(arguments, today_entries)
         
+        except TurnCancelled:
+            # Stop or timeout from the caller's on_token; not a failure
+            raise
+        except Exception as e:
+            logging.error(f"Unexpected error in getting AI response: {e}")
+            return error_response(e)
+
+    def build_messages(self, user_input, conversation, retrieval=None):
+        """
+        Record `user_input` in `conversation` and assemble the prompt for it.
+        Returns (messages, today_entries). Safe to call from several threads
+        for different conversations.
+        """
+        conversation.history.append({"role": "user", "content": user_input})
+        logging.info(f"User input: {user_input}")
+
         # Get today's entries
-        today = datetime.datetime.now().date()
         today_entries = self.diary_entry.get_entries_for_period('day')
-        
+
         # Separate the latest entry from previous entries
         latest_entry = today_entries[0] if today_entries else None
         previous_entries = today_entries[1:] if len(today_entries) > 1 else []
-        
-        # Prepare context with focus on the latest entry
-        focused_context = f"Latest entry: {latest_entry['content'] if latest_entry else 'No entry for today yet.'}\n\n"
-        if previous_entries:
-            focused_context += f"Summary of previous entries today: {self.context_extractor.extract_context(previous_entries, 'day', {})}\n\n"
-        focused_context += self.user_context
-        logging.info(f"User context: {focused_context}")
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": focused_context},
-                    {"role": "user", "content": "Please focus primarily on responding to my latest entry, while considering the context of previous entries and user information."},
-                    *self.conversation_history
-                ],
-                functions=[{
-                    "name": "provide_coaching_response",
-                    "description": "Act as a comprehensive AI personal coach to empower the user's holistic growth and well-being. Provide insightful, empathetic, and actionable guidance across various life domains including personal development, professional growth, emotional well-being, physical health, spiritual growth, financial management, and interpersonal relationships. Analyze the user's input, current profile, and historical data to offer tailored advice, set meaningful goals, suggest practical tasks, and track progress. Your role is to inspire, motivate, and support the user in realizing their full potential and achieving a balanced, fulfilling life.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "output": {
-                                "type": "string",
-                                "description": "Main response to the user, including personalized advice, encouragement, and reflections based on their input and overall context."
-                            },
-                            "user_profile": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "New insights about the user's personality, behaviors, strengths, challenges, and growth areas, derived from the current conversation."
-                            },
-                            "tasks": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "Actionable and meaningful tasks or goals for the user, designed to promote growth and progress in relevant areas of their life."
-                            },
-                            "new_user_info": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "Array of strings containing new factual information about the user gathered from the current conversation, excluding information already present in the context."
-                            }
-                        },
-                        "required": ["output", "user_profile", "tasks", "new_user_info"]
-                    }
-                }],
-                function_call={"name": "provide_coaching_response"}
-            )
-            
-            function_call = response.choices[0].message.function_call
-            
-            if function_call and function_call.name == "provide_coaching_response":
-                parsed_response = json.loads(function_call.arguments)
-                logging.info(f"Parsed response:\n{json.dumps(parsed_response, indent=2, ensure_ascii=False)}")
-                return parsed_response
-            else:
-                raise ValueError("Unexpected response format from OpenAI API")
-        
-        except Exception as e:
-            logging.error(f"Unexpected error in getting AI response: {e}")
-            return {
-                "output": "I apologize, but I've encountered an unexpected issue. Let's try that again.",
-                "user_profile": [],
-                "tasks": [],
-                "new_user_info": [],
-                "error": str(e)
-            }
+        # Prepare context with focus on the latest entry; lower priority sections are trimmed first
+        with span('chat.build_prompt') as stage:
+            sections = [("latest_entry", f"Latest entry: {latest_entry['content'] if latest_entry else 'No entry for today yet.'}\n\n", 0)]
+            if previous_entries:
+                sections.append(("previous_entries", f"Summary of previous entries today: {self.summarizer.summarize(previous_entries, 'day')}\n\n", 1))
+            sections.append(("user_context", self.wait_for_context(), 2))
+            if self.retrieval if retrieval is None else retrieval:
+                sections.append(("related_entries", self.related_entries(user_input, today_entries), 2))
+            sections.append(("user_facts", self.known_facts(), 3))
+            self._fold_history(conversation)
+            messages, report = self.prompt_builder.build(sections, COACHING_INSTRUCTION, conversation.history,
+                                                         conversation.summary, [COACHING_FUNCTION])
+            stage.tag(prompt_tokens=report['total'])
+        logging.info(f"User context: {messages[0]['content']}")
+        return messages, today_entries
+
+    def related_entries(self, user_input, today_entries):
+        """
+        Prompt section with the past entries closest to `user_input`: at most
+        `retrieval_top_k` of them, each cut to its share of
+        `retrieval_max_chars`. Today's entries are already in the prompt.
+        """
+        with span('chat.retrieve') as stage:
+            try:
+                entries = self.diary_entry.find_related(user_input, self.retrieval_top_k,
+                                                        [entry['id'] for entry in today_entries],
+                                                        self.retrieval_min_score)
+            except Exception as e:
+                logging.error(f"Error retrieving related entries: {e}", exc_info=True)
+                return ""
+            stage.tag(entries=len(entries))
+        if not entries:
+            return ""
+        share = self.retrieval_max_chars // self.retrieval_top_k
+        lines = []
+        for entry in entries:
+            content = entry['content'] if len(entry['content']) <= share else entry['content'][:share - 3] + "..."
+            lines.append(f"- ({entry['timestamp'][:10]}) {content}")
+        return "\n\nRelated past entries:\n" + "\n".join(lines)
+
+    def known_facts(self):
+        """
+        Prompt section listing the most often seen profile and info facts,
+        at most `fact_prompt_limit` of each however many have accumulated.
+        """
+        facts = self.user_profile.top_facts(self.fact_prompt_limit) + self.user_info.top_facts(self.fact_prompt_limit)
+        if not facts:
+            return ""
+        return "\n\nKnown about the user:\n" + "\n".join(f"- {fact}" for fact in facts)
+
+    def finish_turn(self, arguments, today_entries):
+        """
+        Parse the coaching function-call arguments of a completed turn.
+        """
+        parsed_response = json.loads(arguments)
+        logging.info(f"Parsed response:\n{json.dumps(parsed_response, indent=2, ensure_ascii=False)}")
+        # Today's entries become next turn's "previous entries": summarize them while the user reads
+        self.summarizer.prefetch(today_entries)
+        return parsed_response
+
+    def _stream_function_arguments(self, messages, on_token, request_options=None):
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            functions=[COACHING_FUNCTION],
+            function_call={"name": "provide_coaching_response"},
+            stream=True,
+            **(request_options or {})
+        )
+        streamer = JsonStringFieldStreamer('output')
+        name, arguments = None, []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            function_call = chunk.choices[0].delta.function_call
+            if function_call is None:
+                continue
+            name = name or function_call.name
+            if function_call.arguments:
+                arguments.append(function_call.arguments)
+                text = streamer.feed(function_call.arguments)
+                if text:
+                    on_token(text)
+        if name != "provide_coaching_response":
+            raise ValueError("Unexpected response format from OpenAI API")
+        return ''.join(arguments)
+
+    def _fold_history(self, conversation):
+        overflow = len(conversation.history) - self.history_turns
+        if overflow < HISTORY_FOLD_BATCH:
+            return
+        folded = conversation.history[:overflow]
+        summary = self.context_extractor.summarize_conversation(conversation.summary, folded)
+        if summary:
+            conversation.summary = summary
+            del conversation.history[:overflow]
+            logging.info(f"Folded {overflow} conversation turns into the rolling summary")
 
     def clear_conversation(self):
-        self.conversation_history = []
+        self.conversation = Conversation()
 
     def get_conversation_summary(self):
-        return self.conversation_history
+        return self.conversation.history
+
+    def close(self):
+        """
+        Stop the background context loading and summary prefetching, e.g.
+        before the tenant's database is closed.
+        """
+        self._context_loader.shutdown(wait=True, cancel_futures=True)
+        self.summarizer.close()
 
     def refresh_user_context(self):
-        self.user_context = self.load_user_context()
\ No newline at end of file
+        self.start_context_loading()
+        return self.wait_for_context()
\ No newline at end of file
@@ -1,12 +1,19 @@
 import logging
-from openai import OpenAI
 from ..utils.config import get_config
+from ..utils.tracing import span
+from .backend import shared_client
+from .cached_client import cached_client
 
 class ContextExtractor:
-    def __init__(self):
+    def __init__(self, tenant=None, client=None):
         config = get_config()
-        self.client = OpenAI(api_key=config['openai_api_key'])
+        # Summaries are deterministic enough to reuse: the same entries and
+        # prompt are served from the persistent cache instead of the API.
+        # ChatBot passes its own client so both share one cache and connection pool
+        self.client = client or cached_client(shared_client(config),
+                                              tenant or config['user_data_folder'], config)
         self.model = config['openai_gpt_model']
+        self.small_model = config['openai_gpt_model_small']
 
     def extract_context(self, entries, period, previous_contexts):
         if not entries:
@@ -22,13 +29,10 @@ class ContextExtractor:
         entries_text = "\n\n".join([f"{entry['timestamp']}: {entry['content']}" for entry in entries])
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": f"Here are the diary entries for the {period}:\n\n{entries_text}"}
-                ]
-            )
+            response = self._complete('llm.extract_context', self.model, [
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": f"Here are the diary entries for the {period}:\n\n{entries_text}"}
+            ], period=period)
             context = response.choices[0].message.content.strip()
             logging.info(f"Successfully extracted context for period: {period}")
             return context
@@ -36,6 +40,88 @@ class ContextExtractor:
             logging.error(f"Error extracting context for period {period}: {str(e)}")
             return None
 
+    def extend_context(self, previous_summary, new_entries, period):
+        """
+        Update an existing summary with entries written after it was made,
+        without resending the entries it already covers.
+        """
+        if not new_entries:
+            return previous_summary
+
+        logging.info(f"Extending context for period: {period} with {len(new_entries)} new entries")
+        prompt = self._prepare_prompt(period, {})
+        entries_text = "\n\n".join([f"{entry['timestamp']}: {entry['content']}" for entry in new_entries])
+
+        try:
+            response = self._complete('llm.extend_context', self.model, [
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": f"Here is the summary of the earlier diary entries for the {period}:\n\n{previous_summary}\n\n"
+                                            f"Update it to also cover these newer entries:\n\n{entries_text}"}
+            ], period=period)
+            context = response.choices[0].message.content.strip()
+            logging.info(f"Successfully extended context for period: {period}")
+            return context
+        except Exception as e:
+            logging.error(f"Error extending context for period {period}: {str(e)}")
+            return None
+
+    def extract_rollup(self, summaries, period, child_period):
+        """
+        Summarize a period from the summaries of its sub-periods (e.g. a week
+        from its day summaries) instead of from the raw diary entries.
+        """
+        if not summaries:
+            logging.info(f"No {child_period} summaries to roll up for period: {period}")
+            return None
+
+        logging.info(f"Rolling up {len(summaries)} {child_period} summaries for period: {period}")
+        prompt = self._prepare_prompt(period, {})
+        summaries_text = "\n\n".join([f"{item['label']}: {item['summary']}" for item in summaries])
+
+        try:
+            response = self._complete('llm.extract_rollup', self.model, [
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": f"Here are the summaries of each {child_period} in this {period}, oldest first:\n\n{summaries_text}"}
+            ], period=period)
+            context = response.choices[0].message.content.strip()
+            logging.info(f"Successfully rolled up context for period: {period}")
+            return context
+        except Exception as e:
+            logging.error(f"Error rolling up context for period {period}: {str(e)}")
+            return None
+
+    def summarize_conversation(self, previous_summary, messages):
+        """
+        Rolling summary of older chat turns, folded into the previous summary if any.
+        """
+        if not messages:
+            return previous_summary
+
+        logging.info(f"Summarizing {len(messages)} older conversation turns")
+        turns_text = "\n".join([f"{message['role']}: {message['content']}" for message in messages])
+        earlier = f"Summary so far:\n{previous_summary}\n\n" if previous_summary else ""
+
+        try:
+            response = self._complete('llm.summarize_conversation', self.small_model, [
+                {"role": "system", "content": "You maintain a running summary of a coaching conversation. "
+                                              "Keep facts, decisions, goals and open questions; drop pleasantries. Be concise."},
+                {"role": "user", "content": f"{earlier}Fold these later turns into the summary:\n\n{turns_text}"}
+            ])
+            summary = response.choices[0].message.content.strip()
+            logging.info("Successfully summarized conversation turns")
+            return summary
+        except Exception as e:
+            logging.error(f"Error summarizing conversation: {str(e)}")
+            return None
+
+    def _complete(self, stage, model, messages, **tags):
+        with span(stage, model=model, **tags) as stage_span:
+            response = self.client.chat.completions.create(model=model, messages=messages)
+            if response.usage:
+                stage_span.tag(prompt_tokens=response.usage.prompt_tokens,
+                               completion_tokens=response.usage.completion_tokens)
+            return response
+
     def _prepare_prompt(self, period, previous_contexts):
         base_prompt = "You are an AI assistant tasked with summarizing and extracting key information from a user's diary entries. "
         
@@ -0,0 +1,123 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from ..data.diary_entry import period_start, period_end
+
+# Each level is summarized from the summaries of the level below it
+CHILD_PERIOD = {'week': 'day', 'month': 'week', 'year': 'month'}
+LEVELS = ['day', 'week', 'month', 'year']
+
+
+class ContextRollup:
+    """
+    Hierarchical day -> week -> month -> year summaries persisted in user_context.
+
+    A day is summarized from its diary entries; every other period from the
+    summaries of its sub-periods. Stored rollups are reused until a diary
+    change inside their range marks them dirty (see schema migration 4), so
+    in practice only the currently open periods are ever recomputed and each
+    LLM prompt holds a bounded number of summaries rather than raw entries.
+    """
+
+    def __init__(self, context_extractor, diary_entry, user_profile, max_workers=4):
+        self.context_extractor = context_extractor
+        self.diary_entry = diary_entry
+        self.user_profile = user_profile
+        self.max_workers = max_workers
+
+    def prepare(self, periods, now=None):
+        """
+        Bring the rollups behind `periods` up to date, running independent
+        summaries concurrently. Rollups are computed bottom-up one level at a
+        time: every stale day at once, then every stale week, and so on, so
+        each summary only waits for the level below it.
+        """
+        stale = {level: [] for level in LEVELS}
+        seen = set()
+        for period in periods:
+            self._collect_stale(period, period_start(period, now), stale, seen)
+
+        pending = sum(len(starts) for starts in stale.values())
+        if not pending:
+            return
+        logging.info(f"Refreshing {pending} stale rollups: " +
+                     ", ".join(f"{len(stale[level])} {level}" for level in LEVELS if stale[level]))
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="context-rollup") as executor:
+            for level in LEVELS:
+                list(executor.map(lambda start: self.summarize(level, start), stale[level]))
+
+    def get_context(self, period, now=None):
+        """
+        Summary of the current day, week, month or year, or None if it has no entries.
+        """
+        return self.summarize(period, period_start(period, now))
+
+    def summarize(self, period, start):
+        end = period_end(period, start)
+        key = start.strftime('%Y-%m-%d')
+        stored = self.user_profile.get_rollup(period, key)
+        if stored and not stored['dirty']:
+            return stored['context']
+
+        if not self.diary_entry.has_entries_between(start, end):
+            return None
+
+        seen_dirty = stored['dirty'] if stored else 0
+        if period == 'day':
+            entries = self.diary_entry.get_entries_between(start, end)
+            context = self.context_extractor.extract_context(entries, period, {})
+        else:
+            child_period = CHILD_PERIOD[period]
+            summaries = []
+            complete = True
+            for child_start in self._child_starts(period, start, end):
+                summary = self.summarize(child_period, child_start)
+                if summary:
+                    summaries.append({'label': self._label(child_period, child_start), 'summary': summary})
+                elif self.diary_entry.has_entries_between(child_start, period_end(child_period, child_start)):
+                    # Its summary failed (an API error); don't store a parent that
+                    # silently leaves it out, so the next call retries it
+                    complete = False
+            context = self.context_extractor.extract_rollup(summaries, period, child_period)
+            if context and not complete:
+                logging.warning(f"Not storing the {period} rollup for {key}: a {child_period} summary failed")
+                return context
+
+        if context:
+            self.user_profile.store_rollup(period, key, int(start.timestamp()), int(end.timestamp()),
+                                           context, seen_dirty)
+            logging.info(f"Stored {period} rollup for {key}")
+        return context
+
+    def _collect_stale(self, period, start, stale, seen):
+        if (period, start) in seen:
+            return
+        seen.add((period, start))
+        stored = self.user_profile.get_rollup(period, start.strftime('%Y-%m-%d'))
+        if stored and not stored['dirty']:
+            return
+        end = period_end(period, start)
+        if not self.diary_entry.has_entries_between(start, end):
+            return
+        stale[period].append(start)
+        if period in CHILD_PERIOD:
+            for child_start in self._child_starts(period, start, end):
+                self._collect_stale(CHILD_PERIOD[period], child_start, stale, seen)
+
+    def _child_starts(self, period, start, end):
+        child_period = CHILD_PERIOD[period]
+        if child_period == 'week':
+            # Weeks overlapping the month, including ones that straddle its edges
+            child = period_start('week', start)
+        else:
+            child = start
+        while child < end:
+            yield child
+            child = period_end(child_period, child)
+
+    @staticmethod
+    def _label(period, start):
+        if period == 'day':
+            return start.strftime('%A %Y-%m-%d')
+        if period == 'week':
+            return f"Week of {start:%Y-%m-%d}"
+        return start.strftime('%B %Y')
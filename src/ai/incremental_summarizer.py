@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class IncrementalSummarizer:
+    """
+    Memoized summaries of a growing list of diary entries.
+
+    Summaries are cached under a chained hash of the entries they cover
+    (IDs and contents, oldest first), so the key of every prefix of the list
+    is known up front. A lookup takes the longest cached prefix: an exact
+    match costs no LLM call, a shorter prefix is extended with only the
+    entries after it, and only a cold start summarizes from scratch.
+
+    prefetch() does that work on a background thread right after a chat
+    turn, so the next turn normally finds an exact match and makes a single
+    LLM call instead of two serialized ones.
+    """
+
+    def __init__(self, context_extractor, summary_cache):
+        self.context_extractor = context_extractor
+        self.summary_cache = summary_cache
+        self.stats = {'hits': 0, 'extended': 0, 'misses': 0, 'stale': 0, 'prefetched': 0}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summary-prefetch")
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def summarize(self, entries, period='day'):
+        """
+        Summary covering `entries` (any order), or None if there are none.
+        """
+        self._wait_for_prefetch()
+        summary, source = self._summarize(entries, period)
+        if source is not None:
+            self.stats[source] += 1
+            logging.info(f"Summary memo {source}: hits={self.stats['hits']} extended={self.stats['extended']} "
+                         f"misses={self.stats['misses']} stale={self.stats['stale']} prefetched={self.stats['prefetched']}")
+        return summary
+
+    def prefetch(self, entries, period='day'):
+        """
+        Memoize the summary of `entries` in the background.
+        """
+        with self._lock:
+            self._pending = self._executor.submit(self._prefetch, list(entries), period)
+
+    def _prefetch(self, entries, period):
+        try:
+            _, source = self._summarize(entries, period)
+            if source in ('extended', 'misses'):
+                self.stats['prefetched'] += 1
+        except Exception as e:
+            logging.error(f"Error prefetching summary: {e}", exc_info=True)
+
+    def close(self):
+        """
+        Wait for a prefetch in flight and stop the background thread.
+        """
+        self._executor.shutdown(wait=True)
+
+    def _wait_for_prefetch(self):
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            pending.result()
+
+    def _summarize(self, entries, period):
+        if not entries:
+            return None, None
+        ordered = sorted(entries, key=lambda entry: (entry['timestamp'], entry['id']))
+        keys = self._prefix_keys(ordered, period)
+        cached = self.summary_cache.get_many(keys)
+
+        for covered in range(len(keys), 0, -1):
+            previous = cached.get(keys[covered - 1])
+            if previous is None:
+                continue
+            if covered == len(keys):
+                return previous, 'hits'
+            summary = self.context_extractor.extend_context(previous, ordered[covered:], period)
+            if summary is None:
+                # Better a slightly stale summary than none; don't memoize it
+                return previous, 'stale'
+            source = 'extended'
+            break
+        else:
+            summary = self.context_extractor.extract_context(ordered, period, {})
+            source = 'misses'
+
+        if summary:
+            self.summary_cache.put(keys[-1], summary, len(ordered))
+        return summary, source
+
+    @staticmethod
+    def _prefix_keys(ordered_entries, period):
+        digest = hashlib.sha256(period.encode('utf-8'))
+        keys = []
+        for entry in ordered_entries:
+            digest.update(f"\x1e{entry['id']}\x1f{entry['content']}".encode('utf-8'))
+            keys.append(digest.copy().hexdigest())
+        return keys
@@ -0,0 +1,247 @@
+import re
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+VOCABULARY = ("you", "today", "progress", "focus", "energy", "goal", "small", "step", "reflect", "habit",
+              "week", "balance", "notice", "rest", "plan", "growth", "steady", "care", "time", "clear")
+
+
+class LocalLLMServer:
+    """
+    Offline stand-in for the OpenAI API, speaking just enough of the
+    chat-completions (plain, function-call and SSE streaming) and
+    audio-transcription endpoints for the app to run end to end.
+
+    Responses are deterministic for a given request. Latency, jitter,
+    generation speed and error injection are configurable, so it doubles as
+    a reproducible base for load and latency testing without a network.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, tokens_per_second=0.0,
+                 error_rate=0.0, error_status=500, response_tokens=60, seed=None, upload_bytes_per_second=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.response_tokens = response_tokens
+        # Emulated client uplink, so request size shows up in latency
+        self.upload_bytes_per_second = upload_bytes_per_second
+        self.random = random.Random(seed)
+        self.stats = {'requests': 0, 'errors': 0, 'streamed': 0}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.llm = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="local-llm", daemon=True)
+        self._thread.start()
+        logging.info(f"Local LLM server listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def serve_forever(self):
+        logging.info(f"Local LLM server listening on {self.url}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def delay(self):
+        with self._lock:
+            offset = self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(self.latency + offset, 0.0)
+
+    def should_fail(self):
+        with self._lock:
+            self.stats['requests'] += 1
+            failed = self.error_rate > 0 and self.random.random() < self.error_rate
+            if failed:
+                self.stats['errors'] += 1
+        return failed
+
+    def upload_delay(self, size):
+        return size / self.upload_bytes_per_second if self.upload_bytes_per_second else 0.0
+
+    def token_delay(self):
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def generate_text(self, seed_text, tokens=None):
+        generator = random.Random(hashlib.sha256(seed_text.encode('utf-8')).digest())
+        words = [generator.choice(VOCABULARY) for _ in range(tokens or self.response_tokens)]
+        return " ".join(words).capitalize() + "."
+
+    def completion(self, request):
+        """
+        (content, function_call) for a chat-completions request body.
+        """
+        seed_text = json.dumps(request.get('messages', []), sort_keys=True)
+        function = self._requested_function(request)
+        if function is None:
+            return self.generate_text(seed_text), None
+        arguments = {}
+        for name, schema in function.get('parameters', {}).get('properties', {}).items():
+            text = self.generate_text(f"{seed_text}\x1f{name}", self.response_tokens if name == 'output' else 8)
+            arguments[name] = [text] if schema.get('type') == 'array' else text
+        return None, {'name': function['name'], 'arguments': json.dumps(arguments, ensure_ascii=False)}
+
+    @staticmethod
+    def _requested_function(request):
+        functions = request.get('functions') or []
+        choice = request.get('function_call')
+        if isinstance(choice, dict):
+            return next((f for f in functions if f['name'] == choice.get('name')), None)
+        if choice == 'auto' and functions:
+            return functions[0]
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logging.debug(f"Local LLM server: {format % args}")
+
+    def do_POST(self):
+        llm = self.server.llm
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(llm.delay() + llm.upload_delay(len(body)))
+        if llm.should_fail():
+            return self._send_error(llm.error_status, "Injected error from the local LLM server")
+        path = self.path.split('?')[0].rstrip('/')
+        if path.endswith('/chat/completions'):
+            return self._chat_completion(llm, json.loads(body or b'{}'))
+        if path.endswith('/audio/transcriptions'):
+            return self._transcription(llm, body)
+        self._send_error(404, f"Unknown endpoint {self.path}")
+
+    def _chat_completion(self, llm, request):
+        content, function_call = llm.completion(request)
+        model = request.get('model', 'local')
+        created = int(time.time())
+        completion_id = f"chatcmpl-local-{created}"
+        if request.get('stream'):
+            return self._stream(llm, completion_id, created, model, content, function_call)
+
+        text = content if content is not None else function_call['arguments']
+        time.sleep(llm.token_delay() * len(text.split()))
+        message = {'role': 'assistant', 'content': content}
+        if function_call:
+            message['function_call'] = function_call
+        prompt_tokens = len(json.dumps(request.get('messages', []))) // 4
+        completion_tokens = len(text) // 4
+        self._send_json(200, {
+            'id': completion_id, 'object': 'chat.completion', 'created': created, 'model': model,
+            'choices': [{'index': 0, 'message': message,
+                         'finish_reason': 'function_call' if function_call else 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        })
+
+    def _stream(self, llm, completion_id, created, model, content, function_call):
+        with llm._lock:
+            llm.stats['streamed'] += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        def send(delta, finish_reason=None):
+            chunk = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                     'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        if function_call:
+            send({'role': 'assistant', 'function_call': {'name': function_call['name'], 'arguments': ''}})
+            pieces = re.findall(r'.{1,4}', function_call['arguments'], re.S)
+            deltas = [{'function_call': {'arguments': piece}} for piece in pieces]
+        else:
+            send({'role': 'assistant', 'content': ''})
+            deltas = [{'content': piece} for piece in re.findall(r'\S+\s*', content)]
+        for delta in deltas:
+            time.sleep(llm.token_delay())
+            send(delta)
+        send({}, 'function_call' if function_call else 'stop')
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _transcription(self, llm, body):
+        match = re.search(rb'name="response_format"\r\n\r\n(\w+)', body)
+        response_format = match.group(1).decode() if match else 'json'
+        text = llm.generate_text(hashlib.sha256(body).hexdigest(), max(len(body) // 4000, 3))
+        if response_format == 'text':
+            payload = text.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        else:
+            self._send_json(200, {'text': text})
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message):
+        self._send_json(status, {'error': {'message': message, 'type': 'local_server_error', 'code': status}})
+
+
+def server_from_config(config, port=None):
+    return LocalLLMServer(
+        host=config.get('local_llm_host', '127.0.0.1'),
+        port=config.get('local_llm_port', 0) if port is None else port,
+        latency=config.get('local_llm_latency_ms', 0) / 1000.0,
+        jitter=config.get('local_llm_jitter_ms', 0) / 1000.0,
+        tokens_per_second=config.get('local_llm_tokens_per_second', 0),
+        error_rate=config.get('local_llm_error_rate', 0.0),
+        seed=config.get('local_llm_seed'),
+        upload_bytes_per_second=config.get('local_llm_upload_kbps', 0) * 1000 / 8,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible stand-in server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--tokens-per-second', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--upload-kbps', type=float, default=0, help="emulated client uplink, 0 for unlimited")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    LocalLLMServer(args.host, args.port, args.latency_ms / 1000.0, args.jitter_ms / 1000.0,
+                   args.tokens_per_second, args.error_rate, args.error_status, seed=args.seed,
+                   upload_bytes_per_second=args.upload_kbps * 1000 / 8).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+import json
+import logging
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Rough chars-per-token ratio for English text, used when tiktoken is missing
+CHARS_PER_TOKEN = 4
+# Per-message framing overhead of the chat format
+TOKENS_PER_MESSAGE = 4
+
+
+class TokenCounter:
+    """
+    Local token counting: tiktoken when installed, a character heuristic otherwise.
+    """
+
+    def __init__(self, model):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding('o200k_base')
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    def count_messages(self, messages):
+        return sum(self.count(message['content']) + TOKENS_PER_MESSAGE for message in messages)
+
+    def truncate(self, text, max_tokens):
+        # The "..." marker takes one token of the allowance
+        if max_tokens <= 1:
+            return ""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else self.encoding.decode(tokens[:max_tokens - 1]) + "..."
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        return text if len(text) <= max_chars else text[:max_chars - CHARS_PER_TOKEN] + "..."
+
+
+class PromptBuilder:
+    """
+    Assembles chat messages that fit a token budget.
+
+    The system prompt is made of named sections, each with a priority
+    (0 = most important). The newest conversation turns are kept verbatim
+    and older ones are represented by a rolling summary. When everything
+    does not fit, the lowest-priority sections are truncated or dropped
+    first, and only then the oldest verbatim turns.
+    """
+
+    def __init__(self, token_counter, budget, reserved_output_tokens=1024):
+        self.counter = token_counter
+        self.budget = budget
+        self.reserved_output_tokens = reserved_output_tokens
+
+    def build(self, sections, instruction, history, history_summary=None, functions=None):
+        """
+        sections: list of (name, text, priority) for the system prompt.
+        Returns (messages, report) where report maps each part to its token count.
+        """
+        report = {}
+        fixed = self.reserved_output_tokens + self.counter.count(instruction) + TOKENS_PER_MESSAGE * 2
+        if functions:
+            report['functions'] = self.counter.count(json.dumps(functions))
+            fixed += report['functions']
+
+        summary_message = None
+        if history_summary:
+            summary_message = {"role": "system", "content": f"Summary of the earlier conversation: {history_summary}"}
+            report['history_summary'] = self.counter.count_messages([summary_message])
+            fixed += report['history_summary']
+
+        # Most recent turn always survives; older ones go first if space runs out
+        recent = list(history)
+        history_tokens = self.counter.count_messages(recent)
+        section_floor = sum(self.counter.count(text) for _, text, priority in sections if priority == 0)
+        while len(recent) > 1 and fixed + history_tokens + section_floor > self.budget:
+            history_tokens -= self.counter.count_messages(recent[:1])
+            recent.pop(0)
+        if len(recent) < len(history):
+            logging.warning(f"Dropped {len(history) - len(recent)} conversation turns to fit the token budget")
+        report['history'] = history_tokens
+
+        available = self.budget - fixed - history_tokens
+        kept = {}
+        for name, text, priority in sorted(sections, key=lambda section: section[2]):
+            tokens = self.counter.count(text)
+            if tokens > available:
+                text = self.counter.truncate(text, available)
+                tokens = self.counter.count(text)
+                logging.info(f"Trimmed prompt section '{name}' to {tokens} tokens")
+            available -= tokens
+            kept[name] = text
+            report[name] = tokens
+
+        system_content = "".join(kept[name] for name, _, _ in sections if kept.get(name))
+        messages = [{"role": "system", "content": system_content}]
+        if summary_message:
+            messages.append(summary_message)
+        messages.append({"role": "user", "content": instruction})
+        messages.extend(recent)
+
+        report['total'] = self.counter.count_messages(messages) + report.get('functions', 0)
+        logging.info("Prompt tokens: " + ", ".join(f"{name}={tokens}" for name, tokens in report.items()) +
+                     f" (budget {self.budget}, reserved for output {self.reserved_output_tokens})")
+        return messages, report
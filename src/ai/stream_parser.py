@@ -0,0 +1,106 @@
+ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JsonStringFieldStreamer:
+    """
+    Incrementally extracts one top-level string field from a JSON object that
+    arrives in arbitrary chunks, e.g. streamed function-call arguments.
+
+    feed() returns the newly decoded characters of the field's value as soon
+    as they arrive, handling escapes (including surrogate-pair \\u escapes)
+    split across chunk boundaries. Keys and string values elsewhere in the
+    object, nested or not, are never mistaken for the field.
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.expecting_key = False
+        self.reading_key = False
+        self.after_colon = False
+        self.key_chars = []
+        self.last_key = None
+        self.capturing = False
+        self.done = False
+        self.unicode_digits = None
+        self.high_surrogate = None
+
+    def feed(self, chunk):
+        out = []
+        for char in chunk:
+            if self.capturing:
+                self._capture(char, out)
+            elif self.in_string:
+                self._skip_string(char)
+            else:
+                self._structural(char)
+        return ''.join(out)
+
+    def _capture(self, char, out):
+        if self.unicode_digits is not None:
+            self.unicode_digits.append(char)
+            if len(self.unicode_digits) == 4:
+                self._emit_codepoint(int(''.join(self.unicode_digits), 16), out)
+                self.unicode_digits = None
+        elif self.escape:
+            self.escape = False
+            if char == 'u':
+                self.unicode_digits = []
+            else:
+                out.append(ESCAPES.get(char, char))
+        elif char == '\\':
+            self.escape = True
+        elif char == '"':
+            self.capturing = False
+            self.in_string = False
+            self.done = True
+        else:
+            out.append(char)
+
+    def _emit_codepoint(self, codepoint, out):
+        if 0xD800 <= codepoint <= 0xDBFF:
+            self.high_surrogate = codepoint
+            return
+        if 0xDC00 <= codepoint <= 0xDFFF and self.high_surrogate is not None:
+            codepoint = 0x10000 + ((self.high_surrogate - 0xD800) << 10) + (codepoint - 0xDC00)
+        self.high_surrogate = None
+        out.append(chr(codepoint))
+
+    def _skip_string(self, char):
+        if self.escape:
+            self.escape = False
+        elif char == '\\':
+            self.escape = True
+        elif char == '"':
+            self.in_string = False
+            if self.reading_key:
+                self.reading_key = False
+                self.last_key = ''.join(self.key_chars)
+        elif self.reading_key:
+            self.key_chars.append(char)
+
+    def _structural(self, char):
+        if char == '"':
+            self.in_string = True
+            if self.depth == 1 and self.expecting_key:
+                self.reading_key = True
+                self.key_chars = []
+            elif self.depth == 1 and self.after_colon:
+                self.after_colon = False
+                self.capturing = self.last_key == self.field and not self.done
+        elif char in '{[':
+            self.depth += 1
+            if self.depth == 1:
+                self.expecting_key = char == '{'
+            elif self.depth == 2:
+                self.after_colon = False
+        elif char in '}]':
+            self.depth -= 1
+        elif self.depth == 1 and char == ':':
+            self.expecting_key = False
+            self.after_colon = True
+        elif self.depth == 1 and char == ',':
+            self.expecting_key = True
+            self.after_colon = False
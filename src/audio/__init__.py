@@ -1,2 +1,12 @@
-from .recorder import AudioRecorder
-from .transcriber import Transcriber
\ No newline at end of file
+from ..utils.lazy import lazy_exports
+
+# Nothing is imported until used: the recorder loads PortAudio and the
+# transcriber the openai SDK, neither of which startup needs
+__getattr__ = lazy_exports(__name__, {
+    'AudioRecorder': '.recorder',
+    'Transcriber': '.transcriber',
+    'StreamingTranscriber': '.streaming_transcriber',
+    'VoiceActivitySegmenter': '.vad',
+    'AudioEncoder': '.encoder',
+})
+__all__ = ['AudioRecorder', 'Transcriber', 'StreamingTranscriber', 'VoiceActivitySegmenter', 'AudioEncoder']
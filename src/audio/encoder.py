@@ -0,0 +1,115 @@
+import io
+import os
+import logging
+import numpy as np
+import soundfile as sf
+
+try:
+    import soxr
+except ImportError:
+    soxr = None
+
+SPEECH_SAMPLE_RATE = 16000
+# Upload format -> (soundfile format, subtype, file extension)
+FORMATS = {
+    'flac': ('FLAC', 'PCM_16', 'flac'),
+    'ogg': ('OGG', 'OPUS', 'ogg'),
+    'wav': ('WAV', 'PCM_16', 'wav'),
+}
+
+
+def to_mono(samples):
+    samples = np.asarray(samples)
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    if np.issubdtype(samples.dtype, np.integer):
+        return samples.astype(np.float32) / np.iinfo(samples.dtype).max
+    return samples.astype(np.float32, copy=False)
+
+
+def resample(samples, from_rate, to_rate):
+    """
+    Band-limited resampling of mono float samples: soxr when installed,
+    otherwise a windowed-sinc low-pass followed by linear interpolation.
+    """
+    if from_rate == to_rate or samples.size == 0:
+        return samples
+    if soxr is not None:
+        return soxr.resample(samples, from_rate, to_rate).astype(np.float32, copy=False)
+    if to_rate < from_rate:
+        samples = _lowpass(samples, 0.45 * to_rate / from_rate)
+    count = int(round(samples.size * to_rate / from_rate))
+    positions = np.arange(count, dtype=np.float64) * (from_rate / to_rate)
+    return np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+
+
+def _lowpass(samples, cutoff, taps=63):
+    # cutoff is a fraction of the sampling rate; Hamming-windowed sinc kernel
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    kernel /= kernel.sum()
+    return np.convolve(samples, kernel.astype(np.float32), mode='same')
+
+
+def trim_silence(samples, sample_rate, threshold_db=-45.0, padding_ms=200, frame_ms=20):
+    """
+    Drop leading and trailing silence, keeping `padding_ms` around the speech.
+    Returns the input unchanged if nothing rises above the threshold.
+    """
+    frame = max(int(sample_rate * frame_ms / 1000), 1)
+    count = samples.size // frame
+    if count == 0:
+        return samples
+    frames = samples[:count * frame].reshape(count, frame)
+    loud = np.flatnonzero(10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10) > threshold_db)
+    if loud.size == 0:
+        return samples
+    padding = int(sample_rate * padding_ms / 1000)
+    start = max(loud[0] * frame - padding, 0)
+    end = min((loud[-1] + 1) * frame + padding, samples.size)
+    return samples[start:end]
+
+
+class AudioEncoder:
+    """
+    Prepares audio for upload to the speech-to-text API: mono, resampled
+    to 16 kHz, silence trimmed, and compressed (FLAC by default, Ogg/Opus
+    when supported by libsndfile).
+    """
+
+    def __init__(self, upload_format='flac', sample_rate=SPEECH_SAMPLE_RATE, trim=True):
+        if upload_format not in FORMATS:
+            raise ValueError(f"Unknown upload format '{upload_format}'. Expected one of: {', '.join(FORMATS)}")
+        self.format, self.subtype, self.extension = FORMATS[upload_format]
+        if self.subtype not in sf.available_subtypes(self.format):
+            logging.warning(f"libsndfile cannot write {self.format}/{self.subtype}; uploading FLAC instead")
+            self.format, self.subtype, self.extension = FORMATS['flac']
+        # Opus only supports a few rates; 16 kHz is one of them
+        self.sample_rate = sample_rate
+        self.trim = trim
+
+    def encode_samples(self, samples, sample_rate, name="audio"):
+        """
+        (filename, bytes) ready to pass as the `file` of a transcription request.
+        """
+        samples = resample(to_mono(samples), sample_rate, self.sample_rate)
+        if self.trim:
+            samples = trim_silence(samples, self.sample_rate)
+        buffer = io.BytesIO()
+        sf.write(buffer, np.clip(samples, -1.0, 1.0), self.sample_rate, format=self.format, subtype=self.subtype)
+        return f"{name}.{self.extension}", buffer.getvalue()
+
+    def encode_file(self, path):
+        samples, sample_rate = sf.read(path, dtype='float32', always_2d=False)
+        name = os.path.splitext(os.path.basename(path))[0]
+        return self.encode_samples(samples, sample_rate, name)
+
+
+def encoder_from_config(config):
+    """
+    The configured AudioEncoder, or None to upload recordings unchanged.
+    """
+    upload_format = config.get('audio_upload_format', 'flac')
+    if upload_format == 'original':
+        return None
+    return AudioEncoder(upload_format, trim=config.get('audio_trim_silence', True))
@@ -1,37 +1,105 @@
 import sounddevice as sd
 import soundfile as sf
-import queue
 import threading
 import datetime
+import logging
 import os
+from ..utils.tracing import span
+from .ring_buffer import AudioRingBuffer
 
 class AudioRecorder:
-    def __init__(self, recordings_folder):
+    """
+    Captures the microphone to a file. The audio callback only copies each
+    block into a preallocated ring buffer; a writer thread flushes it to disk
+    (and to the optional listener) in batches every `flush_ms`.
+    """
+
+    def __init__(self, recordings_folder, sample_rate=44100, file_format='WAV', subtype='PCM_16',
+                 buffer_seconds=10, flush_ms=250):
         self.recordings_folder = recordings_folder
+        self.sample_rate = sample_rate
+        self.file_format = file_format
+        self.subtype = subtype
+        self.buffer_seconds = buffer_seconds
+        self.flush_interval = flush_ms / 1000.0
         self.is_recording = False
-        self.audio_queue = queue.Queue()
+        self.listener = None
+        self.file_path = None
+        self.ring = None
+        self.stats = {}
+        self._stop_event = threading.Event()
+        self._thread = None
     
-    def start_recording(self):
+    def start_recording(self, listener=None):
+        """
+        `listener`, if given, gets feed(block) for every flushed batch and
+        close() once the recording has ended (see StreamingTranscriber).
+        Blocks are views into the ring buffer, valid only during the call.
+        """
         self.is_recording = True
-        self.audio_queue = queue.Queue()
-        threading.Thread(target=self._record_thread, daemon=True).start()
+        self.listener = listener
+        self.file_path = self._generate_filename()
+        self.ring = AudioRingBuffer(int(self.sample_rate * self.buffer_seconds))
+        self.stats = {'frames': 0, 'flushes': 0, 'overflow_frames': 0, 'overflow_events': 0, 'device_overflows': 0}
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._record_thread, name="audio-writer", daemon=True)
+        self._thread.start()
     
-    def stop_recording(self):
-        self.is_recording = False
+    def stop_recording(self, timeout=5.0):
+        """
+        Stop capturing and return the path of the finalized file: every
+        captured frame is on disk and the listener is closed when this returns.
+        """
+        with span('audio.stop_recording') as stage:
+            self.is_recording = False
+            self._stop_event.set()
+            if self._thread:
+                self._thread.join(timeout)
+                if self._thread.is_alive():
+                    logging.error(f"Audio writer did not finish within {timeout} s")
+            stage.tag(**self.stats)
+        if self.stats.get('overflow_frames') or self.stats.get('device_overflows'):
+            logging.warning(f"Recording lost audio: {self.stats}")
         return self.file_path
     
     def _record_thread(self):
-        self.file_path = self._generate_filename()
-        with sf.SoundFile(self.file_path, mode='w', samplerate=44100, channels=1, subtype='PCM_16') as file:
-            with sd.InputStream(samplerate=44100, channels=1, callback=self._audio_callback):
-                while self.is_recording:
-                    file.write(self.audio_queue.get())
+        listener = self.listener
+        try:
+            with sf.SoundFile(self.file_path, mode='w', samplerate=self.sample_rate, channels=1,
+                              format=self.file_format, subtype=self.subtype) as file:
+                with sd.InputStream(samplerate=self.sample_rate, channels=1, dtype='float32',
+                                    callback=self._audio_callback):
+                    while not self._stop_event.wait(self.flush_interval):
+                        self._flush(file, listener)
+                # The stream is closed now, so this drains the last frames
+                self._flush(file, listener)
+        except Exception as e:
+            logging.error(f"Error while recording: {e}", exc_info=True)
+        finally:
+            self.is_recording = False
+            self.stats['overflow_frames'] = self.ring.overflow_frames
+            self.stats['overflow_events'] = self.ring.overflow_events
+            if listener:
+                listener.close()
+
+    def _flush(self, file, listener):
+        frames = 0
+        for view in self.ring.segments():
+            file.write(view)
+            if listener:
+                listener.feed(view)
+            frames += len(view)
+        if frames:
+            self.ring.consume(frames)
+            self.stats['frames'] += frames
+            self.stats['flushes'] += 1
     
     def _audio_callback(self, indata, frames, time, status):
-        if status:
-            print(status)
-        self.audio_queue.put(indata.copy())
+        # Runs on the audio thread: no allocation, no blocking
+        if status.input_overflow:
+            self.stats['device_overflows'] += 1
+        self.ring.write(indata)
     
     def _generate_filename(self):
         timestamp = datetime.datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
-        return os.path.join(self.recordings_folder, f"{timestamp}-recording.wav")
\ No newline at end of file
+        return os.path.join(self.recordings_folder, f"{timestamp}-recording.{self.file_format.lower()}")
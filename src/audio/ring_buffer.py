@@ -0,0 +1,59 @@
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size, preallocated frame buffer between the audio callback
+    (single producer) and the writer thread (single consumer).
+
+    write() copies a block in place without allocating. When the buffer is
+    full the frames that do not fit are dropped and counted, so a stalled
+    disk costs audio rather than unbounded memory. The consumer reads
+    zero-copy views with segments() and releases them with consume().
+    """
+
+    def __init__(self, capacity, channels=1, dtype='float32'):
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, channels), dtype=dtype)
+        # Running totals; only the producer moves `written`, only the consumer moves `read`
+        self.written = 0
+        self.read = 0
+        self.overflow_frames = 0
+        self.overflow_events = 0
+
+    def write(self, block):
+        frames = len(block)
+        free = self.capacity - (self.written - self.read)
+        if frames > free:
+            self.overflow_frames += frames - free
+            self.overflow_events += 1
+            frames = free
+            if not frames:
+                return 0
+        start = self.written % self.capacity
+        first = min(frames, self.capacity - start)
+        self.buffer[start:start + first] = block[:first]
+        if frames > first:
+            self.buffer[:frames - first] = block[first:frames]
+        # Publish only after the data is in place
+        self.written += frames
+        return frames
+
+    def available(self):
+        return self.written - self.read
+
+    def segments(self):
+        """
+        Views of the unread frames, oldest first (two when they wrap around).
+        They stay valid until consume().
+        """
+        count = self.written - self.read
+        start = self.read % self.capacity
+        first = min(count, self.capacity - start)
+        views = [self.buffer[start:start + first]] if first else []
+        if count > first:
+            views.append(self.buffer[:count - first])
+        return views
+
+    def consume(self, frames):
+        self.read += frames
@@ -0,0 +1,65 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .vad import VoiceActivitySegmenter
+
+
+class StreamingTranscriber:
+    """
+    Transcribes a recording while it is still being made.
+
+    The recorder feeds audio blocks in; voice activity detection cuts them
+    into utterances, and each utterance is transcribed on a worker pool as
+    soon as it ends. finish() stitches the transcripts in recording order,
+    so after stop only the last utterance is still in flight.
+    """
+
+    def __init__(self, transcriber, sample_rate, language=None, max_workers=3, **vad_options):
+        self.transcriber = transcriber
+        self.sample_rate = sample_rate
+        self.language = language
+        self.segmenter = VoiceActivitySegmenter(sample_rate, self._submit, **vad_options)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcribe-chunk")
+        self._futures = []
+        self._input_closed = threading.Event()
+
+    def feed(self, block):
+        self.segmenter.feed(block)
+
+    def close(self):
+        """
+        Called by the recorder after the last block; flushes the final utterance.
+        """
+        try:
+            self.segmenter.flush()
+        finally:
+            self._input_closed.set()
+
+    def _submit(self, samples):
+        index = len(self._futures)
+        logging.info(f"Transcribing utterance {index} ({samples.size / self.sample_rate:.1f} s) in the background")
+        self._futures.append(self._executor.submit(
+            self.transcriber.transcribe_samples, samples, self.sample_rate, self.language))
+
+    def finish(self, timeout=None):
+        """
+        The stitched transcript, or None if streaming could not produce one
+        (no speech detected, a chunk failed, or the recorder never closed
+        the stream), in which case the caller should transcribe the whole file.
+        """
+        try:
+            if not self._input_closed.wait(timeout):
+                logging.warning("Recorder did not close the transcription stream in time")
+                return None
+            if not self._futures:
+                return None
+            texts = []
+            for index, future in enumerate(self._futures):
+                try:
+                    texts.append(future.result(timeout).strip())
+                except Exception as e:
+                    logging.error(f"Error transcribing utterance {index}: {e}")
+                    return None
+            return " ".join(text for text in texts if text)
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,26 +1,69 @@
-from openai import OpenAI
+import io
+import os
+import logging
+import soundfile as sf
+from ..ai.backend import create_client, shared_client
 from ..utils.config import get_config
+from ..utils.tracing import span
+from .encoder import encoder_from_config
+
+# Default for Transcriber(encoder=...): the configured encoder; None uploads unchanged
+FROM_CONFIG = object()
 
 class Transcriber:
-    def __init__(self, api_key=None, language=None):
+    def __init__(self, api_key=None, language=None, encoder=FROM_CONFIG):
         config = get_config()
-        self.client = OpenAI(api_key=api_key or config['openai_api_key'])
+        self.client = create_client(dict(config, openai_api_key=api_key)) if api_key else shared_client(config)
         self.model = config.get('openai_whisper_model', 'whisper-1')
         self.language = language or config.get('default_language', 'en')
+        # Recordings are shrunk to 16 kHz FLAC/Opus before upload unless disabled
+        self.encoder = encoder_from_config(config) if encoder is FROM_CONFIG else encoder
 
-    def transcribe(self, audio_file, language=None):
+    def transcribe(self, audio_file, language=None, raise_errors=False):
         try:
-            with open(audio_file, "rb") as file:
-                transcript = self.client.audio.transcriptions.create(
-                    model=self.model,
-                    file=file,
-                    response_format="text",
-                    language=language or self.language
-                )
-            return transcript
+            return self._upload('transcribe', self._prepare_upload(audio_file), language)
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Transcription Error: {e}")
             return ""
 
+    def _prepare_upload(self, audio_file):
+        if self.encoder:
+            try:
+                with span('audio.encode', bytes=os.path.getsize(audio_file)) as stage:
+                    upload = self.encoder.encode_file(audio_file)
+                    stage.tag(encoded_bytes=len(upload[1]))
+                return upload
+            except Exception as e:
+                # e.g. containers libsndfile cannot read (m4a); the API still accepts them as-is
+                logging.warning(f"Uploading {audio_file} unencoded: {e}")
+        with open(audio_file, "rb") as file:
+            return os.path.basename(audio_file), file.read()
+
+    def transcribe_samples(self, samples, sample_rate, language=None):
+        """
+        Transcribe in-memory mono samples, e.g. one utterance of a live
+        recording. Unlike transcribe(), errors are raised to the caller.
+        """
+        if self.encoder:
+            upload = self.encoder.encode_samples(samples, sample_rate, "utterance")
+        else:
+            buffer = io.BytesIO()
+            sf.write(buffer, samples, sample_rate, format='WAV', subtype='PCM_16')
+            upload = ("utterance.wav", buffer.getvalue())
+        return self._upload('transcribe.chunk', upload, language)
+
+    def _upload(self, stage_name, upload, language):
+        with span(stage_name, bytes=len(upload[1])) as stage:
+            transcript = self.client.audio.transcriptions.create(
+                model=self.model,
+                file=upload,
+                response_format="text",
+                language=language or self.language
+            )
+            stage.tag(chars=len(transcript))
+        return transcript
+
     def set_language(self, language):
         self.language = language
\ No newline at end of file
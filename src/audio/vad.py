@@ -0,0 +1,100 @@
+import collections
+import numpy as np
+
+
+class VoiceActivitySegmenter:
+    """
+    Cuts a live audio stream into utterances using frame energy.
+
+    A frame counts as speech when it is louder than both an absolute
+    threshold and the running noise floor by `margin_db`. An utterance ends
+    after `silence_ms` of non-speech (or at `max_utterance_s`) and is handed
+    to on_utterance(samples) as mono float32, with `padding_ms` of context
+    kept on both sides. Blips shorter than `min_speech_ms` are dropped.
+
+    The noise floor follows quiet frames quickly and creeps up by at most
+    `noise_rise_db_s` per second during speech, so steady background noise
+    louder than the threshold stops counting as speech after a few seconds.
+    """
+
+    def __init__(self, sample_rate, on_utterance, frame_ms=30, threshold_db=-45.0, margin_db=10.0,
+                 silence_ms=700, min_speech_ms=250, max_utterance_s=30.0, padding_ms=200, noise_rise_db_s=3.0):
+        self.sample_rate = sample_rate
+        self.on_utterance = on_utterance
+        self.frame_size = max(int(sample_rate * frame_ms / 1000), 1)
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.silence_frames = max(silence_ms // frame_ms, 1)
+        self.min_speech_frames = max(min_speech_ms // frame_ms, 1)
+        self.max_frames = int(max_utterance_s * 1000 / frame_ms)
+        self.padding_frames = padding_ms // frame_ms
+        self.noise_db = threshold_db
+        self.noise_rise_db = noise_rise_db_s * frame_ms / 1000
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.preroll = collections.deque(maxlen=self.padding_frames or 1)
+        self.frames = []
+        self.speech_frames = 0
+        self.silence_run = 0
+        self.utterances = 0
+
+    def feed(self, block):
+        # Always copies: blocks may be views into a buffer that gets reused
+        samples = np.concatenate((self.pending, self._mono_float(block)))
+        count = samples.size // self.frame_size
+        self.pending = samples[count * self.frame_size:]
+        if not count:
+            return
+        frames = samples[:count * self.frame_size].reshape(count, self.frame_size)
+        energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        for frame, level in zip(frames, energy_db):
+            self._step(frame, level)
+
+    def flush(self):
+        """
+        Emit the utterance in progress, e.g. when recording stops.
+        """
+        self._emit(trim_silence=False)
+
+    def _step(self, frame, level):
+        speech = level > max(self.threshold_db, self.noise_db + self.margin_db)
+        if not speech:
+            self.noise_db = 0.95 * self.noise_db + 0.05 * level
+        else:
+            # Without this a room louder than threshold_db would be one long utterance
+            self.noise_db = min(level, self.noise_db + self.noise_rise_db)
+        if not self.frames:
+            if speech:
+                self.frames = list(self.preroll) + [frame]
+                self.speech_frames, self.silence_run = 1, 0
+                self.preroll.clear()
+            elif self.padding_frames:
+                self.preroll.append(frame)
+            return
+
+        self.frames.append(frame)
+        if speech:
+            self.speech_frames += 1
+            self.silence_run = 0
+        else:
+            self.silence_run += 1
+        if self.silence_run >= self.silence_frames or len(self.frames) >= self.max_frames:
+            self._emit(trim_silence=True)
+
+    def _emit(self, trim_silence):
+        frames, self.frames = self.frames, []
+        if trim_silence:
+            # Keep only `padding` worth of the trailing silence
+            frames = frames[:len(frames) - max(self.silence_run - self.padding_frames, 0)]
+        if self.speech_frames >= self.min_speech_frames and frames:
+            self.utterances += 1
+            self.on_utterance(np.concatenate(frames))
+        self.speech_frames = self.silence_run = 0
+
+    @staticmethod
+    def _mono_float(block):
+        samples = np.asarray(block)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        if np.issubdtype(samples.dtype, np.integer):
+            return samples.astype(np.float32) / np.iinfo(samples.dtype).max
+        return samples.astype(np.float32, copy=False)
@@ -1,4 +1,17 @@
-from .diary_entry import DiaryEntry
-from .user_profile import UserProfile
-from .user_info import UserInfo
-from .task_manager import TaskManager
\ No newline at end of file
+from ..utils.lazy import lazy_exports
+
+__getattr__ = lazy_exports(__name__, {
+    'DiaryEntry': '.diary_entry',
+    'UserProfile': '.user_profile',
+    'UserInfo': '.user_info',
+    'FactStore': '.fact_store',
+    'TaskManager': '.task_manager',
+    'SummaryCache': '.summary_cache',
+    'LLMCache': '.llm_cache',
+    'ImportJournal': '.import_journal',
+    'Tenant': '.tenant',
+    'TenantRegistry': '.tenant',
+    'VectorIndex': '.vector_index',
+})
+__all__ = ['DiaryEntry', 'UserProfile', 'UserInfo', 'FactStore', 'TaskManager', 'SummaryCache', 'LLMCache',
+           'ImportJournal', 'Tenant', 'TenantRegistry', 'VectorIndex']
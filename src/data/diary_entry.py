@@ -1,135 +1,335 @@
-import sqlite3
 import datetime
-import os
+import re
 import logging
 from ..utils.config import get_config
+from .tenant import TenantStore
+from .vector_index import get_vector_index
+from ..utils.tracing import span
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-class DiaryEntry:
-    def __init__(self, user_data_folder):
-        self.db_path = os.path.join(user_data_folder, 'user_data.db')
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def period_start(period, now=None):
+    """
+    Local midnight at the start of the current day, week (Monday), month or year.
+    """
+    now = now or datetime.datetime.now()
+    if period == 'day':
+        start_date = now
+    elif period == 'week':
+        start_date = now - datetime.timedelta(days=now.weekday())
+    elif period == 'month':
+        start_date = now.replace(day=1)
+    elif period == 'year':
+        start_date = now.replace(month=1, day=1)
+    else:
+        raise ValueError(f"Invalid period: {period}")
+    return start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def period_end(period, start):
+    """
+    Start of the period following the one that begins at `start`.
+    """
+    if period == 'day':
+        return start + datetime.timedelta(days=1)
+    elif period == 'week':
+        return start + datetime.timedelta(days=7)
+    elif period == 'month':
+        return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    elif period == 'year':
+        return start.replace(year=start.year + 1)
+    raise ValueError(f"Invalid period: {period}")
+
+class DiaryEntry(TenantStore):
+    def __init__(self, tenant):
+        config = get_config()
+        super().__init__(tenant)
+        # Keep the tenant's embedding index current as entries are saved
+        self.index_vectors = config.get('retrieval_enabled', True)
         self._create_table()
         logging.info(f"DiaryEntry initialized with database path: {self.db_path}")
 
     def _create_table(self):
-        with sqlite3.connect(self.db_path) as conn:
+        self.storage.ensure_schema()
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS diary_entries (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT,
-                    content TEXT
-                )
-            ''')
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE name = 'diary_fts')")
+            self.fts_enabled = bool(cursor.fetchone()[0])
         logging.info("Diary entries table created or verified")
 
     def save_entry(self, text):
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
-        with sqlite3.connect(self.db_path) as conn:
+        now = datetime.datetime.now()
+        timestamp = now.strftime("%Y-%m-%dT%H:%M:%S.%f")
+        with span('db.save_entry', chars=len(text)), self.storage.transaction(immediate=True) as conn:
             cursor = conn.cursor()
-            cursor.execute('INSERT INTO diary_entries (timestamp, content) VALUES (?, ?)', (timestamp, text))
+            cursor.execute('INSERT INTO diary_entries (timestamp, content, ts_epoch) VALUES (?, ?, ?)',
+                           (timestamp, text, int(now.timestamp())))
         logging.info(f"New diary entry saved with timestamp: {timestamp}")
+        if self.index_vectors:
+            try:
+                self.vectors.sync()
+            except Exception as e:
+                # The entry is saved; the index catches up on its next sync
+                logging.error(f"Error embedding diary entry: {e}", exc_info=True)
+
+    def save_entries(self, entries):
+        """
+        Bulk insert of (datetime, text) pairs in one transaction, keeping the
+        given timestamps. Joins the caller's transaction if one is open.
+        """
+        rows = [(moment.strftime("%Y-%m-%dT%H:%M:%S.%f"), text, int(moment.timestamp())) for moment, text in entries]
+        with span('db.save_entries', rows=len(rows)), self.storage.transaction(immediate=True) as conn:
+            conn.executemany('INSERT INTO diary_entries (timestamp, content, ts_epoch) VALUES (?, ?, ?)', rows)
+        logging.info(f"Saved {len(rows)} diary entries")
+        return len(rows)
+
+    @property
+    def vectors(self):
+        return get_vector_index(self.tenant)
 
     def get_entries(self):
         logging.info("Attempting to retrieve diary entries")
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT id, timestamp, content FROM diary_entries ORDER BY timestamp DESC')
+            cursor.execute('SELECT id, timestamp, content FROM diary_entries ORDER BY ts_epoch DESC, id DESC')
             entries = cursor.fetchall()
             logging.info(f"Retrieved {len(entries)} diary entries")
             return [{'id': row['id'], 'timestamp': row['timestamp'], 'content': row['content']} for row in entries]
 
+    def get_entries_page(self, before_id=None, limit=50):
+        """
+        Up to `limit` entries older than entry `before_id` (newest first), or the
+        newest entries when `before_id` is None. Keyset pagination on
+        (ts_epoch, id), so every page is an index seek regardless of depth.
+        """
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            if before_id is None:
+                cursor.execute('''
+                    SELECT id, timestamp, content
+                    FROM diary_entries
+                    ORDER BY ts_epoch DESC, id DESC
+                    LIMIT ?
+                ''', (limit,))
+            else:
+                cursor.execute('''
+                    SELECT id, timestamp, content
+                    FROM diary_entries
+                    WHERE (ts_epoch, id) < (?, ?)
+                    ORDER BY ts_epoch DESC, id DESC
+                    LIMIT ?
+                ''', (*self._page_key(conn, before_id, older=True), limit))
+            return [{'id': row['id'], 'timestamp': row['timestamp'], 'content': row['content']} for row in cursor.fetchall()]
+
+    def get_entries_page_after(self, after_id, limit=50):
+        """
+        Up to `limit` entries directly newer than entry `after_id`, newest first.
+        """
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, timestamp, content
+                FROM diary_entries
+                WHERE (ts_epoch, id) > (?, ?)
+                ORDER BY ts_epoch ASC, id ASC
+                LIMIT ?
+            ''', (*self._page_key(conn, after_id, older=False), limit))
+            rows = cursor.fetchall()
+            return [{'id': row['id'], 'timestamp': row['timestamp'], 'content': row['content']} for row in reversed(rows)]
+
+    @staticmethod
+    def _page_key(conn, entry_id, older):
+        """
+        The (ts_epoch, id) key of a page cursor. If that entry has since been
+        deleted, fall back to comparing ids alone (entries are usually added
+        in time order) instead of returning an empty page.
+        """
+        row = conn.execute('SELECT ts_epoch, id FROM diary_entries WHERE id = ?', (entry_id,)).fetchone()
+        if row is not None:
+            return row[0], row[1]
+        key = conn.execute(f'''
+            SELECT ts_epoch, id FROM diary_entries WHERE id {'<' if older else '>'} ?
+            ORDER BY id {'DESC' if older else 'ASC'} LIMIT 1
+        ''', (entry_id,)).fetchone()
+        if key is None:
+            # Nothing on that side of the cursor
+            return (float('-inf'), 0) if older else (float('inf'), 0)
+        # The nearest surviving entry by id is itself part of the page
+        return (key[0], key[1] + 1) if older else (key[0], key[1] - 1)
+
+    def iter_entries(self, before_id=None, limit=50):
+        """
+        Generator over the diary, newest first, yielding pages of up to `limit`
+        entries. Each page is fetched only when the caller asks for it.
+        """
+        while True:
+            page = self.get_entries_page(before_id, limit)
+            if not page:
+                return
+            yield page
+            if len(page) < limit:
+                return
+            before_id = page[-1]['id']
+
+    def get_entries_between(self, start, end):
+        """
+        Entries with start <= timestamp < end (local datetimes), oldest first.
+        """
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, timestamp, content
+                FROM diary_entries
+                WHERE ts_epoch >= ? AND ts_epoch < ?
+                ORDER BY ts_epoch, id
+            ''', (int(start.timestamp()), int(end.timestamp())))
+            return [{'id': row['id'], 'timestamp': row['timestamp'], 'content': row['content']} for row in cursor.fetchall()]
+
+    def has_entries_between(self, start, end):
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT EXISTS (
+                    SELECT 1 FROM diary_entries WHERE ts_epoch >= ? AND ts_epoch < ?
+                )
+            ''', (int(start.timestamp()), int(end.timestamp())))
+            return bool(cursor.fetchone()[0])
+
+    def search(self, query, limit=20):
+        """
+        Full-text search over the diary. Returns up to `limit` matches, best
+        first by bm25, each with a highlighted snippet of the matching text.
+        """
+        terms = SEARCH_TOKEN_PATTERN.findall(query)
+        if not terms:
+            return []
+        logging.info(f"Searching diary for: {query}")
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            if self.fts_enabled:
+                # Quote every term so user input is never parsed as FTS5 syntax;
+                # OR lets bm25 rank entries matching the rarest terms first.
+                match = ' OR '.join('"' + term + '"' for term in terms)
+                cursor.execute('''
+                    SELECT d.id, d.timestamp,
+                           snippet(diary_fts, 0, '[', ']', '...', 16) AS snippet,
+                           bm25(diary_fts) AS score
+                    FROM diary_fts
+                    JOIN diary_entries d ON d.id = diary_fts.rowid
+                    WHERE diary_fts MATCH ?
+                    ORDER BY rank
+                    LIMIT ?
+                ''', (match, limit))
+            else:
+                # Escaped likewise, so '%' and '_' in the query match literally
+                pattern = query.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                cursor.execute('''
+                    SELECT id, timestamp, substr(content, 1, 200) AS snippet, 0 AS score
+                    FROM diary_entries
+                    WHERE content LIKE ? ESCAPE '\\'
+                    ORDER BY ts_epoch DESC, id DESC
+                    LIMIT ?
+                ''', (f"%{pattern}%", limit))
+            results = [{'id': row['id'], 'timestamp': row['timestamp'], 'snippet': row['snippet'], 'score': row['score']}
+                       for row in cursor.fetchall()]
+            logging.info(f"Diary search returned {len(results)} results")
+            return results
+
+    def find_related(self, text, limit=5, exclude_ids=(), min_score=0.0):
+        """
+        Up to `limit` entries closest in meaning to `text` by the embedding
+        index, best first, each with its cosine `score`.
+        """
+        hits = self.vectors.search(text, limit, exclude_ids, min_score)
+        entries = self.get_entries_by_ids([entry_id for entry_id, _ in hits])
+        return [dict(entries[entry_id], score=score) for entry_id, score in hits if entry_id in entries]
+
+    def get_entries_by_ids(self, entry_ids):
+        """
+        {id: entry} for those of `entry_ids` that still exist.
+        """
+        if not entry_ids:
+            return {}
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT id, timestamp, content FROM diary_entries
+                WHERE id IN ({', '.join('?' * len(entry_ids))})
+            ''', list(entry_ids))
+            return {row['id']: {'id': row['id'], 'timestamp': row['timestamp'], 'content': row['content']}
+                    for row in cursor.fetchall()}
+
     def get_entry_dates(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT DISTINCT date(timestamp) FROM diary_entries ORDER BY date(timestamp) DESC')
-            dates = [row[0] for row in cursor.fetchall()]
+            # Skip-scan the ts_epoch index: one O(log n) seek per distinct day
+            # instead of converting every row's timestamp.
+            dates = []
+            cursor.execute('SELECT MAX(ts_epoch) FROM diary_entries')
+            latest = cursor.fetchone()[0]
+            while latest is not None:
+                day_start = period_start('day', datetime.datetime.fromtimestamp(latest))
+                dates.append(day_start.strftime('%Y-%m-%d'))
+                cursor.execute('SELECT MAX(ts_epoch) FROM diary_entries WHERE ts_epoch < ?',
+                               (int(day_start.timestamp()),))
+                latest = cursor.fetchone()[0]
             logging.info(f"Retrieved {len(dates)} unique entry dates")
             return dates
 
     def delete_entry(self, entry_id):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.storage.transaction(immediate=True) as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM diary_entries WHERE id = ?', (entry_id,))
             deleted = cursor.rowcount > 0
-            logging.info(f"Deleted entry with ID {entry_id}: {'Success' if deleted else 'Failed'}")
-            return deleted
+        logging.info(f"Deleted entry with ID {entry_id}: {'Success' if deleted else 'Failed'}")
+        if deleted and self.index_vectors:
+            self.vectors.remove(entry_id)
+        return deleted
 
     def has_entries(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM diary_entries')
-            count = cursor.fetchone()[0]
-            logging.info(f"Diary has {count} entries")
-            return count > 0
+            cursor.execute('SELECT EXISTS (SELECT 1 FROM diary_entries)')
+            has_entries = bool(cursor.fetchone()[0])
+            logging.info(f"Diary has entries: {has_entries}")
+            return has_entries
 
     def has_entries_for_period(self, period):
         logging.info(f"Checking for entries in period: {period}")
-        with sqlite3.connect(self.db_path) as conn:
+        start_date = period_start(period)
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
-            
-            now = datetime.datetime.now()
-            if period == 'day':
-                start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            elif period == 'week':
-                start_date = now - datetime.timedelta(days=now.weekday())
-                start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            elif period == 'month':
-                start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            elif period == 'year':
-                start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            else:
-                raise ValueError(f"Invalid period: {period}")
-            
-            start_date_str = start_date.strftime('%Y-%m-%d')
-            
             cursor.execute('''
-                SELECT COUNT(*) 
-                FROM diary_entries 
-                WHERE date(substr(timestamp, 1, 10)) >= date(?)
-            ''', (start_date_str,))
-            
-            count = cursor.fetchone()[0]
-            has_entries = count > 0
-            logging.info(f"Period {period} has entries: {has_entries} (Count: {count}, Start date: {start_date_str})")
+                SELECT EXISTS (
+                    SELECT 1
+                    FROM diary_entries
+                    WHERE ts_epoch >= ?
+                )
+            ''', (int(start_date.timestamp()),))
+
+            has_entries = bool(cursor.fetchone()[0])
+            logging.info(f"Period {period} has entries: {has_entries} (Start date: {start_date:%Y-%m-%d})")
             return has_entries
 
     def get_entries_for_period(self, period):
         logging.info(f"Retrieving diary entries for period: {period}")
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        start_date = period_start(period)
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
-            
-            now = datetime.datetime.now()
-            if period == 'day':
-                start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            elif period == 'week':
-                start_date = now - datetime.timedelta(days=now.weekday())
-                start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            elif period == 'month':
-                start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            elif period == 'year':
-                start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            else:
-                raise ValueError(f"Invalid period: {period}")
-            
-            start_date_str = start_date.strftime('%Y-%m-%d')
-            
             cursor.execute('''
-                SELECT id, timestamp, content 
-                FROM diary_entries 
-                WHERE date(substr(timestamp, 1, 10)) >= date(?)
-                ORDER BY timestamp DESC
-            ''', (start_date_str,))
-            
+                SELECT id, timestamp, content
+                FROM diary_entries
+                WHERE ts_epoch >= ?
+                ORDER BY ts_epoch DESC, id DESC
+            ''', (int(start_date.timestamp()),))
+
             entries = cursor.fetchall()
             entry_count = len(entries)
             logging.info(f"Retrieved {entry_count} entries for period: {period}")
-            
+
             if entry_count == 0:
                 logging.info(f"No entries found for period: {period}")
                 return []
-            
+
             return [{'id': row['id'], 'timestamp': row['timestamp'], 'content': row['content']} for row in entries]
\ No newline at end of file
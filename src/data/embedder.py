@@ -0,0 +1,117 @@
+import re
+import zlib
+import logging
+import collections
+import numpy as np
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+EMBEDDERS = ('hashing', 'openai')
+
+
+class HashingEmbedder:
+    """
+    Offline default: each word and the character `ngram`-grams inside it
+    (so "run" and "running" overlap) are hashed into `dim` buckets with a
+    random sign, weighted by sublinear term frequency and L2-normalized.
+    No model, no network, and the same text always gives the same vector.
+    """
+
+    def __init__(self, dim=512, ngram=4):
+        self.dim = dim
+        self.ngram = ngram
+        self.key = f"hashing-{dim}-{ngram}"
+
+    def features(self, text):
+        for word in WORD_PATTERN.findall(text.lower()):
+            yield word
+            padded = f"<{word}>"
+            for i in range(len(padded) - self.ngram + 1):
+                yield padded[i:i + self.ngram]
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = collections.Counter(self.features(text))
+            if not counts:
+                continue
+            hashes = np.fromiter((zlib.crc32(feature.encode('utf-8')) for feature in counts),
+                                 dtype=np.uint32, count=len(counts))
+            weights = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+            # The top bit picks the sign, so colliding features tend to cancel rather than pile up
+            weights[hashes >= 1 << 31] *= -1
+            np.add.at(matrix[row], hashes % self.dim, weights)
+        return normalize_rows(matrix)
+
+
+class ClientEmbedder:
+    """
+    Embeddings from an OpenAI-compatible client's embeddings endpoint.
+
+    The endpoint rejects empty inputs and inputs over the model's token
+    limit, and one rejected text fails its whole batch. Blank texts are
+    never sent and long ones are cut to `max_chars`. If a batch is still
+    rejected, its texts are retried one by one, and the ones rejected on
+    their own get a zero vector, which matches nothing. Other errors
+    (network, rate limits) propagate so the caller retries later.
+    """
+
+    def __init__(self, client, model, max_chars=20000):
+        self.client = client
+        self.model = model
+        self.max_chars = max_chars
+        self.key = f"openai-{model}"
+        self.dim = None
+
+    def embed(self, texts):
+        texts = [text[:self.max_chars] for text in texts]
+        rows = [index for index, text in enumerate(texts) if text.strip()]
+        vectors = {}
+        if rows:
+            try:
+                vectors.update(zip(rows, self._create([texts[index] for index in rows])))
+            except Exception as e:
+                if not _rejected(e):
+                    raise
+                for index in rows:
+                    try:
+                        vectors[index] = self._create([texts[index]])[0]
+                    except Exception as e:
+                        if not _rejected(e):
+                            raise
+                        logging.warning(f"Embedding input rejected, indexing it as empty: {e}")
+        if self.dim is None:
+            # Only a batch of nothing but blank or rejected texts needs the probe
+            self.dim = len(next(iter(vectors.values()), None) or self._create(["(empty)"])[0])
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for index, vector in vectors.items():
+            matrix[index] = vector
+        return normalize_rows(matrix)
+
+    def _create(self, texts):
+        response = self.client.embeddings.create(model=self.model, input=texts)
+        return [item.embedding for item in response.data]
+
+
+def _rejected(error):
+    # A 400 is about the input itself; retrying the same text cannot succeed
+    return getattr(error, 'status_code', None) == 400
+
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def create_embedder(config):
+    """
+    The embedder selected by config['embedder'].
+    """
+    name = config.get('embedder', 'hashing')
+    if name == 'hashing':
+        return HashingEmbedder(config.get('embedding_dim', 512))
+    if name == 'openai':
+        from ..ai.backend import shared_client
+        logging.info(f"Using {config['embedding_model']} embeddings")
+        return ClientEmbedder(shared_client(config), config['embedding_model'])
+    raise ValueError(f"Unknown embedder '{name}'. Expected one of: {', '.join(EMBEDDERS)}")
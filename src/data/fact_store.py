@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import datetime
+import threading
+from ..utils.config import get_config
+from .tenant import TenantStore
+from .similarity import MinHasher, SimilarityIndex, normalize
+from ..utils.tracing import span
+
+FACT_TABLES = ('user_profile', 'user_info')
+
+
+def fact_hash(text):
+    """
+    Key of a fact: the hash of its normalized text, so facts differing only
+    in case, punctuation or spacing are the same fact.
+    """
+    return hashlib.sha1(normalize(text).encode('utf-8')).hexdigest()
+
+
+def _latest(first, second):
+    return max(first, second) if first and second else first or second
+
+
+def _earliest(first, second):
+    return min(first, second) if first and second else first or second
+
+
+class FactStore(TenantStore):
+    """
+    Facts about the user kept in one table (user_profile or user_info).
+
+    Writes are upserts on fact_hash: a fact the model repeats bumps its
+    `seen` count and timestamp instead of adding a row. Once
+    `compact_every` new facts have accumulated, a compaction pass folds
+    near-duplicates (same fact, different wording) into one row.
+    """
+
+    def __init__(self, tenant, table, compact_every=None, threshold=None):
+        config = get_config()
+        super().__init__(tenant)
+        if table not in FACT_TABLES:
+            raise ValueError(f"Unknown fact table '{table}'. Expected one of: {', '.join(FACT_TABLES)}")
+        self.table = table
+        self.compact_every = compact_every or config.get('fact_compact_every', 25)
+        self.threshold = threshold or config.get('fact_merge_threshold', 0.8)
+        self.hasher = MinHasher()
+        # New facts since the last compaction; legacy rows count too, so an
+        # upgraded database is compacted on its first write
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.storage.ensure_schema()
+
+    def upsert(self, items):
+        """
+        Record `items`. Returns how many of them were new facts.
+        """
+        timestamp = datetime.datetime.now().isoformat()
+        facts = {}
+        for item in items:
+            item = item.strip()
+            if normalize(item):
+                facts.setdefault(fact_hash(item), item)
+        if not facts:
+            return 0
+        with span(f'db.upsert_{self.table}', rows=len(facts)) as stage, \
+                self.storage.transaction(immediate=True) as conn:
+            legacy = self._backfill(conn)
+            placeholders = ', '.join('?' * len(facts))
+            known = {row[0] for row in conn.execute(
+                f'SELECT fact_hash FROM {self.table} WHERE fact_hash IN ({placeholders})', list(facts))}
+            conn.executemany(f'''
+                INSERT INTO {self.table} (item, timestamp, first_seen, fact_hash, signature)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (fact_hash) DO UPDATE SET
+                    seen = seen + 1,
+                    timestamp = excluded.timestamp
+            ''', [(item, timestamp, timestamp, key, MinHasher.to_bytes(self.hasher.signature(item)))
+                  for key, item in facts.items()])
+            added = len(facts) - len(known)
+            stage.tag(added=added)
+            with self._lock:
+                self._pending += added + legacy
+                due = self._pending >= self.compact_every
+                if due:
+                    self._pending = 0
+            if due:
+                self._compact(conn)
+        return added
+
+    def compact(self):
+        """
+        Fold near-duplicate facts together. Returns how many rows were merged away.
+        """
+        with self.storage.transaction(immediate=True) as conn:
+            self._backfill(conn)
+            merged = self._compact(conn)
+        with self._lock:
+            self._pending = 0
+        return merged
+
+    def _compact(self, conn):
+        # The most-seen, then most recent, wording of each fact survives and
+        # takes the summed count, the earliest first_seen and latest timestamp
+        with span(f'db.compact_{self.table}') as stage:
+            rows = conn.execute(f'''
+                SELECT id, item, seen, timestamp, first_seen, signature FROM {self.table}
+                ORDER BY seen DESC, timestamp DESC
+            ''').fetchall()
+            index = SimilarityIndex(self.hasher.num_perm, threshold=self.threshold)
+            survivors, merged = {}, []
+            for row_id, item, seen, timestamp, first_seen, signature in rows:
+                signature = MinHasher.from_bytes(signature) if signature else self.hasher.signature(item or '')
+                match = index.query(signature)
+                if match is None:
+                    index.add(row_id, signature)
+                    survivors[row_id] = [seen, timestamp, first_seen, False]
+                    continue
+                survivor = survivors[match[0]]
+                survivor[0] += seen
+                survivor[1] = _latest(survivor[1], timestamp)
+                survivor[2] = _earliest(survivor[2], first_seen)
+                survivor[3] = True
+                merged.append((row_id,))
+            if merged:
+                conn.executemany(f'DELETE FROM {self.table} WHERE id = ?', merged)
+                conn.executemany(f'UPDATE {self.table} SET seen = ?, timestamp = ?, first_seen = ? WHERE id = ?',
+                                 [(seen, timestamp, first_seen, row_id)
+                                  for row_id, (seen, timestamp, first_seen, changed) in survivors.items() if changed])
+                logging.info(f"Compacted {self.table}: merged {len(merged)} of {len(rows)} facts")
+            stage.tag(rows=len(rows), merged=len(merged))
+        return len(merged)
+
+    def _backfill(self, conn):
+        """
+        Key rows written before facts were deduplicated, folding exact
+        duplicates among them together. Returns how many rows it touched.
+        """
+        rows = conn.execute(f'''
+            SELECT id, item, timestamp, seen FROM {self.table} WHERE fact_hash IS NULL ORDER BY id
+        ''').fetchall()
+        for row_id, item, timestamp, seen in rows:
+            key = fact_hash(item or '')
+            existing = conn.execute(f'SELECT id FROM {self.table} WHERE fact_hash = ?', (key,)).fetchone()
+            if existing:
+                conn.execute(f'''
+                    UPDATE {self.table} SET seen = seen + ?, timestamp = MAX(timestamp, ?),
+                        first_seen = MIN(COALESCE(first_seen, timestamp), ?)
+                    WHERE id = ?
+                ''', (seen, timestamp, timestamp, existing[0]))
+                conn.execute(f'DELETE FROM {self.table} WHERE id = ?', (row_id,))
+            else:
+                conn.execute(f'''
+                    UPDATE {self.table} SET fact_hash = ?, signature = ?, first_seen = COALESCE(first_seen, timestamp)
+                    WHERE id = ?
+                ''', (key, MinHasher.to_bytes(self.hasher.signature(item or '')), row_id))
+        if rows:
+            logging.info(f"Keyed {len(rows)} existing {self.table} rows")
+        return len(rows)
+
+    def get_facts(self, limit=None):
+        """
+        Facts, most recently seen first; at most `limit` of them.
+        """
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT id, item, timestamp, seen, first_seen FROM {self.table}
+                ORDER BY timestamp DESC LIMIT ?
+            ''', (-1 if limit is None else limit,))
+            return [{'id': row[0], 'item': row[1], 'timestamp': row[2], 'seen': row[3], 'first_seen': row[4]}
+                    for row in cursor.fetchall()]
+
+    def top_facts(self, limit):
+        """
+        The `limit` most often seen facts (most recent first among equals),
+        e.g. for the prompt.
+        """
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT item FROM {self.table}
+                ORDER BY seen DESC, timestamp DESC LIMIT ?
+            ''', (limit,))
+            return [row[0] for row in cursor.fetchall()]
+
+    def count(self):
+        with self.storage.transaction() as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+
+    def clear(self):
+        with self.storage.transaction(immediate=True) as conn:
+            conn.execute(f'DELETE FROM {self.table}')
+        with self._lock:
+            self._pending = 0
@@ -0,0 +1,41 @@
+import datetime
+from .tenant import TenantStore
+
+class ImportJournal(TenantStore):
+    """
+    Progress of bulk imports, keyed by absolute source path. A file counts as
+    done only while its size and modification time match what was imported.
+    """
+
+    def __init__(self, tenant):
+        super().__init__(tenant)
+        self._create_table()
+
+    def _create_table(self):
+        self.storage.ensure_schema()
+
+    def get_status(self, paths):
+        """
+        Map of path -> (status, size, mtime) for whichever of `paths` were seen before.
+        """
+        statuses = {}
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(paths), 500):
+                chunk = paths[start:start + 500]
+                placeholders = ', '.join('?' for _ in chunk)
+                cursor.execute(f'SELECT path, status, size, mtime FROM import_journal WHERE path IN ({placeholders})', chunk)
+                statuses.update({row[0]: (row[1], row[2], row[3]) for row in cursor.fetchall()})
+        return statuses
+
+    def record(self, results):
+        """
+        Store (path, size, mtime, status, error) rows. Joins the caller's transaction if one is open.
+        """
+        now = datetime.datetime.now().isoformat()
+        with self.storage.transaction(immediate=True) as conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO import_journal (path, size, mtime, status, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(path, size, mtime, status, error, now) for path, size, mtime, status, error in results])
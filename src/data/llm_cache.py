@@ -0,0 +1,111 @@
+import time
+import logging
+import threading
+from .tenant import TenantStore
+
+# Expired rows are dropped lazily by get(); the full-table sweep for the rest
+# (which also re-sums the cache size) runs at most this often
+SWEEP_SECONDS = 3600
+# LRU rows fetched per round when evicting for size
+EVICT_BATCH = 64
+
+class LLMCache(TenantStore):
+    """
+    Persistent cache of LLM responses in user_data.db with a TTL and a total
+    size bound. When the bound is exceeded the least recently used responses
+    are evicted first.
+    """
+
+    def __init__(self, tenant, ttl_seconds=30 * 24 * 3600, max_bytes=50 * 1024 * 1024):
+        super().__init__(tenant)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'bypassed': 0, 'bytes_saved': 0, 'evicted': 0}
+        self._stats_lock = threading.Lock()
+        # Bytes in the table as of the last sweep, plus our writes since
+        self._total = None
+        self._next_sweep = 0.0
+        self._create_table()
+
+    def _create_table(self):
+        self.storage.ensure_schema()
+
+    def get(self, key):
+        now = time.time()
+        with self.storage.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT response, size, created_at FROM llm_cache WHERE key = ?', (key,))
+            row = cursor.fetchone()
+            if row and now - row['created_at'] > self.ttl_seconds:
+                cursor.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                if self._total is not None:
+                    self._total -= row['size']
+                row = None
+            if row:
+                cursor.execute('UPDATE llm_cache SET last_access = ?, hits = hits + 1 WHERE key = ?', (now, key))
+        self._record('hits' if row else 'misses', row['size'] if row else 0)
+        return row['response'] if row else None
+
+    def put(self, key, model, response):
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self.storage.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT size FROM llm_cache WHERE key = ?', (key,))
+            replaced = cursor.fetchone()
+            cursor.execute('''
+                INSERT OR REPLACE INTO llm_cache (key, model, response, size, created_at, last_access, hits)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+            ''', (key, model, response, size, now, now))
+            self._evict(cursor, now, size - (replaced['size'] if replaced else 0))
+
+    def record_bypass(self):
+        self._record('bypassed', 0)
+
+    def clear(self):
+        with self.storage.transaction(immediate=True) as conn:
+            conn.execute('DELETE FROM llm_cache')
+            self._total = 0
+
+    def report(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        ratio = self.stats['hits'] / lookups if lookups else 0.0
+        return (f"LLM cache: {self.stats['hits']}/{lookups} hits ({ratio:.0%}), "
+                f"{self.stats['bypassed']} bypassed, {self.stats['bytes_saved']} bytes saved, "
+                f"{self.stats['evicted']} evicted")
+
+    def _evict(self, cursor, now, added):
+        evicted = 0
+        if self._total is None or now >= self._next_sweep:
+            cursor.execute('DELETE FROM llm_cache WHERE created_at < ?', (now - self.ttl_seconds,))
+            evicted = cursor.rowcount
+            # Re-sum too, picking up writes by other processes or cache instances
+            cursor.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache')
+            self._total = cursor.fetchone()[0]
+            self._next_sweep = now + SWEEP_SECONDS
+        else:
+            self._total += added
+        while self._total > self.max_bytes:
+            # Walk the LRU index a batch at a time until enough bytes are covered
+            cursor.execute('SELECT key, size FROM llm_cache ORDER BY last_access LIMIT ?', (EVICT_BATCH,))
+            rows = cursor.fetchall()
+            if not rows:
+                self._total = 0
+                break
+            victims = []
+            for row in rows:
+                if self._total <= self.max_bytes:
+                    break
+                victims.append((row['key'],))
+                self._total -= row['size']
+            cursor.executemany('DELETE FROM llm_cache WHERE key = ?', victims)
+            evicted += len(victims)
+        if evicted:
+            self._record('evicted', 0, evicted)
+            logging.info(f"Evicted {evicted} LLM cache entries")
+
+    def _record(self, outcome, size, count=1):
+        with self._stats_lock:
+            self.stats[outcome] += count
+            if outcome == 'hits':
+                self.stats['bytes_saved'] += size
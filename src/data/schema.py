@@ -0,0 +1,250 @@
+import logging
+
+# Ordered schema migrations for user_data.db. The applied version is stored in
+# PRAGMA user_version, so each step runs exactly once per database file.
+# Append new steps to the end; never edit or reorder a released one.
+
+
+def _create_base_tables(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS diary_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            content TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task TEXT,
+            completed INTEGER DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_info (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item TEXT,
+            timestamp TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_profile (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item TEXT,
+            timestamp TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_context (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            context TEXT,
+            period TEXT,
+            timestamp TEXT
+        )
+    ''')
+
+
+# Local ISO timestamp -> Unix epoch seconds. The 'utc' modifier treats the
+# input as local time, matching datetime.timestamp() on naive datetimes.
+EPOCH_FROM_TIMESTAMP_SQL = "CAST(strftime('%s', substr({column}, 1, 19), 'utc') AS INTEGER)"
+
+
+def _add_diary_epoch_column(conn):
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(diary_entries)')]
+    if 'ts_epoch' not in columns:
+        conn.execute('ALTER TABLE diary_entries ADD COLUMN ts_epoch INTEGER')
+    cursor = conn.execute(
+        f"UPDATE diary_entries SET ts_epoch = {EPOCH_FROM_TIMESTAMP_SQL.format(column='timestamp')} "
+        "WHERE ts_epoch IS NULL"
+    )
+    logging.info(f"Backfilled ts_epoch for {cursor.rowcount} diary entries")
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_diary_entries_ts_epoch ON diary_entries (ts_epoch)')
+    # Rows written without ts_epoch (e.g. by older builds) still get indexed.
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS diary_entries_fill_ts_epoch
+        AFTER INSERT ON diary_entries
+        WHEN NEW.ts_epoch IS NULL
+        BEGIN
+            UPDATE diary_entries
+            SET ts_epoch = {EPOCH_FROM_TIMESTAMP_SQL.format(column='NEW.timestamp')}
+            WHERE id = NEW.id;
+        END
+    ''')
+
+
+def fts5_available(conn):
+    return bool(conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+
+
+def _create_diary_fts(conn):
+    if not fts5_available(conn):
+        logging.warning("SQLite was built without FTS5; diary search falls back to LIKE scans")
+        return
+    # External-content table: the index stores only tokens, the text stays in
+    # diary_entries. Triggers keep it in sync row by row.
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS diary_fts USING fts5(
+            content,
+            content='diary_entries',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS diary_entries_fts_insert AFTER INSERT ON diary_entries BEGIN
+            INSERT INTO diary_fts (rowid, content) VALUES (NEW.id, NEW.content);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS diary_entries_fts_delete AFTER DELETE ON diary_entries BEGIN
+            INSERT INTO diary_fts (diary_fts, rowid, content) VALUES ('delete', OLD.id, OLD.content);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS diary_entries_fts_update AFTER UPDATE OF content ON diary_entries BEGIN
+            INSERT INTO diary_fts (diary_fts, rowid, content) VALUES ('delete', OLD.id, OLD.content);
+            INSERT INTO diary_fts (rowid, content) VALUES (NEW.id, NEW.content);
+        END
+    ''')
+    # One-off backfill of entries written before the index existed
+    conn.execute("INSERT INTO diary_fts (diary_fts) VALUES ('rebuild')")
+
+
+def _add_context_rollup_columns(conn):
+    # user_context rows with a period_start are rollups for one concrete
+    # day/week/month/year covering [start_epoch, end_epoch). Legacy rows keep
+    # period_start NULL, which the unique index treats as distinct.
+    conn.execute('ALTER TABLE user_context ADD COLUMN period_start TEXT')
+    conn.execute('ALTER TABLE user_context ADD COLUMN start_epoch INTEGER')
+    conn.execute('ALTER TABLE user_context ADD COLUMN end_epoch INTEGER')
+    conn.execute('ALTER TABLE user_context ADD COLUMN dirty INTEGER NOT NULL DEFAULT 0')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_user_context_rollup ON user_context (period, period_start)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_user_context_range ON user_context (start_epoch, end_epoch)')
+    # Any change to an entry bumps the dirty counter of every rollup covering it
+    mark_dirty = '''
+        UPDATE user_context SET dirty = dirty + 1
+        WHERE {epoch} >= start_epoch AND {epoch} < end_epoch;
+    '''
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS diary_entries_rollup_insert
+        AFTER INSERT ON diary_entries
+        WHEN NEW.ts_epoch IS NOT NULL
+        BEGIN {mark_dirty.format(epoch='NEW.ts_epoch')} END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS diary_entries_rollup_delete
+        AFTER DELETE ON diary_entries
+        BEGIN {mark_dirty.format(epoch='OLD.ts_epoch')} END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS diary_entries_rollup_update
+        AFTER UPDATE OF content, ts_epoch ON diary_entries
+        BEGIN
+            {mark_dirty.format(epoch='OLD.ts_epoch')}
+            {mark_dirty.format(epoch='NEW.ts_epoch')}
+        END
+    ''')
+
+
+def _create_summary_cache(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS summary_cache (
+            key TEXT PRIMARY KEY,
+            summary TEXT,
+            entry_count INTEGER,
+            created_at TEXT
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_summary_cache_created_at ON summary_cache (created_at)')
+
+
+def _create_llm_cache(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            model TEXT,
+            response TEXT,
+            size INTEGER,
+            created_at REAL,
+            last_access REAL,
+            hits INTEGER DEFAULT 0
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)')
+
+
+def _create_import_journal(conn):
+    # One row per source file seen by the bulk importer, written in the same
+    # transaction as its diary entry so an interrupted import resumes exactly
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS import_journal (
+            path TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime REAL,
+            status TEXT,
+            error TEXT,
+            updated_at TEXT
+        )
+    ''')
+
+
+def _add_task_signatures(conn):
+    # MinHash signature of each task for near-duplicate detection, the id of
+    # the task a flagged duplicate resembles, and how often a task was
+    # suggested (merged duplicates bump it instead of adding a row)
+    conn.execute('ALTER TABLE tasks ADD COLUMN signature BLOB')
+    conn.execute('ALTER TABLE tasks ADD COLUMN duplicate_of INTEGER')
+    conn.execute('ALTER TABLE tasks ADD COLUMN mentions INTEGER NOT NULL DEFAULT 1')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed)')
+
+
+def _add_fact_keys(conn):
+    # Profile and info facts are upserted on the hash of their normalized
+    # text; `seen` counts repeats. Existing rows keep a NULL fact_hash until
+    # the fact store keys them (folding exact duplicates) on its next write.
+    for table in ('user_profile', 'user_info'):
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN fact_hash TEXT')
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN signature BLOB')
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN seen INTEGER NOT NULL DEFAULT 1')
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN first_seen TEXT')
+        conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_fact_hash ON {table} (fact_hash)')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_timestamp ON {table} (timestamp)')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_seen ON {table} (seen, timestamp)')
+
+
+MIGRATIONS = [
+    (1, "base tables", _create_base_tables),
+    (2, "diary_entries.ts_epoch with index", _add_diary_epoch_column),
+    (3, "diary_fts full-text index", _create_diary_fts),
+    (4, "user_context rollup keys and dirty tracking", _add_context_rollup_columns),
+    (5, "summary_cache for memoized entry summaries", _create_summary_cache),
+    (6, "llm_cache for persisted completions", _create_llm_cache),
+    (7, "import_journal for resumable bulk imports", _create_import_journal),
+    (8, "task signatures for near-duplicate detection", _add_task_signatures),
+    (9, "user_profile/user_info fact keys for upserts", _add_fact_keys),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(conn):
+    """
+    Bring the database up to SCHEMA_VERSION. Must be called inside a transaction.
+    """
+    current = conn.execute('PRAGMA user_version').fetchone()[0]
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        logging.info(f"Applying schema migration {version}: {description}")
+        step(conn)
+        conn.execute(f'PRAGMA user_version = {version}')
+    # Migration 3 is a no-op on SQLite builds without FTS5, so a database
+    # created by one gets its search index the first time FTS5 is around.
+    if 3 <= current and fts5_available(conn) and not _has_table(conn, 'diary_fts'):
+        logging.info("FTS5 is available now; creating the diary search index")
+        _create_diary_fts(conn)
+    return max(current, SCHEMA_VERSION)
+
+
+def _has_table(conn, name):
+    return conn.execute('SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE name = ?)', (name,)).fetchone()[0] == 1
@@ -0,0 +1,133 @@
+import re
+import zlib
+import threading
+import numpy as np
+
+NORMALIZE_PATTERN = re.compile(r"[^\w]+", re.UNICODE)
+SIGNATURE_DTYPE = np.dtype('<u4')
+
+
+def normalize(text):
+    """
+    Lowercase, punctuation dropped, whitespace collapsed.
+    """
+    return NORMALIZE_PATTERN.sub(' ', text.lower()).strip()
+
+
+def shingles(text, size=4):
+    """
+    Character `size`-grams of the normalized text. Character shingles
+    suit short texts like tasks, where paraphrases share few whole words
+    ("20-minute walk" / "20 minute walk") but most of their letters.
+    """
+    text = f" {normalize(text)} "
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """
+    MinHash signatures: `num_perm` independent universal hashes of the
+    shingle set, keeping the minimum of each. The fraction of equal
+    positions in two signatures estimates the Jaccard similarity of the sets.
+    """
+
+    def __init__(self, num_perm=128, shingle_size=4, seed=1):
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: (a*x + b) mod 2^64, top 32 bits, a odd
+        self.a = rng.integers(0, 1 << 64, size=num_perm, dtype=np.uint64, endpoint=False) | np.uint64(1)
+        self.b = rng.integers(0, 1 << 64, size=num_perm, dtype=np.uint64, endpoint=False)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+    def signature(self, text):
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(text, self.shingle_size)),
+                             dtype=np.uint64)
+        # uint64 arithmetic wraps, which is the mod 2^64
+        permuted = (np.outer(hashes, self.a) + self.b) >> np.uint64(32)
+        return permuted.min(axis=0).astype(SIGNATURE_DTYPE)
+
+    @staticmethod
+    def to_bytes(signature):
+        return signature.astype(SIGNATURE_DTYPE, copy=False).tobytes()
+
+    @staticmethod
+    def from_bytes(data):
+        return np.frombuffer(data, dtype=SIGNATURE_DTYPE)
+
+
+def similarity(first, second):
+    return float(np.count_nonzero(first == second)) / first.size
+
+
+class SimilarityIndex:
+    """
+    Locality-sensitive hashing over MinHash signatures: each signature is
+    cut into `bands` bands, and items sharing any whole band land in the
+    same bucket. A lookup compares only against the items in its buckets,
+    so insert and query cost stays flat as the index grows.
+
+    With 128 permutations in 32 bands of 4, pairs at Jaccard 0.4 collide in
+    some band ~56% of the time, at 0.6 ~98%; candidates are then confirmed
+    against `threshold` on the full signature.
+    """
+
+    def __init__(self, num_perm=128, bands=32, threshold=0.6):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.signatures = {}
+        self.buckets = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def __contains__(self, key):
+        return key in self.signatures
+
+    def add(self, key, signature):
+        with self._lock:
+            self._remove(key)
+            self.signatures[key] = signature
+            for band, bucket_key in enumerate(self._band_keys(signature)):
+                self.buckets[band].setdefault(bucket_key, set()).add(key)
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def query(self, signature):
+        """
+        (key, estimated similarity) of the most similar item at or above
+        the threshold, or None.
+        """
+        with self._lock:
+            candidates = set()
+            for band, bucket_key in enumerate(self._band_keys(signature)):
+                candidates.update(self.buckets[band].get(bucket_key, ()))
+            best = None
+            for key in candidates:
+                score = similarity(signature, self.signatures[key])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (key, score)
+            return best
+
+    def _remove(self, key):
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, bucket_key in enumerate(self._band_keys(signature)):
+            bucket = self.buckets[band].get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[band][bucket_key]
+
+    def _band_keys(self, signature):
+        data = signature.tobytes()
+        width = self.rows * signature.itemsize
+        return [data[band * width:(band + 1) * width] for band in range(self.bands)]
@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from . import schema
+
+# Pragmas applied to every pooled connection. WAL lets the UI thread keep
+# reading while a worker thread writes; NORMAL sync is durable in WAL mode
+# apart from the last transactions on power loss.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,        # negative value = KiB, i.e. ~16 MB page cache
+    'mmap_size': 134217728,      # 128 MB memory-mapped I/O
+    'temp_store': 'MEMORY',
+}
+
+BUSY_TIMEOUT_SECONDS = 5.0
+
+
+class StorageEngine:
+    """
+    Per-thread pool of SQLite connections to a single database file.
+    Each thread gets one long-lived connection; connections owned by
+    threads that have exited are closed the next time the pool grows.
+    """
+
+    def __init__(self, db_path, pragmas=None):
+        self.db_path = db_path
+        self.pragmas = dict(DEFAULT_PRAGMAS, **(pragmas or {}))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._prune_dead_threads()
+                self._connections[threading.get_ident()] = (threading.current_thread(), conn)
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        """
+        Run the enclosed statements in a single transaction on this thread's
+        connection. Nested calls join the outermost transaction.
+
+        Writers should pass immediate=True: the write lock is then taken up
+        front, waiting out other writers for up to BUSY_TIMEOUT_SECONDS. A
+        deferred transaction that starts writing while another connection
+        commits fails at once with "database is locked" in WAL mode.
+        """
+        conn = self.connection()
+        if self._local.depth == 0:
+            conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+        self._local.depth += 1
+        try:
+            yield conn
+        except BaseException:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.rollback()
+            raise
+        else:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.commit()
+
+    def ensure_schema(self):
+        """
+        Apply pending schema migrations once per engine.
+        """
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                with self.transaction(immediate=True) as conn:
+                    version = schema.migrate(conn)
+                self._schema_ready = True
+                logging.info(f"Schema of {self.db_path} is at version {version}")
+
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    def close(self):
+        """
+        Close every pooled connection. Threads that use the engine afterwards
+        transparently reconnect.
+        """
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for _, conn in connections:
+            conn.close()
+        self._local = threading.local()
+        logging.info(f"Closed {len(connections)} connection(s) to {self.db_path}")
+
+    def _connect(self):
+        # isolation_level=None puts the driver in autocommit mode so that
+        # transaction() fully controls BEGIN/COMMIT. check_same_thread is off
+        # only so that close() may be called from any thread; each connection
+        # is still used by exactly one thread.
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS,
+                               isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        logging.info(f"Opened pooled connection to {self.db_path} for thread {threading.current_thread().name}")
+        return conn
+
+    def _prune_dead_threads(self):
+        for ident, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                conn.close()
+                del self._connections[ident]
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_storage(db_path):
+    """
+    Return the shared StorageEngine for a database file, creating it on first use.
+    """
+    key = os.path.abspath(db_path)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = StorageEngine(key)
+            _engines[key] = engine
+        return engine
+
+
+def close_storage(db_path):
+    """
+    Close and forget the shared StorageEngine for a database file, if any.
+    """
+    with _engines_lock:
+        engine = _engines.pop(os.path.abspath(db_path), None)
+    if engine is not None:
+        engine.close()
@@ -0,0 +1,39 @@
+import datetime
+import logging
+from .tenant import TenantStore
+
+# Memoized summaries only matter while their entries are still the recent
+# ones a chat turn summarizes (a week at most); older rows are dropped
+# whenever a new summary is stored.
+RETENTION_DAYS = 7
+
+class SummaryCache(TenantStore):
+    def __init__(self, tenant):
+        super().__init__(tenant)
+        self._create_table()
+
+    def _create_table(self):
+        self.storage.ensure_schema()
+
+    def get_many(self, keys):
+        """
+        Map of key -> summary for whichever of `keys` are cached.
+        """
+        if not keys:
+            return {}
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            placeholders = ', '.join('?' for _ in keys)
+            cursor.execute(f'SELECT key, summary FROM summary_cache WHERE key IN ({placeholders})', list(keys))
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def put(self, key, summary, entry_count):
+        now = datetime.datetime.now()
+        cutoff = (now - datetime.timedelta(days=RETENTION_DAYS)).isoformat()
+        with self.storage.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('INSERT OR REPLACE INTO summary_cache (key, summary, entry_count, created_at) VALUES (?, ?, ?, ?)',
+                           (key, summary, entry_count, now.isoformat()))
+            cursor.execute('DELETE FROM summary_cache WHERE created_at < ?', (cutoff,))
+            if cursor.rowcount:
+                logging.info(f"Pruned {cursor.rowcount} expired summary cache rows")
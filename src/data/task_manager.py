@@ -1,47 +1,112 @@
-import sqlite3
-import os
+import logging
+import threading
 from ..utils.config import get_config
+from .tenant import TenantStore
+from .similarity import MinHasher, SimilarityIndex
+from ..utils.tracing import span
 
-class TaskManager:
-    def __init__(self, user_data_folder):
+DEDUP_MODES = ('merge', 'flag', 'off')
+
+class TaskManager(TenantStore):
+    def __init__(self, tenant, dedup=None, threshold=None):
         config = get_config()
-        self.db_path = os.path.join(user_data_folder, 'user_data.db')
+        super().__init__(tenant)
+        # 'merge' folds a near-duplicate of an open task into it, 'flag' keeps
+        # it but records which task it resembles, 'off' inserts everything
+        self.dedup = dedup or config.get('task_dedup', 'merge')
+        if self.dedup not in DEDUP_MODES:
+            raise ValueError(f"Unknown task dedup mode '{self.dedup}'. Expected one of: {', '.join(DEDUP_MODES)}")
+        self.hasher = MinHasher()
+        self.index = SimilarityIndex(self.hasher.num_perm,
+                                     threshold=threshold or config.get('task_dedup_threshold', 0.6))
+        self._index_loaded = False
+        self._index_lock = threading.Lock()
         self._create_table()
 
     def _create_table(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task TEXT,
-                    completed INTEGER DEFAULT 0
-                )
-            ''')
+        self.storage.ensure_schema()
 
     def add_tasks(self, tasks):
-        with sqlite3.connect(self.db_path) as conn:
+        """
+        Insert `tasks`, checking each against the open tasks (and the ones
+        before it in the batch) for near-duplicates. Returns how many were
+        added, merged and flagged.
+        """
+        counts = {'added': 0, 'merged': 0, 'flagged': 0}
+        with span('db.add_tasks', rows=len(tasks)) as stage, self.storage.transaction(immediate=True) as conn:
             cursor = conn.cursor()
-            cursor.executemany('INSERT INTO tasks (task) VALUES (?)', 
-                               [(task,) for task in tasks])
+            if self.dedup == 'off':
+                cursor.executemany('INSERT INTO tasks (task) VALUES (?)', 
+                                   [(task,) for task in tasks])
+                counts['added'] = len(tasks)
+                return counts
+            self._load_index(cursor)
+            indexed = []
+            try:
+                for task in tasks:
+                    signature = self.hasher.signature(task)
+                    match = self.index.query(signature)
+                    if match and self.dedup == 'merge':
+                        cursor.execute('UPDATE tasks SET mentions = mentions + 1 WHERE id = ?', (match[0],))
+                        counts['merged'] += 1
+                        continue
+                    cursor.execute('INSERT INTO tasks (task, signature, duplicate_of) VALUES (?, ?, ?)',
+                                   (task, MinHasher.to_bytes(signature), match[0] if match else None))
+                    self.index.add(cursor.lastrowid, signature)
+                    indexed.append(cursor.lastrowid)
+                    counts['flagged' if match else 'added'] += 1
+            except BaseException:
+                # The rows roll back, so must their index entries
+                for task_id in indexed:
+                    self.index.remove(task_id)
+                raise
+            stage.tag(**counts)
+        if counts['merged'] or counts['flagged']:
+            logging.info(f"Task dedup: {counts}")
+        return counts
+
+    def _load_index(self, cursor):
+        """
+        Index the open tasks on first use, computing and storing signatures
+        for tasks saved before they were kept.
+        """
+        with self._index_lock:
+            if self._index_loaded:
+                return
+            cursor.execute('SELECT id, task, signature FROM tasks WHERE completed = 0')
+            missing = []
+            for row in cursor.fetchall():
+                if row[2] is None:
+                    signature = self.hasher.signature(row[1] or '')
+                    missing.append((MinHasher.to_bytes(signature), row[0]))
+                else:
+                    signature = MinHasher.from_bytes(row[2])
+                self.index.add(row[0], signature)
+            if missing:
+                cursor.executemany('UPDATE tasks SET signature = ? WHERE id = ?', missing)
+                logging.info(f"Computed signatures for {len(missing)} existing tasks")
+            self._index_loaded = True
 
     def get_tasks(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT id, task, completed FROM tasks')
-            return [{'id': row[0], 'task': row[1], 'completed': bool(row[2])} for row in cursor.fetchall()]
+            cursor.execute('SELECT id, task, completed, mentions, duplicate_of FROM tasks')
+            return [{'id': row[0], 'task': row[1], 'completed': bool(row[2]), 'mentions': row[3],
+                     'duplicate_of': row[4]} for row in cursor.fetchall()]
 
     def complete_task(self, task_id):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.storage.transaction(immediate=True) as conn:
             cursor = conn.cursor()
             cursor.execute('UPDATE tasks SET completed = 1 WHERE id = ?', (task_id,))
+        self.index.remove(task_id)
 
     def delete_task(self, task_id):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.storage.transaction(immediate=True) as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+        self.index.remove(task_id)
 
     def clear_completed_tasks(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.storage.transaction(immediate=True) as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM tasks WHERE completed = 1')
\ No newline at end of file
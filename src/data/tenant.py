@@ -0,0 +1,177 @@
+import os
+import re
+import logging
+import threading
+import collections
+from contextlib import contextmanager
+from .storage import get_storage, close_storage
+from .vector_index import close_vector_index
+
+DB_NAME = 'user_data.db'
+USER_ID_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$')
+
+
+class Tenant:
+    """
+    Handle to one user's data: a folder holding their own user_data.db.
+    Data classes take a Tenant (or, for the single-user desktop app, a
+    plain folder path) and reach the database through it.
+    """
+
+    def __init__(self, folder, user_id=None):
+        self.folder = folder
+        self.user_id = user_id
+        self.db_path = os.path.join(folder, DB_NAME)
+        self.leases = 0
+        # Set by TenantRegistry once an evicted tenant starts and finishes closing
+        self.closing = False
+        self.closed = threading.Event()
+
+    @property
+    def storage(self):
+        # Looked up on every use, so stores keep working after an eviction closed the engine
+        return get_storage(self.db_path)
+
+    def close(self):
+        close_storage(self.db_path)
+        close_vector_index(self.folder)
+
+    def __repr__(self):
+        return f"Tenant({self.user_id or self.folder!r})"
+
+
+def as_tenant(tenant):
+    return tenant if isinstance(tenant, Tenant) else Tenant(tenant)
+
+
+class TenantStore:
+    """
+    Base of the data classes: binds them to a tenant's database.
+    """
+
+    def __init__(self, tenant):
+        self.tenant = as_tenant(tenant)
+        self.db_path = self.tenant.db_path
+
+    @property
+    def storage(self):
+        return self.tenant.storage
+
+
+class TenantRegistry:
+    """
+    Tenants under a root folder, one subfolder per user id. At most
+    `max_open` tenants keep their database open; opening another closes
+    the least recently used idle one, so file descriptors and page caches
+    stay bounded however many users there are. Tenants in use (see lease())
+    are never closed under their users.
+
+    `on_evict(tenant)` is called, outside the registry lock, before an
+    evicted tenant's database is closed, to release whatever was built on it.
+    The database and vector index are shared by path, so a user acquired
+    again meanwhile keeps them open, and one acquired while they close waits.
+    """
+
+    def __init__(self, root_folder, max_open=256, on_evict=None):
+        self.root_folder = root_folder
+        self.max_open = max_open
+        self.on_evict = on_evict
+        self.stats = {'opened': 0, 'evicted': 0}
+        self._open = collections.OrderedDict()
+        self._evicting = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        return self._acquire(user_id, lease=False)
+
+    def acquire(self, user_id):
+        """
+        The tenant for `user_id`, pinned open until release(tenant).
+        May close evicted tenants, so call it where blocking is fine.
+        """
+        return self._acquire(user_id, lease=True)
+
+    def release(self, tenant):
+        with self._lock:
+            tenant.leases -= 1
+
+    @contextmanager
+    def lease(self, user_id):
+        tenant = self.acquire(user_id)
+        try:
+            yield tenant
+        finally:
+            self.release(tenant)
+
+    def _acquire(self, user_id, lease):
+        if not isinstance(user_id, str) or not USER_ID_PATTERN.match(user_id):
+            raise ValueError(f"Invalid user id {user_id!r}: use letters, digits, '_', '-' or '.' (max 64)")
+        while True:
+            with self._lock:
+                closing = [old for old in self._evicting.get(user_id, ()) if old.closing]
+                if not closing:
+                    tenant = self._acquire_locked(user_id, lease)
+                    evicted = self._select_evictions()
+                    break
+            for old in closing:
+                old.closed.wait()
+        self._close(evicted)
+        return tenant
+
+    def _acquire_locked(self, user_id, lease):
+        tenant = self._open.get(user_id)
+        if tenant is None:
+            folder = os.path.join(self.root_folder, user_id)
+            os.makedirs(folder, exist_ok=True)
+            tenant = Tenant(folder, user_id)
+            self._open[user_id] = tenant
+            self.stats['opened'] += 1
+        else:
+            self._open.move_to_end(user_id)
+        if lease:
+            tenant.leases += 1
+        return tenant
+
+    def open_count(self):
+        with self._lock:
+            return len(self._open)
+
+    def close(self):
+        with self._lock:
+            tenants = list(self._open.values())
+            self._open.clear()
+        self._close(tenants)
+
+    def _select_evictions(self):
+        evicted = []
+        for user_id, tenant in list(self._open.items()):
+            if len(self._open) <= self.max_open:
+                break
+            if tenant.leases == 0:
+                del self._open[user_id]
+                self._evicting.setdefault(user_id, []).append(tenant)
+                evicted.append(tenant)
+        self.stats['evicted'] += len(evicted)
+        return evicted
+
+    def _close(self, tenants):
+        for tenant in tenants:
+            try:
+                if self.on_evict:
+                    self.on_evict(tenant)
+            except Exception as e:
+                logging.error(f"Error releasing {tenant}: {e}", exc_info=True)
+            with self._lock:
+                # Re-acquired during on_evict: the new tenant shares the engine
+                tenant.closing = tenant.user_id not in self._open
+            try:
+                if tenant.closing:
+                    tenant.close()
+            finally:
+                with self._lock:
+                    evicting = self._evicting.get(tenant.user_id, [])
+                    if tenant in evicting:
+                        evicting.remove(tenant)
+                    if not evicting:
+                        self._evicting.pop(tenant.user_id, None)
+                tenant.closed.set()
@@ -1,40 +1,19 @@
-import os
-import sqlite3
-import datetime
-from ..utils.config import get_config
+from .fact_store import FactStore
+from ..utils.tracing import span
 
-class UserInfo:
-    def __init__(self, user_data_folder):
-        config = get_config()
-        self.db_path = os.path.join(user_data_folder, 'user_data.db')
-        self._create_table()
-
-    def _create_table(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_info (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    item TEXT,
-                    timestamp TEXT
-                )
-            ''')
+class UserInfo(FactStore):
+    def __init__(self, tenant):
+        super().__init__(tenant, 'user_info')
 
     def update_info(self, new_items):
-        timestamp = datetime.datetime.now().isoformat()
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.executemany('INSERT INTO user_info (item, timestamp) VALUES (?, ?)', 
-                               [(item, timestamp) for item in new_items])
+        with span('db.update_info', rows=len(new_items)):
+            return self.upsert(new_items)
 
-    def get_info(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT item, timestamp FROM user_info ORDER BY timestamp DESC')
-            return [{'item': row[0], 'timestamp': row[1]} for row in cursor.fetchall()]
+    def get_info(self, limit=None):
+        return self.get_facts(limit)
 
     def get_latest_info(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT item FROM user_info 
@@ -43,6 +22,4 @@ class UserInfo:
             return [row[0] for row in cursor.fetchall()]
 
     def clear_info(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM user_info')
\ No newline at end of file
+        self.clear()
\ No newline at end of file
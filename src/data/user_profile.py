@@ -1,58 +1,24 @@
-import os
-import sqlite3
 import datetime
-from ..utils.config import get_config
+from .fact_store import FactStore
+from ..utils.tracing import span
 
-class UserProfile:
-    def __init__(self, user_data_folder):
-        config = get_config()
-        self.db_path = os.path.join(user_data_folder, 'user_data.db')
-        self._create_tables()
-
-    def _create_tables(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Create user_profile table if it doesn't exist
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_profile (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    item TEXT,
-                    timestamp TEXT
-                )
-            ''')
-            
-            # Create user_context table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_context (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    context TEXT,
-                    period TEXT,
-                    timestamp TEXT
-                )
-            ''')
+class UserProfile(FactStore):
+    def __init__(self, tenant):
+        super().__init__(tenant, 'user_profile')
 
     def update_profile(self, new_items):
-        timestamp = datetime.datetime.now().isoformat()
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.executemany('INSERT INTO user_profile (item, timestamp) VALUES (?, ?)', 
-                               [(item, timestamp) for item in new_items])
+        with span('db.update_profile', rows=len(new_items)):
+            return self.upsert(new_items)
 
-    def get_profile(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT item, timestamp FROM user_profile ORDER BY timestamp DESC')
-            return [{'item': row[0], 'timestamp': row[1]} for row in cursor.fetchall()]
+    def get_profile(self, limit=None):
+        return self.get_facts(limit)
 
     def clear_profile(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM user_profile')
+        self.clear()
     
     def store_context(self, context, period):
         timestamp = datetime.datetime.now().isoformat()
-        with sqlite3.connect(self.db_path) as conn:
+        with self.storage.transaction(immediate=True) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT OR REPLACE INTO user_context (context, period, timestamp)
@@ -60,7 +26,7 @@ class UserProfile:
             ''', (context, period, timestamp))
 
     def get_latest_context(self, period):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT context FROM user_context
@@ -72,7 +38,7 @@ class UserProfile:
             return result[0] if result else None
 
     def context_needs_update(self, period):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.storage.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT timestamp FROM user_context
@@ -96,4 +62,35 @@ class UserProfile:
             elif period == 'year':
                 return last_update.year != now.year
             else:
-                return True 
\ No newline at end of file
+                return True
+
+    def get_rollup(self, period, period_start):
+        """
+        Stored rollup for one concrete period (e.g. 'week' starting '2024-05-06'),
+        as {'context': ..., 'dirty': n} where n counts diary changes since it was built.
+        """
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT context, dirty FROM user_context
+                WHERE period = ? AND period_start = ?
+            ''', (period, period_start))
+            result = cursor.fetchone()
+            return {'context': result[0], 'dirty': result[1]} if result else None
+
+    def store_rollup(self, period, period_start, start_epoch, end_epoch, context, seen_dirty=0):
+        """
+        Insert or refresh a rollup. Only the `seen_dirty` changes it was built
+        from are cleared, so edits made while it was being computed stay pending.
+        """
+        timestamp = datetime.datetime.now().isoformat()
+        with self.storage.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO user_context (context, period, timestamp, period_start, start_epoch, end_epoch, dirty)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT (period, period_start) DO UPDATE SET
+                    context = excluded.context,
+                    timestamp = excluded.timestamp,
+                    dirty = MAX(dirty - ?, 0)
+            ''', (context, period, timestamp, period_start, start_epoch, end_epoch, seen_dirty))
@@ -0,0 +1,206 @@
+import os
+import json
+import logging
+import threading
+import numpy as np
+from ..utils.config import get_config
+from ..utils.tracing import span
+from .storage import get_storage
+from .embedder import create_embedder
+
+VECTORS_FILE = 'diary_vectors.f32'
+IDS_FILE = 'diary_vectors.ids'
+META_FILE = 'diary_vectors.json'
+SYNC_BATCH = 512
+MIN_CAPACITY = 1024
+
+
+class VectorIndex:
+    """
+    Embeddings of one diary's entries for similarity search.
+
+    Vectors are rows of a float32 matrix memory-mapped from
+    `folder`/diary_vectors.f32 (L2-normalized, so a dot product is the
+    cosine), with the entry id of each row in diary_vectors.ids. The
+    database stays the source of truth: sync() embeds the entries added
+    since the last call, whichever path added them, and a different
+    embedder than the one the files were built with starts them over.
+    """
+
+    def __init__(self, folder, db_path, embedder):
+        self.folder = folder
+        self.db_path = db_path
+        self.embedder = embedder
+        self.vectors_path = os.path.join(folder, VECTORS_FILE)
+        self.ids_path = os.path.join(folder, IDS_FILE)
+        self.meta_path = os.path.join(folder, META_FILE)
+        self._vectors = None
+        self._ids = None
+        self._lock = threading.RLock()
+        self._load_meta()
+
+    def __len__(self):
+        return self.count
+
+    def _load_meta(self):
+        meta = {}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+        self.dim = meta.get('dim')
+        self.count = meta.get('count', 0)
+        self.last_id = meta.get('last_id', 0)
+        if meta and meta.get('embedder') != self.embedder.key:
+            logging.info(f"Diary vectors were built with {meta.get('embedder')}; rebuilding with {self.embedder.key}")
+            self._reset()
+        elif self.count and not self._open():
+            logging.warning(f"Diary vector files in {self.folder} are incomplete; rebuilding")
+            self._reset()
+
+    def _open(self):
+        capacity = os.path.getsize(self.vectors_path) // (4 * self.dim) if os.path.exists(self.vectors_path) else 0
+        if capacity < self.count or not os.path.exists(self.ids_path) or \
+                os.path.getsize(self.ids_path) < capacity * 8:
+            return False
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r+', shape=(capacity, self.dim))
+        self._ids = np.memmap(self.ids_path, dtype=np.int64, mode='r+', shape=(capacity,))
+        return True
+
+    def _reset(self):
+        self._release()
+        for path in (self.vectors_path, self.ids_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.dim = None
+        self.count = 0
+        self.last_id = 0
+
+    def _release(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._ids.flush()
+        self._vectors = self._ids = None
+
+    def _mapped(self):
+        # Closed indexes (e.g. of an evicted tenant) map their files again on next use
+        if self._vectors is None and self.count:
+            self._open()
+        return self.count
+
+    def _ensure_capacity(self, rows, dim):
+        if self.dim is None:
+            self.dim = dim
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if self.count + rows <= capacity:
+            return
+        # Grow by doubling, so appends are amortized O(1)
+        capacity = max(MIN_CAPACITY, 2 * capacity, self.count + rows)
+        self._release()
+        for path, row_bytes in ((self.vectors_path, 4 * self.dim), (self.ids_path, 8)):
+            with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+                f.truncate(capacity * row_bytes)
+        self._open()
+
+    def _write_meta(self):
+        # Rows past `count` are ignored on reopen, so a crash before this
+        # point only means those entries are embedded again. The mapped pages
+        # are left to the OS to write back (like synchronous=NORMAL for the
+        # database): after a power loss the newest rows may read as zero
+        # vectors, which only keeps them out of results.
+        temporary = self.meta_path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump({'embedder': self.embedder.key, 'dim': self.dim, 'count': self.count,
+                       'last_id': self.last_id}, f)
+        os.replace(temporary, self.meta_path)
+
+    def sync(self):
+        """
+        Embed the entries added since the last sync. Returns how many.
+        Entry ids only grow, so "added since" is "id above the last one seen".
+        """
+        added = 0
+        with self._lock, span('vectors.sync') as stage:
+            while True:
+                with get_storage(self.db_path).transaction() as conn:
+                    rows = conn.execute('SELECT id, content FROM diary_entries WHERE id > ? ORDER BY id LIMIT ?',
+                                        (self.last_id, SYNC_BATCH)).fetchall()
+                if not rows:
+                    break
+                matrix = self.embedder.embed([row[1] or '' for row in rows])
+                self._mapped()
+                self._ensure_capacity(len(rows), matrix.shape[1])
+                self._vectors[self.count:self.count + len(rows)] = matrix
+                self._ids[self.count:self.count + len(rows)] = [row[0] for row in rows]
+                self.count += len(rows)
+                self.last_id = rows[-1][0]
+                self._write_meta()
+                added += len(rows)
+            stage.tag(added=added, rows=self.count)
+        if added > 1:
+            logging.info(f"Embedded {added} diary entries ({self.count} indexed)")
+        return added
+
+    def remove(self, entry_id):
+        """
+        Drop a deleted entry. Its row is zeroed and left in place; a zero
+        vector scores 0 against every query.
+        """
+        with self._lock:
+            if not self._mapped():
+                return
+            rows = np.flatnonzero(self._ids[:self.count] == entry_id)
+            if rows.size:
+                self._vectors[rows] = 0
+                self._ids[rows] = -1
+
+    def search(self, text, limit=5, exclude_ids=(), min_score=0.0):
+        """
+        (entry id, cosine similarity) of the `limit` entries most similar
+        to `text` scoring above `min_score`, best first.
+        """
+        if limit <= 0:
+            return []
+        query = self.embedder.embed([text])[0]
+        self.sync()
+        with self._lock, span('vectors.search', rows=self.count):
+            if not self._mapped() or not query.any():
+                return []
+            scores = self._vectors[:self.count] @ query
+            wanted = min(limit + len(exclude_ids), self.count)
+            top = np.argpartition(-scores, wanted - 1)[:wanted]
+            top = top[np.argsort(-scores[top])]
+            excluded = set(exclude_ids)
+            hits = [(int(self._ids[row]), float(scores[row])) for row in top]
+        return [(entry_id, score) for entry_id, score in hits
+                if score > min_score and entry_id not in excluded][:limit]
+
+    def close(self):
+        with self._lock:
+            self._release()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_vector_index(tenant, embedder=None):
+    """
+    Return the shared VectorIndex of a tenant's folder, opening it on first use.
+    """
+    key = os.path.abspath(tenant.folder)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = VectorIndex(key, tenant.db_path, embedder or create_embedder(get_config()))
+            _indexes[key] = index
+        return index
+
+
+def close_vector_index(folder):
+    """
+    Close and forget the shared VectorIndex of a tenant folder, if open.
+    """
+    with _indexes_lock:
+        index = _indexes.pop(os.path.abspath(folder), None)
+    if index is not None:
+        index.close()
@@ -0,0 +1,236 @@
+"""
+Bulk import of an existing journal into the diary: text/markdown files are
+read as-is, voice memos are transcribed concurrently. Entries keep their
+original timestamps (from the file name when it contains one, otherwise the
+file's modification time).
+
+Progress is journaled in user_data.db in the same transaction as the
+entries, so an interrupted import can simply be run again: files already
+imported are skipped, failed ones are retried.
+
+Usage:
+    python -m src.importer SOURCE [--workers 4] [--rate 50] [--batch-size 200]
+"""
+import os
+import re
+import time
+import logging
+import argparse
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .utils.config import get_config
+from .data.diary_entry import DiaryEntry
+from .data.import_journal import ImportJournal
+from .data.tenant import TenantRegistry
+
+TEXT_EXTENSIONS = {'.txt', '.md', '.markdown'}
+AUDIO_EXTENSIONS = {'.wav', '.flac', '.ogg', '.oga', '.opus', '.mp3', '.mpga', '.mpeg', '.m4a', '.mp4', '.webm'}
+# 2024-05-01, 2024-05-01T10-30-00, 2024-05-01 10.30, 20240501_103000, ...
+FILENAME_TIMESTAMP = re.compile(
+    r'(?P<year>(?:19|20)\d{2})[-_.]?(?P<month>[01]\d)[-_.]?(?P<day>[0-3]\d)'
+    r'(?:[T _-]?(?P<hour>[0-2]\d)[-_.:h]?(?P<minute>[0-5]\d)(?:[-_.:m]?(?P<second>[0-5]\d))?)?'
+)
+
+
+class RateLimiter:
+    """
+    Token bucket shared by the transcription workers: at most `per_minute`
+    requests per minute, with bursts of up to `burst`.
+    """
+
+    def __init__(self, per_minute, burst=1):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.interval)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.interval
+            time.sleep(wait)
+
+
+def discover(source):
+    """
+    Importable files under `source`, as (path, kind) sorted by path.
+    """
+    found = []
+    for folder, _, names in os.walk(source):
+        for name in names:
+            extension = os.path.splitext(name)[1].lower()
+            if name.startswith('.'):
+                continue
+            if extension in TEXT_EXTENSIONS:
+                found.append((os.path.abspath(os.path.join(folder, name)), 'text'))
+            elif extension in AUDIO_EXTENSIONS:
+                found.append((os.path.abspath(os.path.join(folder, name)), 'audio'))
+    return sorted(found)
+
+
+def original_timestamp(path):
+    match = FILENAME_TIMESTAMP.search(os.path.basename(path))
+    if match:
+        parts = {key: int(value) for key, value in match.groupdict().items() if value is not None}
+        try:
+            return datetime.datetime(parts['year'], parts['month'], parts['day'],
+                                     parts.get('hour', 0), parts.get('minute', 0), parts.get('second', 0))
+        except ValueError:
+            pass
+    return datetime.datetime.fromtimestamp(os.path.getmtime(path))
+
+
+def read_text(path):
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return f.read().strip()
+
+
+class Importer:
+    def __init__(self, tenant, transcriber=None, workers=4, rate_per_minute=50, batch_size=200,
+                 language=None):
+        self.diary_entry = DiaryEntry(tenant)
+        self.journal = ImportJournal(tenant)
+        self.transcriber = transcriber
+        self.workers = workers
+        self.rate_limiter = RateLimiter(rate_per_minute, burst=workers)
+        self.batch_size = batch_size
+        self.language = language
+        self.stats = {'imported': 0, 'empty': 0, 'failed': 0, 'skipped': 0}
+        self._pending = []
+
+    def run(self, source, retry_failed=True):
+        files = discover(source)
+        todo = self._filter_done(files, retry_failed)
+        self.stats['skipped'] = len(files) - len(todo)
+        logging.info(f"Importing {len(todo)} of {len(files)} files from {source}")
+        started = time.perf_counter()
+        try:
+            for path, kind in todo:
+                if kind == 'text':
+                    self._add(path, self._read(path))
+            audio = [path for path, kind in todo if kind == 'audio']
+            if audio:
+                self._transcribe_all(audio, started)
+        finally:
+            # Whatever finished before an interruption is kept
+            self._flush()
+        logging.info(f"Import finished in {time.perf_counter() - started:.1f} s: {self.stats}")
+        return self.stats
+
+    def _filter_done(self, files, retry_failed):
+        seen = self.journal.get_status([path for path, _ in files])
+        todo = []
+        for path, kind in files:
+            status = seen.get(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Gone since discovery; reading it records the failure
+                todo.append((path, kind))
+                continue
+            unchanged = status and status[1] == stat.st_size and status[2] == stat.st_mtime
+            if unchanged and (status[0] != 'failed' or not retry_failed):
+                continue
+            todo.append((path, kind))
+        return todo
+
+    def _read(self, path):
+        try:
+            return read_text(path), None
+        except OSError as e:
+            return None, str(e)
+
+    def _transcribe(self, path):
+        self.rate_limiter.acquire()
+        try:
+            return self.transcriber.transcribe(path, language=self.language, raise_errors=True).strip(), None
+        except Exception as e:
+            return None, str(e)
+
+    def _transcribe_all(self, paths, started):
+        if self.transcriber is None:
+            from .audio.transcriber import Transcriber
+            self.transcriber = Transcriber()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="import-transcribe")
+        futures = {executor.submit(self._transcribe, path): path for path in paths}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                self._add(futures[future], future.result())
+                if done % 25 == 0 or done == len(paths):
+                    elapsed = time.perf_counter() - started
+                    logging.info(f"Transcribed {done}/{len(paths)} recordings "
+                                 f"(ETA {elapsed / done * (len(paths) - done):.0f} s)")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _add(self, path, outcome):
+        text, error = outcome
+        # Stat while the file is known to be there: it may be gone by the time the batch is written
+        size = mtime = timestamp = None
+        try:
+            stat = os.stat(path)
+            size, mtime = stat.st_size, stat.st_mtime
+            timestamp = original_timestamp(path)
+        except OSError as e:
+            error = error or str(e)
+        status = 'failed' if error else ('imported' if text else 'empty')
+        if error:
+            logging.error(f"Could not import {path}: {error}")
+        self.stats[status] += 1
+        self._pending.append((path, timestamp, text, size, mtime, status, error))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        entries = [(timestamp, text) for _, timestamp, text, _, _, status, _ in batch if status == 'imported']
+        journal = [(path, size, mtime, status, error) for path, _, _, size, mtime, status, error in batch]
+        # Entries and their journal rows commit together
+        with self.diary_entry.storage.transaction(immediate=True):
+            self.diary_entry.save_entries(entries)
+            self.journal.record(journal)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', help="folder of voice memos and/or text/markdown files")
+    parser.add_argument('--user-data', help="user data folder (defaults to the app's)")
+    parser.add_argument('--user', help="import into this user's database under the user data folder (service mode)")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent transcriptions")
+    parser.add_argument('--rate', type=float, default=50, help="max transcription requests per minute, 0 for no limit")
+    parser.add_argument('--batch-size', type=int, default=200, help="entries per database transaction")
+    parser.add_argument('--language', default=None)
+    parser.add_argument('--no-retry-failed', action='store_true', help="skip files that failed in an earlier run")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    config = get_config()
+    tenant = args.user_data or config['user_data_folder']
+    if args.user:
+        tenant = TenantRegistry(tenant).get(args.user)
+    importer = Importer(tenant, workers=args.workers,
+                        rate_per_minute=args.rate, batch_size=args.batch_size,
+                        language=args.language or config.get('default_language'))
+    try:
+        stats = importer.run(args.source, retry_failed=not args.no_retry_failed)
+    except KeyboardInterrupt:
+        print(f"Interrupted; progress saved, run the same command to resume. {importer.stats}")
+        raise SystemExit(130)
+    print(f"Imported {stats['imported']} entries ({stats['skipped']} already imported, "
+          f"{stats['empty']} empty, {stats['failed']} failed)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+Headless service mode: the coach as an asyncio HTTP/JSON API
+(`python main.py --serve`).
+"""
+from .app import CoachService, start_service, serve
+from .sessions import SessionStore
\ No newline at end of file
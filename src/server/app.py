@@ -0,0 +1,396 @@
+import io
+import asyncio
+import logging
+import functools
+import threading
+import soundfile as sf
+from concurrent.futures import ThreadPoolExecutor
+from ..ai.backend import create_async_client
+from ..ai.chat import ChatBot, COACHING_FUNCTION, error_response
+from ..ai.stream_parser import JsonStringFieldStreamer
+from ..data.task_manager import TaskManager
+from ..data.tenant import TenantRegistry, USER_ID_PATTERN
+from ..utils.tracing import span
+from .http import HTTPError, HTTPServer, Response, EventStream, Router
+from .sessions import SessionStore
+
+
+DEFAULT_USER = 'default'
+
+
+class UserServices:
+    """
+    The chatbot and data stores of one tenant.
+    """
+
+    def __init__(self, tenant):
+        self.chatbot = ChatBot(tenant)
+        self.diary_entry = self.chatbot.diary_entry
+        self.user_profile = self.chatbot.user_profile
+        self.task_manager = TaskManager(tenant)
+        self.user_info = self.chatbot.user_info
+
+    def close(self):
+        self.chatbot.close()
+
+
+def per_user(handler):
+    """
+    Route handler that also receives the requesting user's UserServices
+    (chosen by the X-User-Id header). The user's tenant stays open until the
+    response, streamed or not, is complete.
+    """
+    @functools.wraps(handler)
+    async def wrapper(self, request):
+        user_id = request.headers.get('x-user-id') or DEFAULT_USER
+        if not USER_ID_PATTERN.match(user_id):
+            raise HTTPError(400, "Invalid X-User-Id: use letters, digits, '_', '-' or '.' (max 64)")
+        tenant, user = await self.run_blocking(self._open_user, user_id)
+        streaming = False
+        try:
+            response = await handler(self, request, user)
+            if isinstance(response, EventStream):
+                response.events = _release_after(response.events, lambda: self.tenants.release(tenant))
+                streaming = True
+            return response
+        finally:
+            if not streaming:
+                self.tenants.release(tenant)
+    return wrapper
+
+
+async def _release_after(events, release):
+    try:
+        async for event in events:
+            yield event
+    finally:
+        await events.aclose()
+        release()
+
+
+class CoachService:
+    """
+    The coach as a headless JSON service: chat sessions, diary, tasks and
+    transcription for many users and clients at once.
+
+    Every user is a tenant with their own database under
+    user_data/<user_id>/; at most `server_max_open_tenants` are open at a
+    time, least recently used closed first. LLM calls go through an
+    AsyncOpenAI client, so requests waiting on the model cost no threads.
+    Database work and prompt assembly run on a bounded thread pool, and
+    each pool thread keeps one pooled connection per open tenant.
+    """
+
+    def __init__(self, config, user_data_folder=None):
+        self.config = config
+        self.client = create_async_client(config)
+        self.model = config['openai_gpt_model']
+        self.tenants = TenantRegistry(user_data_folder or config['user_data_folder'],
+                                      config.get('server_max_open_tenants', 256), on_evict=self._close_user)
+        self.sessions = SessionStore(config.get('server_session_ttl_minutes', 60) * 60,
+                                     config.get('server_max_sessions', 1000))
+        self.executor = ThreadPoolExecutor(max_workers=config.get('server_db_workers', 8),
+                                           thread_name_prefix="service-db")
+        self._users = {}
+        self._users_lock = threading.Lock()
+        self._encoder = None
+
+    def _open_user(self, user_id):
+        tenant = self.tenants.acquire(user_id)
+        try:
+            # Keyed by the Tenant object, not the user id: a user re-opened while
+            # their evicted tenant is still being closed gets a new Tenant and so
+            # never picks up the services on_evict is about to close
+            with self._users_lock:
+                user = self._users.get(tenant)
+            if user is None:
+                created = UserServices(tenant)
+                with self._users_lock:
+                    user = self._users.setdefault(tenant, created)
+                if user is not created:
+                    created.close()
+            return tenant, user
+        except BaseException:
+            self.tenants.release(tenant)
+            raise
+
+    def _close_user(self, tenant):
+        with self._users_lock:
+            user = self._users.pop(tenant, None)
+        if user is not None:
+            user.close()
+
+    def close(self):
+        self.tenants.close()
+        self.executor.shutdown()
+
+    def router(self):
+        router = Router()
+        router.add('GET', '/health', self.health)
+        router.add('POST', '/sessions', self.create_session)
+        router.add('DELETE', '/sessions/{session_id}', self.delete_session)
+        router.add('POST', '/chat', self.chat)
+        router.add('GET', '/diary', self.list_diary)
+        router.add('POST', '/diary', self.add_diary_entry)
+        router.add('GET', '/diary/search', self.search_diary)
+        router.add('GET', '/tasks', self.list_tasks)
+        router.add('POST', '/tasks', self.add_tasks)
+        router.add('POST', '/tasks/{task_id}/complete', self.complete_task)
+        router.add('DELETE', '/tasks/{task_id}', self.delete_task)
+        router.add('POST', '/transcribe', self.transcribe)
+        return router
+
+    async def run_blocking(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def health(self, request):
+        return Response({'status': 'ok', 'sessions': len(self.sessions),
+                         'open_tenants': self.tenants.open_count()})
+
+    @per_user
+    async def create_session(self, request, user):
+        return Response({'session_id': self.sessions.create(user.chatbot.tenant.user_id).id}, 201)
+
+    @per_user
+    async def delete_session(self, request, user):
+        session = self.sessions.get(request.params['session_id'])
+        if session is None or session.user_id != user.chatbot.tenant.user_id:
+            raise HTTPError(404, "Unknown session")
+        self.sessions.delete(session.id)
+        return Response(status=204)
+
+    @per_user
+    async def chat(self, request, user):
+        data = request.json()
+        session = self.sessions.get(data.get('session_id'))
+        if session is None or session.user_id != user.chatbot.tenant.user_id:
+            raise HTTPError(404, "Unknown or expired session; create one with POST /sessions")
+        message = _required_text(data, 'message')
+        if not data.get('stream'):
+            return Response(await self.turn(user, session, message))
+
+        queue = asyncio.Queue()
+
+        async def run():
+            try:
+                response = await self.turn(user, session, message, lambda text: queue.put_nowait({'token': text}))
+                queue.put_nowait({'response': response})
+            except Exception as e:
+                # The 200 and the event-stream head are already out: report the
+                # failure as the last event rather than cutting the stream short
+                logging.error(f"Error in streamed chat turn: {e}", exc_info=True)
+                queue.put_nowait({'error': {'status': 500, 'message': str(e)}})
+            finally:
+                queue.put_nowait(None)
+
+        async def events():
+            task = asyncio.ensure_future(run())
+            try:
+                while True:
+                    event = await queue.get()
+                    if event is None:
+                        break
+                    yield event
+            finally:
+                # Finish the turn even if the client went away, so it is saved
+                await task
+
+        return EventStream(events())
+
+    async def turn(self, user, session, message, on_token=None):
+        """
+        One coaching turn, the service counterpart of ChatBot.get_response:
+        the message is saved to the diary, the reply is generated, and its
+        tasks and insights are stored before it is returned.
+        """
+        async with session.lock:
+            await self.run_blocking(user.diary_entry.save_entry, message)
+            messages, today_entries = await self.run_blocking(
+                user.chatbot.build_messages, message, session.conversation)
+            try:
+                with span('llm.get_response', model=self.model, streamed=bool(on_token),
+                          session=session.id) as stage:
+                    if on_token:
+                        arguments = await self._stream_function_arguments(messages, on_token)
+                    else:
+                        arguments = await self._function_arguments(messages, stage)
+                    stage.tag(chars=len(arguments))
+                response = await self.run_blocking(user.chatbot.finish_turn, arguments, today_entries)
+            except Exception as e:
+                logging.error(f"Unexpected error in getting AI response: {e}")
+                return error_response(e)
+            await self.run_blocking(self._store_insights, user, response)
+            return response
+
+    async def _function_arguments(self, messages, stage):
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            functions=[COACHING_FUNCTION],
+            function_call={"name": "provide_coaching_response"}
+        )
+        function_call = response.choices[0].message.function_call
+        if not function_call or function_call.name != "provide_coaching_response":
+            raise ValueError("Unexpected response format from OpenAI API")
+        if response.usage:
+            stage.tag(prompt_tokens=response.usage.prompt_tokens,
+                      completion_tokens=response.usage.completion_tokens)
+        return function_call.arguments
+
+    async def _stream_function_arguments(self, messages, on_token):
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            functions=[COACHING_FUNCTION],
+            function_call={"name": "provide_coaching_response"},
+            stream=True
+        )
+        streamer = JsonStringFieldStreamer('output')
+        name, arguments = None, []
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            function_call = chunk.choices[0].delta.function_call
+            if function_call is None:
+                continue
+            name = name or function_call.name
+            if function_call.arguments:
+                arguments.append(function_call.arguments)
+                text = streamer.feed(function_call.arguments)
+                if text:
+                    on_token(text)
+        if name != "provide_coaching_response":
+            raise ValueError("Unexpected response format from OpenAI API")
+        return ''.join(arguments)
+
+    @staticmethod
+    def _store_insights(user, response):
+        if response.get('tasks'):
+            user.task_manager.add_tasks(response['tasks'])
+        if response.get('user_profile'):
+            user.user_profile.update_profile(response['user_profile'])
+        if response.get('new_user_info'):
+            user.user_info.update_info(response['new_user_info'])
+
+    @per_user
+    async def list_diary(self, request, user):
+        limit = min(request.int_query('limit', 50), 500)
+        entries = await self.run_blocking(user.diary_entry.get_entries_page,
+                                          request.int_query('before_id'), limit)
+        return Response({'entries': entries})
+
+    @per_user
+    async def add_diary_entry(self, request, user):
+        text = _required_text(request.json(), 'text')
+        await self.run_blocking(user.diary_entry.save_entry, text)
+        return Response({'saved': True}, 201)
+
+    @per_user
+    async def search_diary(self, request, user):
+        query = request.query.get('q', '')
+        limit = min(request.int_query('limit', 20), 200)
+        return Response({'results': await self.run_blocking(user.diary_entry.search, query, limit)})
+
+    @per_user
+    async def list_tasks(self, request, user):
+        return Response({'tasks': await self.run_blocking(user.task_manager.get_tasks)})
+
+    @per_user
+    async def add_tasks(self, request, user):
+        tasks = request.json().get('tasks')
+        if not isinstance(tasks, list) or not tasks or not all(isinstance(task, str) and task.strip() for task in tasks):
+            raise HTTPError(400, "'tasks' must be a non-empty list of strings")
+        await self.run_blocking(user.task_manager.add_tasks, [task.strip() for task in tasks])
+        return Response({'added': len(tasks)}, 201)
+
+    @per_user
+    async def complete_task(self, request, user):
+        await self.run_blocking(user.task_manager.complete_task, _task_id(request))
+        return Response(status=204)
+
+    @per_user
+    async def delete_task(self, request, user):
+        await self.run_blocking(user.task_manager.delete_task, _task_id(request))
+        return Response(status=204)
+
+    async def transcribe(self, request):
+        """
+        Raw audio in the request body (any format the speech API accepts);
+        ?language= and ?filename= are optional.
+        """
+        if not request.body:
+            raise HTTPError(400, "Send the audio as the request body")
+        name = request.query.get('filename', 'audio.wav')
+        upload = await self.run_blocking(self._prepare_upload, name, request.body)
+        with span('transcribe', bytes=len(upload[1])) as stage:
+            transcript = await self.client.audio.transcriptions.create(
+                model=self.config.get('openai_whisper_model', 'whisper-1'),
+                file=upload,
+                response_format="text",
+                language=request.query.get('language') or self.config.get('default_language', 'en')
+            )
+            stage.tag(chars=len(transcript))
+        return Response({'text': transcript.strip()})
+
+    def _prepare_upload(self, name, data):
+        encoder = self._get_encoder()
+        if encoder:
+            try:
+                samples, sample_rate = sf.read(io.BytesIO(data), dtype='float32', always_2d=False)
+                return encoder.encode_samples(samples, sample_rate, name.rsplit('.', 1)[0])
+            except Exception as e:
+                logging.warning(f"Uploading {name} unencoded: {e}")
+        return name, data
+
+    def _get_encoder(self):
+        if self._encoder is None:
+            try:
+                from ..audio.encoder import encoder_from_config
+                self._encoder = encoder_from_config(self.config) or False
+            except OSError as e:
+                # The audio package needs PortAudio, which headless boxes may lack
+                logging.warning(f"Audio encoding unavailable, uploading audio unchanged: {e}")
+                self._encoder = False
+        return self._encoder
+
+
+def _required_text(data, field):
+    value = data.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(400, f"'{field}' must be a non-empty string")
+    return value.strip()
+
+
+def _task_id(request):
+    try:
+        return int(request.params['task_id'])
+    except ValueError:
+        raise HTTPError(400, "Task id must be an integer")
+
+
+async def start_service(config, host=None, port=None, user_data_folder=None):
+    service = CoachService(config, user_data_folder)
+    server = HTTPServer(service.router(),
+                        host or config.get('server_host', '127.0.0.1'),
+                        config.get('server_port', 8080) if port is None else port,
+                        max_body_bytes=int(config.get('server_max_body_mb', 25) * 1024 * 1024))
+    await server.start()
+    return service, server
+
+
+def serve(config, host=None, port=None):
+    """
+    Run the service until interrupted (`python main.py --serve`).
+    """
+    async def run():
+        service, server = await start_service(config, host, port)
+        try:
+            async with server.server:
+                await server.server.serve_forever()
+        finally:
+            service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logging.info("Service stopped")
@@ -0,0 +1,214 @@
+import re
+import json
+import asyncio
+import logging
+from urllib.parse import urlsplit, parse_qsl
+
+REASONS = {200: 'OK', 201: 'Created', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 408: 'Request Timeout', 413: 'Payload Too Large',
+           500: 'Internal Server Error', 503: 'Service Unavailable'}
+MAX_HEADER_BYTES = 16384
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    def __init__(self, method, target, headers, body):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path.rstrip('/') or '/'
+        self.query = dict(parse_qsl(url.query))
+        self.headers = headers
+        self.body = body
+        self.params = {}
+
+    def json(self):
+        try:
+            data = json.loads(self.body or b'{}')
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON body: {e}")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "JSON body must be an object")
+        return data
+
+    def int_query(self, name, default=None):
+        value = self.query.get(name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise HTTPError(400, f"Query parameter '{name}' must be an integer")
+
+
+class Response:
+    def __init__(self, payload=None, status=200, content_type='application/json'):
+        self.status = status
+        self.content_type = content_type
+        if payload is None:
+            self.body = b''
+        elif isinstance(payload, bytes):
+            self.body = payload
+        elif isinstance(payload, str):
+            self.body = payload.encode('utf-8')
+        else:
+            self.body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+class EventStream:
+    """
+    Server-sent events response: each item of the async iterator `events`
+    is sent as one `data:` line of JSON. The connection closes afterwards.
+    """
+
+    def __init__(self, events):
+        self.events = events
+
+
+class Router:
+    def __init__(self):
+        self.routes = []
+
+    def add(self, method, pattern, handler):
+        # '/sessions/{session_id}' -> named group matching one path segment
+        regex = re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', pattern.rstrip('/') or '/')
+        self.routes.append((method, re.compile(f'^{regex}$'), handler))
+
+    def resolve(self, request):
+        allowed = False
+        for method, regex, handler in self.routes:
+            match = regex.match(request.path)
+            if not match:
+                continue
+            if method == request.method:
+                request.params = match.groupdict()
+                return handler
+            allowed = True
+        if allowed:
+            raise HTTPError(405, f"Method {request.method} not allowed on {request.path}")
+        raise HTTPError(404, f"No route for {request.path}")
+
+
+class HTTPServer:
+    """
+    Minimal HTTP/1.1 server on asyncio streams: Content-Length bodies,
+    keep-alive, JSON errors and server-sent events. Enough for the JSON API
+    of the service mode without pulling in a web framework.
+    """
+
+    def __init__(self, router, host='127.0.0.1', port=8080, max_body_bytes=25 * 1024 * 1024,
+                 idle_timeout=60.0):
+        self.router = router
+        self.host = host
+        self.port = port
+        self.max_body_bytes = max_body_bytes
+        self.idle_timeout = idle_timeout
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve_connection, self.host, self.port,
+                                                 limit=MAX_HEADER_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logging.info(f"Serving on http://{self.host}:{self.port}")
+        return self
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.idle_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HTTPError as e:
+                    await self._write(writer, self._error(e.status, e.message), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                keep_alive = request.headers.get('connection', '').lower() != 'close'
+                response = await self._dispatch(request)
+                if isinstance(response, EventStream):
+                    await self._write_events(writer, response)
+                    break
+                await self._write(writer, response, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "Request headers too large")
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            raise HTTPError(400, "Chunked request bodies are not supported; send Content-Length")
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body_bytes:
+            raise HTTPError(413, f"Request body larger than {self.max_body_bytes} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return Request(method.upper(), target, headers, body)
+
+    async def _dispatch(self, request):
+        try:
+            handler = self.router.resolve(request)
+            return await handler(request)
+        except HTTPError as e:
+            return self._error(e.status, e.message)
+        except Exception as e:
+            logging.error(f"Error handling {request.method} {request.path}: {e}", exc_info=True)
+            return self._error(500, "Internal server error")
+
+    @staticmethod
+    def _error(status, message):
+        return Response({'error': {'status': status, 'message': message}}, status)
+
+    @staticmethod
+    async def _write(writer, response, keep_alive):
+        head = [f"HTTP/1.1 {response.status} {REASONS.get(response.status, '')}",
+                f"Content-Length: {len(response.body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if response.body:
+            head.append(f"Content-Type: {response.content_type}")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + response.body)
+        await writer.drain()
+
+    @staticmethod
+    async def _write_events(writer, stream):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        try:
+            async for event in stream.events:
+                writer.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode('utf-8'))
+                await writer.drain()
+        finally:
+            await stream.events.aclose()
+        writer.write(b"data: [DONE]\n\n")
+        await writer.drain()
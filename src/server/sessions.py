@@ -0,0 +1,61 @@
+import time
+import uuid
+import asyncio
+import collections
+from ..ai.chat import Conversation
+
+
+class Session:
+    def __init__(self, session_id, user_id=None):
+        self.id = session_id
+        self.user_id = user_id
+        self.conversation = Conversation()
+        # Turns of one session run one at a time, in arrival order
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
+class SessionStore:
+    """
+    Conversation state per client session. Sessions idle for longer than
+    `idle_seconds` expire, and at most `max_sessions` are kept (least
+    recently used first out).
+    """
+
+    def __init__(self, idle_seconds=3600, max_sessions=1000):
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self.sessions = collections.OrderedDict()
+
+    def create(self, user_id=None):
+        self._expire()
+        session = Session(uuid.uuid4().hex, user_id)
+        self.sessions[session.id] = session
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None or self._expired(session):
+            self.sessions.pop(session_id, None)
+            return None
+        session.last_used = time.monotonic()
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id):
+        return self.sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def _expired(self, session):
+        return time.monotonic() - session.last_used > self.idle_seconds
+
+    def _expire(self):
+        while self.sessions:
+            oldest = next(iter(self.sessions.values()))
+            if not self._expired(oldest):
+                break
+            self.sessions.popitem(last=False)
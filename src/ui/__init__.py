@@ -1,2 +1,10 @@
-from .main_window import MainWindow
-from .settings_window import SettingsWindow
\ No newline at end of file
+from ..utils.lazy import lazy_exports
+
+# Importing one view must not pull in the main window and, with it, the whole app
+__getattr__ = lazy_exports(__name__, {
+    'MainWindow': '.main_window',
+    'SettingsWindow': '.settings_window',
+    'DiaryView': '.diary_view',
+    'TracePanel': '.trace_panel',
+})
+__all__ = ['MainWindow', 'SettingsWindow', 'DiaryView', 'TracePanel']
@@ -0,0 +1,174 @@
+import tkinter as tk
+import logging
+
+EMPTY_MESSAGE = "No entries found. Start writing to create your first entry!"
+NO_RESULTS_MESSAGE = "No entries match your search."
+
+
+class DiaryView:
+    """
+    Windowed view of diary entries on top of a ScrolledText.
+
+    Only a bounded window of pages is kept in the widget: scrolling near the
+    bottom loads the next older page and drops the newest one once the window
+    is full; scrolling back to the top reloads newer pages the same way. Render
+    time and widget memory therefore do not depend on the size of the diary.
+    """
+
+    def __init__(self, text_widget, diary_entry, page_size=50, max_pages=6, edge_fraction=0.1):
+        self.text = text_widget
+        self.diary_entry = diary_entry
+        self.page_size = page_size
+        self.max_entries = page_size * max_pages
+        self.edge_fraction = edge_fraction
+        self.entry_ids = []          # rendered entry IDs, newest first
+        self.has_older = False
+        self.has_newer = False
+        self._load_pending = False
+        self.search_query = None
+        self.text.configure(yscrollcommand=self._on_scroll)
+
+    def reload(self):
+        """
+        Render the newest page, discarding whatever is currently shown.
+        """
+        self.search_query = None
+        self.text.delete(1.0, tk.END)
+        for entry_id in self.entry_ids:
+            self.text.tag_delete(self._tag(entry_id))
+        self.entry_ids = []
+        page = self.diary_entry.get_entries_page(None, self.page_size)
+        self.has_newer = False
+        self.has_older = len(page) == self.page_size
+        if page:
+            self._append(page)
+        else:
+            self.text.insert(tk.END, EMPTY_MESSAGE)
+        logging.info(f"Diary view loaded {len(page)} entries")
+
+    def refresh(self):
+        """
+        Show entries written since the last render. Cheap when nothing changed.
+        """
+        if self.search_query is not None:
+            return
+        if not self.entry_ids:
+            self.reload()
+            return
+        if self.has_newer:
+            # The user is reading older pages; newer entries load when they scroll up
+            return
+        newer = self.diary_entry.get_entries_page_after(self.entry_ids[0], self.page_size)
+        if len(newer) == self.page_size:
+            self.reload()
+            return
+        if newer:
+            self._prepend(newer)
+            self._trim_bottom()
+            logging.info(f"Diary view added {len(newer)} new entries")
+
+    def search(self, query, limit=50):
+        """
+        Replace the diary window with ranked search results for `query`.
+        An empty query goes back to the regular diary view.
+        """
+        if not query.strip():
+            self.reload()
+            return
+        results = self.diary_entry.search(query, limit)
+        self.text.delete(1.0, tk.END)
+        for entry_id in self.entry_ids:
+            self.text.tag_delete(self._tag(entry_id))
+        self.entry_ids = []
+        self.has_older = self.has_newer = False
+        self.search_query = query
+        if results:
+            self.text.insert(tk.END, ''.join(f"{result['timestamp']}\n{result['snippet']}\n\n" for result in results))
+        else:
+            self.text.insert(tk.END, NO_RESULTS_MESSAGE)
+        logging.info(f"Diary view showing {len(results)} search results")
+
+    def _on_scroll(self, first, last):
+        self.text.vbar.set(first, last)
+        if self._load_pending or self.search_query is not None:
+            return
+        first, last = float(first), float(last)
+        if last >= 1.0 - self.edge_fraction and self.has_older:
+            self._load_pending = True
+            self.text.after_idle(self._load_older)
+        elif first <= self.edge_fraction and self.has_newer:
+            self._load_pending = True
+            self.text.after_idle(self._load_newer)
+
+    def _load_older(self):
+        try:
+            page = self.diary_entry.get_entries_page(self.entry_ids[-1], self.page_size)
+            self.has_older = len(page) == self.page_size
+            if page:
+                self._append(page)
+                self._trim_top()
+        except Exception as e:
+            logging.error(f"Error loading older diary entries: {e}", exc_info=True)
+        finally:
+            self._load_pending = False
+
+    def _load_newer(self):
+        try:
+            page = self.diary_entry.get_entries_page_after(self.entry_ids[0], self.page_size)
+            self.has_newer = len(page) == self.page_size
+            if page:
+                self._prepend(page, keep_position=True)
+                self._trim_bottom()
+        except Exception as e:
+            logging.error(f"Error loading newer diary entries: {e}", exc_info=True)
+        finally:
+            self._load_pending = False
+
+    def _append(self, entries):
+        chunks = []
+        for entry in entries:
+            chunks.extend((self._format(entry), self._tag(entry['id'])))
+        self.text.insert(tk.END, *chunks)
+        self.entry_ids.extend(entry['id'] for entry in entries)
+
+    def _prepend(self, entries, keep_position=False):
+        chunks = []
+        for entry in entries:
+            chunks.extend((self._format(entry), self._tag(entry['id'])))
+        if keep_position:
+            # Keep the rows the user is reading in place while content grows above them
+            self.text.mark_set('diary-anchor', '@0,0')
+            self.text.mark_gravity('diary-anchor', tk.RIGHT)
+        self.text.insert(1.0, *chunks)
+        self.entry_ids[:0] = [entry['id'] for entry in entries]
+        if keep_position:
+            self.text.yview('diary-anchor')
+            self.text.mark_unset('diary-anchor')
+
+    def _trim_top(self):
+        excess = len(self.entry_ids) - self.max_entries
+        if excess <= 0:
+            return
+        removed, self.entry_ids = self.entry_ids[:excess], self.entry_ids[excess:]
+        self.text.delete(1.0, self.text.index(f"{self._tag(self.entry_ids[0])}.first"))
+        for entry_id in removed:
+            self.text.tag_delete(self._tag(entry_id))
+        self.has_newer = True
+
+    def _trim_bottom(self):
+        excess = len(self.entry_ids) - self.max_entries
+        if excess <= 0:
+            return
+        self.entry_ids, removed = self.entry_ids[:-excess], self.entry_ids[-excess:]
+        self.text.delete(self.text.index(f"{self._tag(removed[0])}.first"), tk.END)
+        for entry_id in removed:
+            self.text.tag_delete(self._tag(entry_id))
+        self.has_older = True
+
+    @staticmethod
+    def _tag(entry_id):
+        return f"entry-{entry_id}"
+
+    @staticmethod
+    def _format(entry):
+        return f"{entry['timestamp']}\n{entry['content']}\n\n"
@@ -1,14 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-from ..audio.recorder import AudioRecorder
-from ..audio.transcriber import Transcriber
-from ..data.diary_entry import DiaryEntry
 from ..ai.chat import ChatBot
-from ..data.user_profile import UserProfile
 from ..data.task_manager import TaskManager
 from .settings_window import SettingsWindow
-from ..data.user_info import UserInfo
-import threading
+from .diary_view import DiaryView
+from .row_view import RowView
+from .trace_panel import TracePanel
+from ..utils.tracing import span, traced
+from ..utils.turn_executor import AfterDispatcher, TurnCancelled, TurnExecutor
 import logging
 import os
 
@@ -26,15 +25,43 @@ class MainWindow:
             icon = tk.PhotoImage(file=icon_path)
             self.master.iconphoto(True, icon)
         
-        self.audio_recorder = AudioRecorder(config['recordings_folder'])
-        self.transcriber = Transcriber()
-        self.diary_entry = DiaryEntry(config['user_data_folder'])
-        self.chatbot = ChatBot(config['user_data_folder'])
-        self.user_profile = UserProfile(config['user_data_folder'])
-        self.task_manager = TaskManager(config['user_data_folder'])
-        self.user_info = UserInfo(config['user_data_folder'])
+        # The audio stack (PortAudio, libsndfile, the transcription client) is set up on first recording
+        self._audio_recorder = None
+        self._transcriber = None
+        with span('startup.chatbot'):
+            self.chatbot = ChatBot(config['user_data_folder'])
+        # The tabs show the same stores the chatbot writes to
+        self.diary_entry = self.chatbot.diary_entry
+        self.user_profile = self.chatbot.user_profile
+        self.user_info = self.chatbot.user_info
+        with span('startup.task_manager'):
+            self.task_manager = TaskManager(config['user_data_folder'])
+
+        # Turns run one at a time off the Tk thread; their UI updates come back in order, batched
+        self.dispatcher = AfterDispatcher(self.master, config.get('ui_dispatch_ms', 16))
+        self.turns = TurnExecutor(self.dispatcher, timeout=config.get('turn_timeout_seconds', 120) or None,
+                                  on_idle=self.on_turns_idle)
         
-        self.setup_ui()
+        with span('startup.setup_ui'):
+            self.setup_ui()
+
+    @property
+    def audio_recorder(self):
+        if self._audio_recorder is None:
+            from ..audio.recorder import AudioRecorder
+            config = self.config
+            self._audio_recorder = AudioRecorder(
+                config['recordings_folder'], config.get('capture_sample_rate', 44100),
+                config.get('capture_format', 'WAV'), config.get('capture_subtype', 'PCM_16'),
+                config.get('capture_buffer_seconds', 10), config.get('capture_flush_ms', 250))
+        return self._audio_recorder
+
+    @property
+    def transcriber(self):
+        if self._transcriber is None:
+            from ..audio.transcriber import Transcriber
+            self._transcriber = Transcriber()
+        return self._transcriber
     
     def setup_ui(self):
         self.style = ttk.Style()
@@ -55,9 +82,18 @@ class MainWindow:
         self.status_label = ttk.Label(top_frame, text="Status: Idle")
         self.status_label.grid(column=0, row=0, padx=5, pady=5)
 
+        # Context loading indicator
+        self.context_label = ttk.Label(top_frame, text="Context: Ready")
+        self.context_label.grid(column=1, row=0, padx=5, pady=5, sticky=tk.W)
+
         # Settings button
         self.settings_button = ttk.Button(top_frame, text="⚙", width=3, command=self.open_settings)
-        self.settings_button.grid(column=1, row=0, padx=5, pady=5, sticky=tk.E)
+        self.settings_button.grid(column=2, row=0, padx=5, pady=5, sticky=tk.E)
+
+        # Pipeline timings, only collected in debug mode
+        if self.config.get('debug_mode'):
+            self.timings_button = ttk.Button(top_frame, text="⏱", width=3, command=self.open_trace_panel)
+            self.timings_button.grid(column=3, row=0, padx=5, pady=5, sticky=tk.E)
 
         # Notebook for different sections
         self.notebook = ttk.Notebook(main_container)
@@ -100,6 +136,11 @@ class MainWindow:
         self.record_button = ttk.Button(input_frame, text="🎤", width=3, command=self.toggle_recording)
         self.record_button.grid(column=2, row=0, padx=(5, 0))
 
+        # Stop button: cancels the running turn and any queued behind it
+        self.stop_button = ttk.Button(input_frame, text="Stop", command=self.cancel_turns)
+        self.stop_button.grid(column=3, row=0, padx=(5, 0))
+        self.master.bind("<Escape>", lambda event: self.cancel_turns())
+
         # Tasks Tab
         tasks_frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(tasks_frame, text="Tasks")
@@ -109,6 +150,7 @@ class MainWindow:
         self.tasks_text.pack(expand=True, fill=tk.BOTH)
         self.tasks_text.bind("<Command-a>", self.select_all)
         self.tasks_text.bind("<Control-a>", self.select_all)
+        self.tasks_view = RowView(self.tasks_text, 'task')
 
         # User Profile Tab
         user_profile_frame = ttk.Frame(self.notebook, padding="10")
@@ -119,6 +161,7 @@ class MainWindow:
         self.user_profile_text.pack(expand=True, fill=tk.BOTH)
         self.user_profile_text.bind("<Command-a>", self.select_all)
         self.user_profile_text.bind("<Control-a>", self.select_all)
+        self.user_profile_view = RowView(self.user_profile_text, 'profile')
 
         # User Info Tab
         user_info_frame = ttk.Frame(self.notebook, padding="10")
@@ -128,22 +171,42 @@ class MainWindow:
         self.user_info_text.config(state=tk.NORMAL)
         self.user_info_text.bind("<Command-a>", self.select_all)
         self.user_info_text.bind("<Control-a>", self.select_all)
+        self.user_info_view = RowView(self.user_info_text, 'info')
         
 
         # Diary Entries Tab
         diary_frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(diary_frame, text="Diary Entries")
+
+        # Diary search
+        diary_search_frame = ttk.Frame(diary_frame)
+        diary_search_frame.pack(fill=tk.X, pady=(0, 10))
+        self.diary_search_input = ttk.Entry(diary_search_frame)
+        self.diary_search_input.pack(side=tk.LEFT, expand=True, fill=tk.X)
+        self.diary_search_input.bind("<Return>", lambda event: self.search_diary())
+        ttk.Button(diary_search_frame, text="Search", command=self.search_diary).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(diary_search_frame, text="Clear", command=self.clear_diary_search).pack(side=tk.LEFT, padx=(5, 0))
+
         self.diary_text = scrolledtext.ScrolledText(diary_frame, wrap=tk.WORD, width=70, height=20)
         self.diary_text.pack(expand=True, fill=tk.BOTH)
         self.diary_text.config(state=tk.NORMAL)
         self.diary_text.pack(expand=True, fill=tk.BOTH)
         self.diary_text.bind("<Command-a>", self.select_all)
         self.diary_text.bind("<Control-a>", self.select_all)
+        self.diary_view = DiaryView(self.diary_text, self.diary_entry)
 
         self.update_diary()
         self.update_user_profile()
         self.update_tasks()
         self.update_user_info()
+        self.watch_context_loading()
+    
+    def watch_context_loading(self):
+        if self.chatbot.is_context_ready():
+            return
+        self.context_label.config(text="Context: Warming up...")
+        self.chatbot.add_context_ready_callback(
+            lambda: self.dispatcher.post(lambda: self.context_label.config(text="Context: Ready")))
     
     def select_all(self, event):
         event.widget.tag_add(tk.SEL, "1.0", tk.END)
@@ -158,14 +221,35 @@ class MainWindow:
             logging.error(f"Error opening settings window: {e}", exc_info=True)
             self.show_error(f"Error opening settings: {e}")
 
+    def open_trace_panel(self):
+        try:
+            TracePanel(self.master, os.path.join(self.config['user_data_folder'], 'traces'))
+        except Exception as e:
+            logging.error(f"Error opening trace panel: {e}", exc_info=True)
+            self.show_error(f"Error opening timings: {e}")
+
     def toggle_recording(self):
-        if not self.audio_recorder.is_recording:
+        try:
+            recording = self.audio_recorder.is_recording
+        except Exception as e:
+            # e.g. PortAudio missing; the rest of the app works without it
+            logging.error(f"Error setting up audio recording: {e}", exc_info=True)
+            self.show_error(f"Audio recording is unavailable: {e}")
+            return
+        if not recording:
             self.start_recording()
         else:
             self.stop_recording()
 
     def start_recording(self):
-        self.audio_recorder.start_recording()
+        self.streaming_transcriber = None
+        if self.config.get('streaming_transcription', True):
+            from ..audio.streaming_transcriber import StreamingTranscriber
+            # Utterances are transcribed while the user is still talking
+            self.streaming_transcriber = StreamingTranscriber(
+                self.transcriber, self.audio_recorder.sample_rate, language=self.config['default_language'],
+                max_workers=self.config.get('transcription_workers', 3))
+        self.audio_recorder.start_recording(listener=self.streaming_transcriber)
         self.record_button.config(text="⏹")
         self.status_label.config(text="Status: Recording...")
 
@@ -173,21 +257,30 @@ class MainWindow:
         audio_file = self.audio_recorder.stop_recording()
         self.record_button.config(text="🎤")
         self.status_label.config(text="Status: Processing...")
-        threading.Thread(target=self.process_recording, args=(audio_file,), daemon=True).start()
+        self.turns.submit(self.process_recording, audio_file, self.streaming_transcriber,
+                          on_cancel=self.on_turn_cancelled)
 
-    def process_recording(self, audio_file):
+    @traced('turn.voice')
+    def process_recording(self, turn, audio_file, streaming_transcriber=None):
         try:
-            text = self.transcriber.transcribe(audio_file, language=self.config['default_language'])
+            text = None
+            if streaming_transcriber:
+                remaining = turn.remaining()
+                text = streaming_transcriber.finish(timeout=60 if remaining is None else min(60, remaining))
+            if text is None:
+                turn.check()
+                text = self.transcriber.transcribe(audio_file, language=self.config['default_language'])
             if not text:
-                self.master.after(0, lambda: self.status_label.config(text="Status: Idle"))
                 return
             
-            self.master.after(0, lambda: self.update_chat("user", text))
-            self.process_input(text)
+            turn.check()
+            turn.post(self.update_chat, "user", text)
+            self.process_input(turn, text)
+        except TurnCancelled:
+            raise
         except Exception as e:
             logging.error(f"Error in process_recording: {e}", exc_info=True)
-            self.master.after(0, lambda: self.show_error(f"Error in processing recording: {e}"))
-            self.master.after(0, lambda: self.status_label.config(text="Status: Idle"))
+            turn.post(self.show_error, f"Error in processing recording: {e}")
 
     def on_enter_press(self, event):
         self.send_message()
@@ -197,28 +290,91 @@ class MainWindow:
         if text:
             self.text_input.delete(0, tk.END)
             self.update_chat("user", text)
-            self.process_input(text)
+            self.status_label.config(text="Status: Processing...")
+            # Queued behind any turn still running, so responses arrive in the order messages were sent
+            self.turns.submit(self.process_input, text, on_cancel=self.on_turn_cancelled)
 
-    def process_input(self, text):
+    @traced('turn')
+    def process_input(self, turn, text):
         try:
             self.diary_entry.save_entry(text)
-            ai_response = self.chatbot.get_response(text)
+            turn.check()
+            streamed = []
+
+            def on_token(token):
+                turn.check()
+                if not streamed:
+                    turn.post(self.begin_ai_stream)
+                streamed.append(token)
+                turn.post(self.append_ai_stream, token)
+
+            stream = self.config.get('stream_responses', True)
+            ai_response = self.chatbot.get_response(text, on_token=on_token if stream else None,
+                                                    timeout=turn.remaining())
+            if isinstance(ai_response, dict):
+                # Stored here, off the Tk thread, and before the last cancellation
+                # check, so a Stop now still keeps what the reply found out
+                self.save_insights(ai_response)
+            try:
+                turn.check()
+            except TurnCancelled:
+                if isinstance(ai_response, dict):
+                    # turn.post() would drop this; the tabs should still show what was saved
+                    self.dispatcher.post(self.refresh_insights)
+                raise
             
             if isinstance(ai_response, dict):
-                self.master.after(0, lambda: self.update_chat("ai", ai_response.get('output', '')))
-                self.master.after(0, lambda: self.update_tasks(ai_response.get('tasks', [])))
-                self.master.after(0, lambda: self.update_user_profile(ai_response.get('user_profile', [])))
-                self.master.after(0, lambda: self.update_user_info(ai_response.get('new_user_info', [])))
+                if streamed:
+                    turn.post(self.end_ai_stream)
+                    if 'error' in ai_response:
+                        turn.post(self.update_chat, "ai", ai_response.get('output', ''))
+                else:
+                    turn.post(self.update_chat, "ai", ai_response.get('output', ''))
+                turn.post(self.refresh_insights)
             else:
                 logging.error(f"Unexpected AI response format: {ai_response}")
-                self.master.after(0, lambda: self.show_error("Unexpected response from AI. Please try again."))
+                turn.post(self.show_error, "Unexpected response from AI. Please try again.")
             
-            self.master.after(0, lambda: self.update_diary())
-            self.master.after(0, lambda: self.status_label.config(text="Status: Idle"))
+            turn.post(self.update_diary)
+        except TurnCancelled:
+            raise
         except Exception as e:
             logging.error(f"Error in process_input: {e}", exc_info=True)
-            self.master.after(0, lambda: self.show_error(f"Error in processing input: {e}"))
-            self.master.after(0, lambda: self.status_label.config(text="Status: Idle"))
+            turn.post(self.show_error, f"Error in processing input: {e}")
+
+    def save_insights(self, ai_response):
+        """
+        Store the tasks, profile and info facts of a reply. Runs on the turn's worker thread.
+        """
+        for name, save in (('tasks', self.task_manager.add_tasks),
+                           ('user_profile', self.user_profile.update_profile),
+                           ('new_user_info', self.user_info.update_info)):
+            items = ai_response.get(name)
+            if not items:
+                continue
+            try:
+                save(items)
+            except Exception as e:
+                logging.error(f"Error saving {name}: {e}", exc_info=True)
+
+    def refresh_insights(self):
+        self.update_tasks()
+        self.update_user_profile()
+        self.update_user_info()
+
+    def cancel_turns(self):
+        if self.turns.cancel_all():
+            self.status_label.config(text="Status: Stopping...")
+
+    def on_turn_cancelled(self, turn):
+        if "ai_stream" in self.chat_text.mark_names():
+            self.end_ai_stream()
+        self.update_chat("ai", f"(Response {turn.reason}.)")
+        # The entry, and possibly the reply's insights, were saved before the turn was cut short
+        self.update_diary()
+
+    def on_turns_idle(self):
+        self.status_label.config(text="Status: Idle")
 
     def update_chat(self, sender, text):
         self.chat_text.config(state=tk.NORMAL)
@@ -226,74 +382,91 @@ class MainWindow:
         self.chat_text.see(tk.END)
         self.chat_text.config(state=tk.NORMAL)
 
-    def update_tasks(self, tasks):
-        self.tasks_text.config(state=tk.NORMAL)
-        self.tasks_text.delete(1.0, tk.END)
-        for task in tasks:
-            self.tasks_text.insert(tk.END, f"- {task}\n")
-        self.tasks_text.config(state=tk.NORMAL)
+    def begin_ai_stream(self):
+        self.chat_text.insert(tk.END, "Ai: ", "ai")
+        # Streamed text goes in at this mark. The message's closing newlines
+        # are inserted after it up front, so messages added at END meanwhile
+        # land below them instead of at the mark itself (which would carry
+        # the mark, and the rest of the stream, past them)
+        self.chat_text.mark_set("ai_stream", "end-1c")
+        self.chat_text.mark_gravity("ai_stream", tk.LEFT)
+        self.chat_text.insert(tk.END, "\n\n", "ai")
+        # From now on text inserted at the mark pushes it along
+        self.chat_text.mark_gravity("ai_stream", tk.RIGHT)
+        self.chat_text.see(tk.END)
+
+    def append_ai_stream(self, text):
+        self.chat_text.insert("ai_stream", text, "ai")
+        self.chat_text.see("ai_stream")
 
+    def end_ai_stream(self):
+        self.chat_text.mark_unset("ai_stream")
+        self.chat_text.see(tk.END)
+
+    @traced('ui.update_diary')
     def update_diary(self):
         logging.info("Updating diary display")
         try:
-            if self.diary_entry.has_entries():
-                entries = self.diary_entry.get_entries()
-                self.diary_text.config(state=tk.NORMAL)
-                self.diary_text.delete(1.0, tk.END)
-                for entry in entries:
-                    self.diary_text.insert(tk.END, f"{entry['timestamp']}\n{entry['content']}\n\n")
-                self.diary_text.config(state=tk.NORMAL)
-                logging.info(f"Displayed {len(entries)} diary entries")
-            else:
-                self.diary_text.config(state=tk.NORMAL)
-                self.diary_text.delete(1.0, tk.END)
-                self.diary_text.insert(tk.END, "No entries found. Start writing to create your first entry!")
-                self.diary_text.config(state=tk.NORMAL)
-                logging.info("No diary entries to display")
+            self.diary_view.refresh()
         except Exception as e:
             logging.error(f"Error in update_diary: {e}", exc_info=True)
             self.show_error(f"Error updating diary: {e}")
     
+    def search_diary(self):
+        query = self.diary_search_input.get()
+        try:
+            self.diary_view.search(query)
+        except Exception as e:
+            logging.error(f"Error in search_diary: {e}", exc_info=True)
+            self.show_error(f"Error searching diary: {e}")
+
+    def clear_diary_search(self):
+        self.diary_search_input.delete(0, tk.END)
+        self.diary_view.reload()
+
+    @traced('ui.update_user_profile')
     def update_user_profile(self, new_profile_data=None):
         try:
             if new_profile_data:
                 self.user_profile.update_profile(new_profile_data)
             
-            profile_data = self.user_profile.get_profile()
-            self.user_profile_text.config(state=tk.NORMAL)
-            self.user_profile_text.delete(1.0, tk.END)
-            for item in profile_data:
-                self.user_profile_text.insert(tk.END, f"{item['timestamp']})\n• {item['item']}\n\n")
-            self.user_profile_text.config(state=tk.NORMAL)
+            profile_data = self.user_profile.get_profile(self.config.get('fact_display_limit', 200))
+            self.user_profile_view.render((item['id'], self.format_fact(item)) for item in profile_data)
         except Exception as e:
             logging.error(f"Error in update_user_profile: {e}", exc_info=True)
             self.show_error(f"Error updating user profile: {e}")
     
+    @traced('ui.update_user_info')
     def update_user_info(self, new_info_data=None):
         try:
             if new_info_data:
                 self.user_info.update_info(new_info_data)
             
-            info_data = self.user_info.get_info()
-            self.user_info_text.config(state=tk.NORMAL)
-            self.user_info_text.delete(1.0, tk.END)
-            for item in info_data:
-                self.user_info_text.insert(tk.END, f"{item['timestamp']})\n• {item['item']}\n\n")
-            self.user_info_text.config(state=tk.NORMAL)
+            info_data = self.user_info.get_info(self.config.get('fact_display_limit', 200))
+            self.user_info_view.render((item['id'], self.format_fact(item)) for item in info_data)
             logging.info(f"Updated user info display with {len(info_data)} items")
         except Exception as e:
             logging.error(f"Error in update_user_info: {e}", exc_info=True)
             self.show_error(f"Error updating user info: {e}")
     
+    @traced('ui.update_tasks')
     def update_tasks(self, new_tasks=None):
         if new_tasks:
             self.task_manager.add_tasks(new_tasks)
         
         tasks = self.task_manager.get_tasks()
-        self.tasks_text.delete(1.0, tk.END)
-        for task in tasks:
-            status = "[X]" if task['completed'] else "[ ]"
-            self.tasks_text.insert(tk.END, f"{status} {task['id']}: {task['task']}\n")
+        self.tasks_view.render((task['id'], self.format_task(task)) for task in tasks)
+
+    @staticmethod
+    def format_task(task):
+        status = "[X]" if task['completed'] else "[ ]"
+        mentions = f" (suggested {task['mentions']}x)" if task['mentions'] > 1 else ""
+        return f"{status} {task['id']}: {task['task']}{mentions}\n"
+
+    @staticmethod
+    def format_fact(item):
+        seen = f" (seen {item['seen']}x)" if item['seen'] > 1 else ""
+        return f"{item['timestamp']}){seen}\n• {item['item']}\n\n"
 
     def add_task(self):
         task = self.new_task_entry.get()
@@ -0,0 +1,108 @@
+import bisect
+import tkinter as tk
+
+
+def plan_render(keys, texts, rows):
+    """
+    Which rendered rows survive a re-render to `rows` (ordered (key, text)
+    pairs), given the rendered `keys` (top to bottom) and their `texts`.
+    A row stays where it is if its text is unchanged and it is part of the
+    longest run of such rows already in the new relative order; everything
+    else is removed and (re)inserted. Returns (kept keys, removed keys).
+    """
+    positions = {key: index for index, (key, _) in enumerate(rows)}
+    wanted = dict(rows)
+    unchanged = [key for key in keys if key in wanted and wanted[key] == texts[key]]
+    # Longest increasing subsequence of new positions, O(n log n)
+    tails, tail_at, previous = [], [], [None] * len(unchanged)
+    for i, key in enumerate(unchanged):
+        j = bisect.bisect_left(tails, positions[key])
+        if j == len(tails):
+            tails.append(positions[key])
+            tail_at.append(i)
+        else:
+            tails[j] = positions[key]
+            tail_at[j] = i
+        previous[i] = tail_at[j - 1] if j else None
+    kept = set()
+    i = tail_at[-1] if tail_at else None
+    while i is not None:
+        kept.add(unchanged[i])
+        i = previous[i]
+    return kept, [key for key in keys if key not in kept]
+
+
+class RowView:
+    """
+    Keyed rows rendered into a Text widget and updated by diff.
+
+    Each row carries a tag named after its key, so it can be found and
+    removed without re-reading the widget. render() touches only the rows
+    that were added, removed, changed or moved since the last call: every
+    run of adjacent removed rows is one delete, every run of adjacent new
+    rows one insert. A turn that adds a task to a list of thousands costs
+    one small insert instead of rebuilding the tab.
+    """
+
+    def __init__(self, text_widget, name):
+        self.text = text_widget
+        self.prefix = f"{name}-row-"
+        self.keys = []      # rendered keys, top to bottom
+        self.texts = {}     # key -> rendered text
+
+    def render(self, rows):
+        """
+        Make the widget show `rows`, ordered (key, text) pairs with unique
+        keys. Returns (rows inserted, rows removed).
+        """
+        rows = list(rows)
+        kept, removed = plan_render(self.keys, self.texts, rows)
+        if kept:
+            self._delete(removed)
+        else:
+            self._clear()
+        inserted, run = 0, []
+        for key, text in rows:
+            if key not in kept:
+                run.append((key, text))
+            elif run:
+                self._insert(f"{self._tag(key)}.first", run)
+                inserted += len(run)
+                run = []
+        if run:
+            self._insert(tk.END, run)
+            inserted += len(run)
+        self.keys = [key for key, _ in rows]
+        self.texts = dict(rows)
+        return inserted, len(removed)
+
+    def _delete(self, removed):
+        if not removed:
+            return
+        removing = set(removed)
+        runs, run = [], []
+        for key in self.keys:
+            if key in removing:
+                run.append(key)
+            elif run:
+                runs.append(run)
+                run = []
+        if run:
+            runs.append(run)
+        for run in runs:
+            self.text.delete(f"{self._tag(run[0])}.first", f"{self._tag(run[-1])}.last")
+        self.text.tag_delete(*(self._tag(key) for key in removed))
+
+    def _clear(self):
+        self.text.delete(1.0, tk.END)
+        if self.keys:
+            self.text.tag_delete(*(self._tag(key) for key in self.keys))
+
+    def _insert(self, index, run):
+        chunks = []
+        for key, text in run:
+            chunks.extend((text, self._tag(key)))
+        self.text.insert(index, *chunks)
+
+    def _tag(self, key):
+        return f"{self.prefix}{key}"
@@ -0,0 +1,79 @@
+import os
+import datetime
+import logging
+import tkinter as tk
+from tkinter import ttk
+from ..utils.tracing import tracer
+
+REFRESH_MS = 1000
+COLUMNS = (('count', "Count"), ('p50_ms', "p50 ms"), ('p95_ms', "p95 ms"), ('max_ms', "Max ms"))
+
+
+class TracePanel(tk.Toplevel):
+    """
+    Debug window with per-stage latency percentiles from the tracing ring buffer.
+    """
+
+    def __init__(self, parent, export_folder):
+        super().__init__(parent)
+        self.title("Pipeline Timings")
+        self.export_folder = export_folder
+        self._refresh_job = None
+        self.create_widgets()
+        self.bind('<Destroy>', self._on_destroy)
+        self.refresh()
+
+    def create_widgets(self):
+        frame = ttk.Frame(self, padding="10")
+        frame.pack(expand=True, fill=tk.BOTH)
+
+        self.table = ttk.Treeview(frame, columns=[key for key, _ in COLUMNS], height=15)
+        self.table.heading('#0', text="Stage")
+        self.table.column('#0', width=220)
+        for key, title in COLUMNS:
+            self.table.heading(key, text=title)
+            self.table.column(key, width=80, anchor=tk.E)
+        self.table.pack(expand=True, fill=tk.BOTH)
+
+        buttons = ttk.Frame(frame)
+        buttons.pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(buttons, text="Export JSONL", command=lambda: self.export('jsonl')).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Export Chrome trace", command=lambda: self.export('json')).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(buttons, text="Clear", command=self.clear).pack(side=tk.LEFT, padx=(5, 0))
+        self.export_label = ttk.Label(buttons, text="")
+        self.export_label.pack(side=tk.LEFT, padx=(10, 0))
+
+    def refresh(self):
+        # One pending refresh at a time; clear() refreshes early
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        if not self.winfo_exists():
+            return
+        self.table.delete(*self.table.get_children())
+        for stage, stats in sorted(tracer.stats().items()):
+            self.table.insert('', tk.END, text=stage, values=(
+                stats['count'], f"{stats['p50_ms']:.1f}", f"{stats['p95_ms']:.1f}", f"{stats['max_ms']:.1f}"))
+        self._refresh_job = self.after(REFRESH_MS, self.refresh)
+
+    def _on_destroy(self, event):
+        # Child widgets' <Destroy> events reach this binding too
+        if event.widget is self and self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+
+    def export(self, extension):
+        os.makedirs(self.export_folder, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
+        path = os.path.join(self.export_folder, f"trace-{stamp}.{extension}")
+        try:
+            count = tracer.export_jsonl(path) if extension == 'jsonl' else tracer.export_chrome_trace(path)
+            self.export_label.config(text=f"Saved {count} spans to {path}")
+            logging.info(f"Exported {count} trace spans to {path}")
+        except Exception as e:
+            logging.error(f"Error exporting trace: {e}", exc_info=True)
+            self.export_label.config(text=f"Export failed: {e}")
+
+    def clear(self):
+        tracer.clear()
+        self.refresh()
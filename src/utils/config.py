@@ -16,6 +16,54 @@ def load_config():
         'recordings_folder': os.path.join(user_data_dir, 'recordings'),
         'debug_mode': os.getenv('DEBUG_MODE', 'False').lower() == 'true',
         'default_language': os.getenv('DEFAULT_LANGUAGE', 'en'),
+        'context_workers': int(os.getenv('CONTEXT_WORKERS', '4')),
+        'prompt_token_budget': int(os.getenv('PROMPT_TOKEN_BUDGET', '12000')),
+        'history_turns': int(os.getenv('HISTORY_TURNS', '8')),
+        'stream_responses': os.getenv('STREAM_RESPONSES', 'True').lower() == 'true',
+        'turn_timeout_seconds': float(os.getenv('TURN_TIMEOUT_SECONDS', '120')),
+        'ui_dispatch_ms': int(os.getenv('UI_DISPATCH_MS', '16')),
+        'llm_cache_enabled': os.getenv('LLM_CACHE_ENABLED', 'True').lower() == 'true',
+        'llm_cache_ttl_hours': float(os.getenv('LLM_CACHE_TTL_HOURS', '720')),
+        'llm_cache_max_mb': float(os.getenv('LLM_CACHE_MAX_MB', '50')),
+        'llm_cache_chat': os.getenv('LLM_CACHE_CHAT', 'False').lower() == 'true',
+        'llm_backend': os.getenv('LLM_BACKEND', 'openai').lower(),
+        'llm_base_url': os.getenv('OPENAI_BASE_URL'),
+        'local_llm_port': int(os.getenv('LOCAL_LLM_PORT', '0')),
+        'local_llm_latency_ms': float(os.getenv('LOCAL_LLM_LATENCY_MS', '300')),
+        'local_llm_jitter_ms': float(os.getenv('LOCAL_LLM_JITTER_MS', '100')),
+        'local_llm_tokens_per_second': float(os.getenv('LOCAL_LLM_TOKENS_PER_SECOND', '50')),
+        'local_llm_error_rate': float(os.getenv('LOCAL_LLM_ERROR_RATE', '0')),
+        'local_llm_upload_kbps': float(os.getenv('LOCAL_LLM_UPLOAD_KBPS', '0')),
+        'trace_buffer_size': int(os.getenv('TRACE_BUFFER_SIZE', '2000')),
+        'streaming_transcription': os.getenv('STREAMING_TRANSCRIPTION', 'True').lower() == 'true',
+        'transcription_workers': int(os.getenv('TRANSCRIPTION_WORKERS', '3')),
+        'capture_sample_rate': int(os.getenv('CAPTURE_SAMPLE_RATE', '44100')),
+        'capture_format': os.getenv('CAPTURE_FORMAT', 'WAV').upper(),
+        'capture_subtype': os.getenv('CAPTURE_SUBTYPE', 'PCM_16').upper(),
+        'capture_buffer_seconds': float(os.getenv('CAPTURE_BUFFER_SECONDS', '10')),
+        'capture_flush_ms': int(os.getenv('CAPTURE_FLUSH_MS', '250')),
+        'audio_upload_format': os.getenv('AUDIO_UPLOAD_FORMAT', 'flac').lower(),
+        'audio_trim_silence': os.getenv('AUDIO_TRIM_SILENCE', 'True').lower() == 'true',
+        'task_dedup': os.getenv('TASK_DEDUP', 'merge').lower(),
+        'task_dedup_threshold': float(os.getenv('TASK_DEDUP_THRESHOLD', '0.6')),
+        'fact_compact_every': int(os.getenv('FACT_COMPACT_EVERY', '25')),
+        'fact_merge_threshold': float(os.getenv('FACT_MERGE_THRESHOLD', '0.8')),
+        'fact_prompt_limit': int(os.getenv('FACT_PROMPT_LIMIT', '20')),
+        'fact_display_limit': int(os.getenv('FACT_DISPLAY_LIMIT', '200')),
+        'embedder': os.getenv('EMBEDDER', 'hashing').lower(),
+        'embedding_dim': int(os.getenv('EMBEDDING_DIM', '512')),
+        'embedding_model': os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small'),
+        'retrieval_enabled': os.getenv('RETRIEVAL_ENABLED', 'True').lower() == 'true',
+        'retrieval_top_k': int(os.getenv('RETRIEVAL_TOP_K', '5')),
+        'retrieval_max_chars': int(os.getenv('RETRIEVAL_MAX_CHARS', '2000')),
+        'retrieval_min_score': float(os.getenv('RETRIEVAL_MIN_SCORE', '0.15')),
+        'server_host': os.getenv('SERVER_HOST', '127.0.0.1'),
+        'server_port': int(os.getenv('SERVER_PORT', '8080')),
+        'server_db_workers': int(os.getenv('SERVER_DB_WORKERS', '8')),
+        'server_session_ttl_minutes': float(os.getenv('SERVER_SESSION_TTL_MINUTES', '60')),
+        'server_max_sessions': int(os.getenv('SERVER_MAX_SESSIONS', '1000')),
+        'server_max_open_tenants': int(os.getenv('SERVER_MAX_OPEN_TENANTS', '256')),
+        'server_max_body_mb': float(os.getenv('SERVER_MAX_BODY_MB', '25')),
         'DB_NAME': 'user_data.db'
     }
 
@@ -24,7 +72,7 @@ def load_config():
     os.makedirs(config['recordings_folder'], exist_ok=True)
 
     # Validate critical configuration
-    if not config['openai_api_key']:
+    if config['llm_backend'] == 'openai' and not config['openai_api_key']:
         raise ValueError("OpenAI API key is not set. Please set OPENAI_API_KEY in your environment or .env file.")
 
     return config
@@ -0,0 +1,20 @@
+import importlib
+import sys
+
+
+def lazy_exports(package, exports):
+    """
+    Module-level __getattr__ (PEP 562) for a package that re-exports names
+    from its submodules without importing them up front. `exports` maps
+    each name to its submodule, e.g. {'AudioRecorder': '.recorder'}; the
+    submodule is imported the first time the name is looked up.
+    """
+    def __getattr__(name):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        # Cache on the package so later lookups skip this hook
+        setattr(sys.modules[package], name, value)
+        return value
+    return __getattr__
@@ -0,0 +1,144 @@
+"""
+Where startup time goes, for `python main.py --profile-startup`: time per
+startup phase, the init spans recorded while the window was built, and
+module import time by package (like `python -X importtime`, but
+aggregated and split by thread).
+"""
+import importlib.abc
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Heavy third-party modules the desktop app should not need before its window is up
+DEFERRABLE_MODULES = ('openai', 'sounddevice', 'soundfile', 'tiktoken')
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    Meta path hook timing every module import from now on. Records
+    (module, thread name, cumulative seconds, self seconds), where self
+    time excludes the imports the module triggered.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path=None, target=None):
+        if getattr(self._local, 'finding', False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+        loader = spec.loader
+        # Built-in and frozen importers are shared classes; they are cheap, so leave them be
+        if loader is None or isinstance(loader, type) or not hasattr(loader, 'exec_module'):
+            return spec
+        exec_module = loader.exec_module
+        loader.exec_module = lambda module: self._timed(name, exec_module, module)
+        return spec
+
+    def _timed(self, name, exec_module, module):
+        stack = self._local.__dict__.setdefault('stack', [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            total = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += total
+            with self._lock:
+                self.records.append((name, threading.current_thread().name, total, total - nested))
+
+    def by_package(self, main_thread=True):
+        """
+        {package: self seconds} over the imports on (or off) the main thread.
+        Our own modules are grouped one level deeper (src.ai, src.data, ...).
+        """
+        main = threading.main_thread().name
+        with self._lock:
+            records = list(self.records)
+        packages = {}
+        for name, thread, _, own in records:
+            if (thread == main) != main_thread:
+                continue
+            parts = name.split('.')
+            package = '.'.join(parts[:2]) if parts[0] == 'src' else parts[0]
+            packages[package] = packages.get(package, 0.0) + own
+        return packages
+
+
+class StartupProfiler:
+    """
+    Times startup phases; with `imports`, also installs an ImportTimer.
+    """
+
+    def __init__(self, imports=True):
+        self.started = time.perf_counter()
+        self.phases = []
+        self.imports = ImportTimer().install() if imports else None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def report(self, spans=(), top=15):
+        """
+        The breakdown as text. `spans` are the tracer spans recorded during startup.
+        """
+        lines = [f"Time to window: {self.elapsed() * 1000:.0f} ms", "", f"{'phase':<32} {'ms':>9}"]
+        lines += [f"{name:<32} {seconds * 1000:9.1f}" for name, seconds in self.phases]
+
+        main = threading.main_thread().ident
+        init = {}
+        for span in spans:
+            if span.thread_id == main:
+                count, total = init.get(span.name, (0, 0.0))
+                init[span.name] = (count + 1, total + span.duration)
+        if init:
+            lines += ["", f"{'init span (main thread)':<32} {'count':>6} {'ms':>9}"]
+            for name, (count, total) in sorted(init.items(), key=lambda item: -item[1][1])[:top]:
+                lines.append(f"{name:<32} {count:6d} {total * 1000:9.1f}")
+
+        if self.imports:
+            for title, main_thread in (("imports (main thread)", True), ("imports (background threads)", False)):
+                packages = self.imports.by_package(main_thread)
+                if not packages:
+                    continue
+                lines += ["", f"{title:<32} {'ms':>9}   total {sum(packages.values()) * 1000:.0f} ms"]
+                for package, seconds in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+                    lines.append(f"{package:<32} {seconds * 1000:9.1f}")
+
+        deferred = [name for name in DEFERRABLE_MODULES if name not in sys.modules]
+        loaded = [name for name in DEFERRABLE_MODULES if name in sys.modules]
+        lines += ["", f"Not loaded at window time: {', '.join(deferred) or '-'}",
+                  f"Already loaded: {', '.join(loaded) or '-'}"]
+        return "\n".join(lines)
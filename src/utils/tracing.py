@@ -0,0 +1,170 @@
+import json
+import math
+import time
+import threading
+import functools
+from collections import deque
+
+DEFAULT_CAPACITY = 2000
+
+
+class Span:
+    """
+    One timed stage. Use as a context manager; tag() attaches sizes and
+    counts (bytes, tokens, rows, ...) that end up in the exported trace.
+    """
+    __slots__ = ('tracer', 'name', 'tags', 'start', 'wall_start', 'duration', 'thread_id', 'thread_name')
+
+    def __init__(self, tracer, name, tags):
+        self.tracer = tracer
+        self.name = name
+        self.tags = tags
+        self.duration = None
+
+    def tag(self, **tags):
+        self.tags.update(tags)
+        return self
+
+    def __enter__(self):
+        thread = threading.current_thread()
+        self.thread_id, self.thread_name = thread.ident, thread.name
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.tags['error'] = exc_type.__name__
+        self.tracer._record(self)
+        return False
+
+    def to_dict(self):
+        return {'name': self.name, 'start': self.wall_start, 'duration_ms': self.duration * 1000,
+                'thread': self.thread_name, 'tags': self.tags}
+
+
+class _NullSpan:
+    """
+    Shared stand-in returned while tracing is off: no clock reads, no allocation.
+    """
+    __slots__ = ()
+
+    def tag(self, **tags):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Collects spans into a bounded in-memory ring buffer (oldest dropped first).
+    Disabled tracers hand out NULL_SPAN, so instrumentation can stay in hot
+    paths permanently.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, enabled=False):
+        self.enabled = enabled
+        self._spans = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def span(self, name, **tags):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, tags)
+
+    def _record(self, span):
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def set_capacity(self, capacity):
+        with self._lock:
+            self._spans = deque(self._spans, maxlen=capacity)
+
+    def stats(self):
+        """
+        {stage: {'count', 'p50_ms', 'p95_ms', 'max_ms'}} over the buffered spans.
+        """
+        durations = {}
+        for span in self.spans():
+            durations.setdefault(span.name, []).append(span.duration * 1000)
+        return {name: {'count': len(values), 'p50_ms': percentile(values, 50),
+                       'p95_ms': percentile(values, 95), 'max_ms': max(values)}
+                for name, values in durations.items()}
+
+    def export_jsonl(self, path):
+        spans = self.spans()
+        with open(path, 'w', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+        return len(spans)
+
+    def export_chrome_trace(self, path):
+        """
+        Write the spans in Chrome trace-event format (chrome://tracing, Perfetto).
+        """
+        spans = self.spans()
+        events = [{'name': span.name, 'ph': 'X', 'ts': span.wall_start * 1e6, 'dur': span.duration * 1e6,
+                   'pid': 1, 'tid': span.thread_id, 'args': span.tags} for span in spans]
+        threads = {span.thread_id: span.thread_name for span in spans}
+        events.extend({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}}
+                      for tid, name in threads.items())
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+        return len(spans)
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+tracer = Tracer()
+
+
+def span(name, **tags):
+    """
+    Span on the process-wide tracer: `with span('transcribe', bytes=n) as s: ...`
+    """
+    return tracer.span(name, **tags)
+
+
+def traced(name):
+    """
+    Decorator form of span() for whole functions.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def configure(config):
+    """
+    Enable tracing in debug mode and size the ring buffer from config.
+    """
+    tracer.set_capacity(config.get('trace_buffer_size', DEFAULT_CAPACITY))
+    tracer.enabled = bool(config.get('debug_mode'))
+    return tracer
@@ -0,0 +1,223 @@
+import logging
+import threading
+import time
+from collections import deque
+
+
+class TurnCancelled(Exception):
+    """
+    Raised by Turn.check() once the turn has been cancelled or timed out.
+    """
+
+
+class Turn:
+    """
+    One unit of work queued on a TurnExecutor, e.g. a chat turn.
+
+    The job is called as job(turn, *args) on the executor's worker thread.
+    It hands UI updates back with turn.post(); those are dropped once the
+    turn is cancelled, so a late result never lands after the user moved
+    on. turn.check() raises TurnCancelled, letting long jobs stop between
+    steps (or between streamed tokens).
+    """
+
+    def __init__(self, executor, job, args, timeout=None, on_cancel=None):
+        self.executor = executor
+        self.job = job
+        self.args = args
+        self.timeout = timeout
+        self.on_cancel = on_cancel
+        self.reason = None
+        self.deadline = None
+        self.done = threading.Event()
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def remaining(self):
+        """
+        Seconds left before the turn times out; None without a timeout.
+        """
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def cancel(self, reason='cancelled'):
+        """
+        Cancel the turn, queued or running. Returns False if it had already
+        finished or been cancelled. on_cancel(turn) runs on the UI thread.
+        """
+        with self._lock:
+            if self.done.is_set() or self._cancelled.is_set():
+                return False
+            self.reason = reason
+            self._cancelled.set()
+        logging.info(f"Turn {reason}")
+        if self.on_cancel:
+            self.executor.dispatcher.post(self.on_cancel, self)
+        return True
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise TurnCancelled(self.reason)
+
+    def post(self, callback, *args):
+        """
+        Run callback(*args) on the UI thread, unless the turn is cancelled by then.
+        """
+        self.executor.dispatcher.post(self._apply, callback, args)
+
+    def _apply(self, callback, args):
+        if not self._cancelled.is_set():
+            callback(*args)
+
+    def _run(self):
+        timer = None
+        if self.timeout:
+            self.deadline = time.monotonic() + self.timeout
+            timer = threading.Timer(self.timeout, self.cancel, ('timed out',))
+            timer.daemon = True
+            timer.start()
+        try:
+            self.job(self, *self.args)
+        except TurnCancelled:
+            pass
+        except Exception as e:
+            # Jobs report their own errors; this only keeps the worker alive
+            logging.error(f"Unhandled error in turn: {e}", exc_info=True)
+        finally:
+            if timer:
+                timer.cancel()
+            with self._lock:
+                self.done.set()
+
+
+class TurnExecutor:
+    """
+    Runs turns one at a time, in submission order, on a single worker thread.
+
+    Because only one turn runs at a time and every UI update goes through
+    the same FIFO dispatcher, the updates of one turn are always applied
+    before those of the next. A turn's timeout counts from when it starts
+    running, not from when it was queued. on_idle() is posted once the
+    queue has drained.
+    """
+
+    def __init__(self, dispatcher, timeout=None, on_idle=None, name='turn'):
+        self.dispatcher = dispatcher
+        self.timeout = timeout
+        self.on_idle = on_idle
+        self._queue = deque()
+        self._current = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._work, name=f"{name}-executor", daemon=True)
+        self._thread.start()
+
+    def submit(self, job, *args, timeout=None, on_cancel=None):
+        """
+        Queue job(turn, *args) and return its Turn.
+        """
+        turn = Turn(self, job, args, self.timeout if timeout is None else timeout, on_cancel)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Turn executor is closed")
+            self._queue.append(turn)
+            self._condition.notify()
+        return turn
+
+    def pending(self):
+        """
+        Number of turns queued or running.
+        """
+        with self._condition:
+            return len(self._queue) + (self._current is not None)
+
+    def cancel_all(self, reason='cancelled'):
+        """
+        Cancel the running turn and everything queued behind it. Returns how many were cancelled.
+        """
+        with self._condition:
+            turns = ([self._current] if self._current else []) + list(self._queue)
+        return sum(turn.cancel(reason) for turn in turns)
+
+    def close(self, timeout=None):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self.cancel_all('closed')
+        self._thread.join(timeout)
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                turn = self._queue.popleft()
+                if turn.cancelled:
+                    turn.done.set()
+                    continue
+                self._current = turn
+            try:
+                turn._run()
+            finally:
+                with self._condition:
+                    self._current = None
+                    idle = not self._queue
+            if idle and self.on_idle:
+                self.dispatcher.post(self.on_idle)
+
+
+class AfterDispatcher:
+    """
+    Hands callbacks from worker threads to the Tk thread in batches.
+
+    Instead of one `after` per callback (one per streamed token), posted
+    callbacks collect in a FIFO and a single `after` drains them, at most
+    `budget_ms` of work per pass so a burst never freezes the window.
+    Callbacks run in exactly the order they were posted.
+    """
+
+    def __init__(self, widget, interval_ms=16, budget_ms=50):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.budget = budget_ms / 1000
+        self._pending = deque()
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def post(self, callback, *args):
+        with self._lock:
+            self._pending.append((callback, args))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.widget.after(self.interval_ms, self.flush)
+
+    def flush(self):
+        """
+        Run posted callbacks on the calling (Tk) thread. Returns how many ran.
+        """
+        deadline = time.perf_counter() + self.budget
+        ran = 0
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._scheduled = False
+                    return ran
+                callback, args = self._pending.popleft()
+            try:
+                callback(*args)
+            except Exception as e:
+                logging.error(f"Error in UI callback: {e}", exc_info=True)
+            ran += 1
+            if time.perf_counter() > deadline:
+                break
+        # Out of budget: let Tk handle events and redraw, then carry on
+        self.widget.after(1, self.flush)
+        return ran
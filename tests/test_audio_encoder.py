@@ -0,0 +1,70 @@
+import io
+import os
+import unittest
+
+import numpy as np
+import soundfile as sf
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+try:
+    from src.audio.encoder import AudioEncoder, resample, trim_silence
+    from src.audio.transcriber import Transcriber
+except OSError as e:
+    # src.audio imports sounddevice, which needs the PortAudio system library
+    raise unittest.SkipTest(f"audio stack unavailable: {e}")
+
+
+def tone(frequency, seconds, rate, amplitude=0.3):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def peak_frequency(samples, rate):
+    spectrum = np.abs(np.fft.rfft(samples))
+    return np.argmax(spectrum) * rate / samples.size
+
+
+class TestAudioEncoder(unittest.TestCase):
+    def test_resample_keeps_speech_band_and_removes_aliases(self):
+        speech = resample(tone(440, 1, 44100), 44100, 16000)
+        self.assertEqual(speech.size, 16000)
+        self.assertAlmostEqual(peak_frequency(speech, 16000), 440, delta=2)
+        # 12 kHz is above the new Nyquist frequency and must not fold back in
+        alias = resample(tone(12000, 1, 44100), 44100, 16000)
+        self.assertLess(np.sqrt(np.mean(alias[200:-200] ** 2)), 0.01)
+
+    def test_trim_silence_keeps_padding(self):
+        signal = np.concatenate([np.zeros(16000, np.float32), tone(300, 1, 16000), np.zeros(32000, np.float32)])
+        trimmed = trim_silence(signal, 16000, padding_ms=200)
+        self.assertAlmostEqual(trimmed.size / 16000, 1.4, delta=0.05)
+        silent = np.zeros(16000, np.float32)
+        self.assertEqual(trim_silence(silent, 16000).size, silent.size)
+
+    def test_encoded_upload_is_smaller_and_decodable(self):
+        rng = np.random.default_rng(0)
+        recording = np.concatenate([np.zeros(44100, np.float32),
+                                    tone(220, 3, 44100) * (1 + 0.5 * rng.standard_normal(3 * 44100)).astype(np.float32) * 0.5,
+                                    np.zeros(44100, np.float32)])
+        wav = io.BytesIO()
+        sf.write(wav, recording, 44100, format='WAV', subtype='PCM_16')
+        for upload_format in ('flac', 'ogg'):
+            name, data = AudioEncoder(upload_format).encode_samples(recording, 44100, "note")
+            self.assertTrue(name.startswith("note."))
+            self.assertLess(len(data), len(wav.getvalue()) / 2)
+            decoded, rate = sf.read(io.BytesIO(data))
+            self.assertEqual(rate, 16000)
+            self.assertAlmostEqual(decoded.size / rate, 3.4, delta=0.1)
+
+    def test_transcriber_encoder_can_be_disabled(self):
+        encoder = AudioEncoder('ogg')
+        self.assertIs(Transcriber(encoder=encoder).encoder, encoder)
+        self.assertIsNone(Transcriber(encoder=None).encoder)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            AudioEncoder('mp3')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import soundfile as sf
+
+try:
+    from src.audio.recorder import AudioRecorder
+    from src.audio.ring_buffer import AudioRingBuffer
+except OSError as e:
+    # src.audio imports sounddevice, which needs the PortAudio system library
+    raise unittest.SkipTest(f"audio stack unavailable: {e}")
+
+
+class FakeInputStream:
+    """Calls the callback with 10 ms ramps from a thread, like a PortAudio stream."""
+
+    def __init__(self, samplerate, channels, dtype, callback):
+        self.block = int(samplerate / 100)
+        self.callback = callback
+        self.running = False
+        self.counter = 0
+
+    def _run(self):
+        status = SimpleNamespace(input_overflow=False)
+        while self.running:
+            block = (np.arange(self.counter, self.counter + self.block, dtype=np.float32) % 100 / 1000).reshape(-1, 1)
+            self.counter += self.block
+            self.callback(block, self.block, None, status)
+            time.sleep(0.002)
+
+    def __enter__(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.running = False
+        self.thread.join()
+
+
+class Listener:
+    def __init__(self):
+        self.frames = 0
+        self.closed = 0
+
+    def feed(self, block):
+        self.frames += len(block)
+
+    def close(self):
+        self.closed += 1
+
+
+class TestAudioRingBuffer(unittest.TestCase):
+    def test_wraparound_and_overflow(self):
+        ring = AudioRingBuffer(8)
+        ring.write(np.arange(6, dtype=np.float32).reshape(-1, 1))
+        ring.consume(4)
+        self.assertEqual(ring.write(np.arange(6, 12, dtype=np.float32).reshape(-1, 1)), 6)
+        self.assertEqual(ring.write(np.zeros((3, 1), np.float32)), 0)
+        self.assertEqual((ring.overflow_frames, ring.overflow_events), (3, 1))
+        views = ring.segments()
+        self.assertEqual(len(views), 2)
+        self.assertEqual(np.concatenate(views).ravel().tolist(), list(range(4, 12)))
+        ring.consume(ring.available())
+        self.assertEqual(ring.segments(), [])
+
+
+@mock.patch('src.audio.recorder.sd.InputStream', FakeInputStream)
+class TestAudioRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stop_returns_finalized_file(self):
+        recorder = AudioRecorder(self.tmp.name, sample_rate=16000, buffer_seconds=1, flush_ms=20)
+        listener = Listener()
+        recorder.start_recording(listener=listener)
+        time.sleep(0.2)
+        path = recorder.stop_recording()
+        data, rate = sf.read(path, dtype='float32')
+        self.assertEqual(rate, 16000)
+        self.assertEqual(len(data), recorder.stats['frames'])
+        self.assertGreater(len(data), 0)
+        self.assertEqual(listener.frames, len(data))
+        self.assertEqual(listener.closed, 1)
+        self.assertEqual(recorder.stats['overflow_frames'], 0)
+        # Samples arrive contiguous and in order
+        expected = np.arange(len(data)) % 100 / 1000
+        np.testing.assert_allclose(data, expected, atol=1e-4)
+
+    def test_stalled_writer_overflows_without_blocking_stop(self):
+        recorder = AudioRecorder(self.tmp.name, sample_rate=16000, buffer_seconds=0.05, flush_ms=10000)
+        recorder.start_recording()
+        time.sleep(0.2)
+        start = time.perf_counter()
+        path = recorder.stop_recording()
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertGreater(recorder.stats['overflow_frames'], 0)
+        self.assertEqual(len(sf.read(path)[0]), 800)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.ai.context_rollup import ContextRollup
+from src.data.diary_entry import DiaryEntry
+from src.data.storage import close_storage
+from src.data.user_profile import UserProfile
+
+
+class FakeExtractor:
+    def __init__(self):
+        self.calls = []
+        self.fail_days = 0
+
+    def extract_context(self, entries, period, previous_contexts):
+        self.calls.append((period, len(entries)))
+        if self.fail_days:
+            # The extractor returns None on API errors
+            self.fail_days -= 1
+            return None
+        return f"{period} of {len(entries)} entries"
+
+    def extract_rollup(self, summaries, period, child_period):
+        self.calls.append((period, len(summaries)))
+        return f"{period} of {len(summaries)} {child_period}s" if summaries else None
+
+
+class TestContextRollup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.diary = DiaryEntry(self.tmp.name)
+        self.extractor = FakeExtractor()
+        self.rollup = ContextRollup(self.extractor, self.diary, UserProfile(self.tmp.name))
+        self.now = datetime.datetime(2024, 5, 15, 12, 0)   # a Wednesday
+
+    def tearDown(self):
+        close_storage(self.diary.db_path)
+        self.tmp.cleanup()
+
+    def _add_entry(self, when, text="entry"):
+        with self.diary.storage.transaction() as conn:
+            conn.execute('INSERT INTO diary_entries (timestamp, content, ts_epoch) VALUES (?, ?, ?)',
+                         (when.isoformat(), text, int(when.timestamp())))
+
+    def test_rollup_builds_from_children_once(self):
+        self._add_entry(datetime.datetime(2024, 5, 13, 9))
+        self._add_entry(datetime.datetime(2024, 5, 14, 9))
+        self._add_entry(datetime.datetime(2024, 5, 14, 18))
+
+        self.assertEqual(self.rollup.get_context('week', self.now), "week of 2 days")
+        self.assertEqual(sorted(self.extractor.calls), [('day', 1), ('day', 2), ('week', 2)])
+
+        self.extractor.calls.clear()
+        self.assertEqual(self.rollup.get_context('year', self.now), "year of 1 months")
+        self.assertEqual(sorted(self.extractor.calls), [('month', 1), ('year', 1)])
+
+        self.extractor.calls.clear()
+        self.rollup.get_context('year', self.now)
+        self.assertEqual(self.extractor.calls, [])
+
+    def test_new_entry_only_recomputes_covering_periods(self):
+        self._add_entry(datetime.datetime(2024, 5, 13, 9))
+        self._add_entry(datetime.datetime(2024, 4, 2, 9))
+        self.rollup.get_context('year', self.now)
+        self.extractor.calls.clear()
+
+        self._add_entry(datetime.datetime(2024, 5, 15, 8))
+        self.assertEqual(self.rollup.get_context('year', self.now), "year of 2 months")
+        self.assertEqual(sorted(self.extractor.calls), [('day', 1), ('month', 1), ('week', 2), ('year', 2)])
+
+    def test_failed_child_is_retried_instead_of_dropped(self):
+        self._add_entry(datetime.datetime(2024, 5, 13, 9))
+        self._add_entry(datetime.datetime(2024, 5, 14, 9))
+        self.extractor.fail_days = 1
+        self.assertEqual(self.rollup.get_context('week', self.now), "week of 1 days")
+
+        self.extractor.calls.clear()
+        self.assertEqual(self.rollup.get_context('week', self.now), "week of 2 days")
+        self.assertEqual(sorted(self.extractor.calls), [('day', 1), ('week', 2)])
+
+    def test_prepare_refreshes_levels_bottom_up(self):
+        for day in (6, 7, 13, 14):
+            self._add_entry(datetime.datetime(2024, 5, day, 9))
+        self.rollup.prepare(['day', 'week', 'month', 'year'], self.now)
+        levels = [period for period, _ in self.extractor.calls]
+        self.assertEqual(levels, ['day'] * 4 + ['week'] * 2 + ['month', 'year'])
+
+        self.extractor.calls.clear()
+        self.assertEqual(self.rollup.get_context('month', self.now), "month of 2 weeks")
+        self.assertEqual(self.extractor.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
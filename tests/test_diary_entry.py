@@ -0,0 +1,114 @@
+import datetime
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from src.data.diary_entry import DiaryEntry, period_start
+from src.data.storage import close_storage
+
+
+class TestDiaryEntry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'user_data.db')
+
+    def tearDown(self):
+        close_storage(self.db_path)
+        self.tmp.cleanup()
+
+    def _create_legacy_diary(self, timestamps):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('CREATE TABLE diary_entries (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, content TEXT)')
+            conn.executemany('INSERT INTO diary_entries (timestamp, content) VALUES (?, ?)',
+                             [(ts.strftime("%Y-%m-%dT%H:%M:%S.%f"), f"entry {i}") for i, ts in enumerate(timestamps)])
+
+    def test_migration_backfills_epoch(self):
+        ts = datetime.datetime(2024, 3, 5, 14, 30, 15, 123456)
+        self._create_legacy_diary([ts])
+        diary = DiaryEntry(self.tmp.name)
+        epoch = diary.storage.execute('SELECT ts_epoch FROM diary_entries').fetchone()[0]
+        self.assertEqual(epoch, int(ts.timestamp()))
+
+    def test_period_queries_use_epoch(self):
+        now = datetime.datetime.now()
+        old = period_start('year') - datetime.timedelta(days=3)
+        self._create_legacy_diary([old, now])
+        diary = DiaryEntry(self.tmp.name)
+        diary.save_entry("fresh")
+        entries = diary.get_entries_for_period('day')
+        self.assertEqual([e['content'] for e in entries], ["fresh", "entry 1"])
+        self.assertTrue(diary.has_entries_for_period('year'))
+        self.assertEqual(len(diary.get_entries()), 3)
+
+    def test_entry_dates_match_distinct_days(self):
+        base = datetime.datetime(2024, 1, 1, 23, 59, 59)
+        timestamps = [base, base + datetime.timedelta(seconds=1), base + datetime.timedelta(days=2, hours=5)]
+        self._create_legacy_diary(timestamps)
+        diary = DiaryEntry(self.tmp.name)
+        self.assertEqual(diary.get_entry_dates(), ['2024-01-04', '2024-01-02', '2024-01-01'])
+
+    def test_iter_entries_pages_with_keyset(self):
+        same_second = datetime.datetime(2024, 5, 1, 12, 0, 0)
+        timestamps = [same_second] * 4 + [same_second + datetime.timedelta(hours=i) for i in range(1, 4)]
+        self._create_legacy_diary(timestamps)
+        diary = DiaryEntry(self.tmp.name)
+        pages = list(diary.iter_entries(limit=3))
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        ids = [entry['id'] for page in pages for entry in page]
+        self.assertEqual(ids, [entry['id'] for entry in diary.get_entries()])
+        self.assertEqual(diary.get_entries_page_after(ids[3], limit=2), [
+            {'id': ids[1], 'timestamp': diary.get_entries()[1]['timestamp'], 'content': 'entry 5'},
+            {'id': ids[2], 'timestamp': diary.get_entries()[2]['timestamp'], 'content': 'entry 4'},
+        ])
+
+    def test_pages_continue_past_a_deleted_cursor(self):
+        base = datetime.datetime(2024, 5, 1, 12, 0, 0)
+        self._create_legacy_diary([base + datetime.timedelta(hours=i) for i in range(6)])
+        diary = DiaryEntry(self.tmp.name)
+        ids = [entry['id'] for entry in diary.get_entries()]   # newest first: 6, 5, ..., 1
+        diary.delete_entry(ids[2])
+        self.assertEqual([e['id'] for e in diary.get_entries_page(ids[2], limit=2)], ids[3:5])
+        self.assertEqual([e['id'] for e in diary.get_entries_page_after(ids[2], limit=5)], ids[:2])
+        diary.delete_entry(ids[-1])
+        self.assertEqual(diary.get_entries_page(ids[-1]), [])
+        diary.delete_entry(ids[0])
+        self.assertEqual(diary.get_entries_page_after(ids[0]), [])
+
+    def test_search_ranks_matches_and_tracks_changes(self):
+        self._create_legacy_diary([datetime.datetime(2024, 1, 1)] * 3)
+        diary = DiaryEntry(self.tmp.name)
+        diary.storage.execute("UPDATE diary_entries SET content = 'My back pain is worse today, back again' WHERE id = 1")
+        diary.storage.execute("UPDATE diary_entries SET content = 'Went for a run' WHERE id = 2")
+        diary.save_entry("Back to work after the weekend")
+
+        results = diary.search("back pain?")
+        self.assertEqual([r['id'] for r in results], [1, 4])
+        self.assertIn('[pain]', results[0]['snippet'])
+        self.assertEqual(diary.search('"run" OR *'), [r for r in diary.search('run')])
+
+        diary.delete_entry(1)
+        self.assertEqual([r['id'] for r in diary.search("pain")], [])
+
+    def test_like_fallback_matches_wildcards_literally(self):
+        diary = DiaryEntry(self.tmp.name)
+        diary.fts_enabled = False
+        for text in ("Gave it 100% today", "Gave it 1000 tries", "a_b testing", "axb testing"):
+            diary.save_entry(text)
+        self.assertEqual([r['snippet'] for r in diary.search("100%")], ["Gave it 100% today"])
+        self.assertEqual([r['snippet'] for r in diary.search("a_b")], ["a_b testing"])
+
+    def test_search_index_is_created_once_fts5_is_available(self):
+        self._create_legacy_diary([datetime.datetime(2024, 1, 1)])
+        with mock.patch('src.data.schema.fts5_available', return_value=False):
+            self.assertFalse(DiaryEntry(self.tmp.name).fts_enabled)
+        close_storage(self.db_path)
+
+        diary = DiaryEntry(self.tmp.name)
+        self.assertTrue(diary.fts_enabled)
+        self.assertEqual([r['id'] for r in diary.search("entry")], [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
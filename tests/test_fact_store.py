@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.data.storage import close_storage
+from src.data.user_info import UserInfo
+from src.data.user_profile import UserProfile
+
+
+class TestFactStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        close_storage(os.path.join(self.tmp.name, 'user_data.db'))
+        self.tmp.cleanup()
+
+    def test_repeated_facts_are_upserted(self):
+        info = UserInfo(self.tmp.name)
+        self.assertEqual(info.update_info(["Works as a nurse", "Has two cats"]), 2)
+        self.assertEqual(info.update_info(["works as a nurse.", "  Has two cats  ", "Lives in Leeds"]), 1)
+        facts = {fact['item']: fact for fact in info.get_info()}
+        self.assertEqual(sorted(facts), ["Has two cats", "Lives in Leeds", "Works as a nurse"])
+        self.assertEqual(facts["Works as a nurse"]['seen'], 2)
+        self.assertEqual(facts["Lives in Leeds"]['seen'], 1)
+        self.assertEqual(len(info.get_info(limit=2)), 2)
+
+    def test_compaction_folds_near_duplicates(self):
+        profile = UserProfile(self.tmp.name)
+        profile.compact_every = 1000
+        profile.update_profile(["User has a golden retriever named Max", "Values time with family"])
+        profile.update_profile(["User has a golden retriever named Max"])
+        profile.update_profile(["The user has a golden retriever named Max", "Is learning Spanish"])
+        self.assertEqual(profile.count(), 4)
+        self.assertEqual(profile.compact(), 1)
+        facts = {fact['item']: fact for fact in profile.get_profile()}
+        self.assertEqual(sorted(facts), ["Is learning Spanish", "User has a golden retriever named Max",
+                                         "Values time with family"])
+        merged = facts["User has a golden retriever named Max"]
+        self.assertEqual(merged['seen'], 3)
+        self.assertEqual(merged['timestamp'], facts["Is learning Spanish"]['timestamp'])
+
+    def test_compaction_runs_periodically(self):
+        info = UserInfo(self.tmp.name)
+        info.compact_every = 3
+        info.update_info(["Runs 5k every Saturday with a friend", "Enjoys baking bread"])
+        info.update_info(["The user runs 5k every Saturday with a friend"])
+        self.assertEqual(info.count(), 2)
+
+    def test_legacy_rows_are_keyed_and_folded(self):
+        profile = UserProfile(self.tmp.name)
+        with profile.storage.transaction() as conn:
+            conn.executemany('INSERT INTO user_profile (item, timestamp) VALUES (?, ?)',
+                             [("Enjoys hiking", "2024-01-01T10:00:00"), ("enjoys hiking!", "2024-03-01T10:00:00"),
+                              ("Writes poetry", "2024-02-01T10:00:00")])
+        profile.update_profile(["Enjoys hiking"])
+        facts = {fact['item']: fact for fact in profile.get_profile()}
+        self.assertEqual(sorted(facts), ["Enjoys hiking", "Writes poetry"])
+        self.assertEqual(facts["Enjoys hiking"]['seen'], 3)
+        self.assertEqual(facts["Enjoys hiking"]['first_seen'], "2024-01-01T10:00:00")
+
+    def test_top_facts_is_bounded_and_ranked_by_seen(self):
+        info = UserInfo(self.tmp.name)
+        info.compact_every = 1000
+        info.update_info([f"Fact number {index} about the user" for index in range(40)])
+        info.update_info(["Fact number 7 about the user"])
+        top = info.top_facts(5)
+        self.assertEqual(len(top), 5)
+        self.assertEqual(top[0], "Fact number 7 about the user")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.data.storage import close_storage
+from src.importer import Importer, RateLimiter, discover, original_timestamp
+
+
+class FakeTranscriber:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def transcribe(self, path, language=None, raise_errors=False):
+        name = os.path.basename(path)
+        self.calls.append(name)
+        if name in self.failing:
+            raise RuntimeError("upload failed")
+        return f"Transcript of {name}"
+
+
+class TestImporter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, 'journal')
+        self.user_data = os.path.join(self.tmp.name, 'user_data')
+        os.makedirs(os.path.join(self.source, 'memos'))
+        os.makedirs(self.user_data)
+        self.write('2023-01-05 morning.md', "# Morning\nWoke up early.")
+        self.write('notes.txt', "Undated note")
+        self.write('empty.txt', "   ")
+        self.write('.DS_Store', "x")
+        for name in ('2023-02-01T08-15-00 memo.m4a', '20230203_2130.wav', 'broken.wav'):
+            self.write(os.path.join('memos', name), "audio")
+
+    def tearDown(self):
+        close_storage(os.path.join(self.user_data, 'user_data.db'))
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.source, name), 'w') as f:
+            f.write(content)
+
+    def entries(self, importer):
+        return {entry['content']: entry['timestamp'] for entry in importer.diary_entry.get_entries()}
+
+    def test_discovery_and_timestamps(self):
+        kinds = [kind for _, kind in discover(self.source)]
+        self.assertEqual(sorted(kinds), ['audio'] * 3 + ['text'] * 3)
+        self.assertEqual(original_timestamp('2023-02-01T08-15-00 memo.m4a'), datetime.datetime(2023, 2, 1, 8, 15))
+        self.assertEqual(original_timestamp('20230203_2130.wav'), datetime.datetime(2023, 2, 3, 21, 30))
+
+    def test_import_resume_and_retry(self):
+        transcriber = FakeTranscriber(failing={'broken.wav'})
+        importer = Importer(self.user_data, transcriber, workers=2, rate_per_minute=0, batch_size=2)
+        stats = importer.run(self.source)
+        self.assertEqual(stats, {'imported': 4, 'empty': 1, 'failed': 1, 'skipped': 0})
+        entries = self.entries(importer)
+        self.assertTrue(entries["# Morning\nWoke up early."].startswith('2023-01-05T00:00:00'))
+        self.assertTrue(entries["Transcript of 2023-02-01T08-15-00 memo.m4a"].startswith('2023-02-01T08:15:00'))
+
+        # A second run only retries the failure
+        transcriber.failing.clear()
+        transcriber.calls.clear()
+        stats = Importer(self.user_data, transcriber, rate_per_minute=0).run(self.source)
+        self.assertEqual(stats, {'imported': 1, 'empty': 0, 'failed': 0, 'skipped': 5})
+        self.assertEqual(transcriber.calls, ['broken.wav'])
+        self.assertEqual(len(importer.diary_entry.get_entries()), 5)
+
+        # Edited files are imported again
+        self.write('notes.txt', "Undated note, revised")
+        os.utime(os.path.join(self.source, 'notes.txt'), (1, 1))
+        stats = Importer(self.user_data, transcriber, rate_per_minute=0).run(self.source)
+        self.assertEqual(stats['imported'], 1)
+
+    def test_file_removed_mid_import_is_recorded_as_failed(self):
+        importer = Importer(self.user_data, FakeTranscriber(), rate_per_minute=0)
+        read = importer._read
+
+        def read_after_removal(path):
+            if os.path.basename(path) == 'notes.txt':
+                os.remove(path)
+            return read(path)
+
+        importer._read = read_after_removal
+        stats = importer.run(self.source)
+        self.assertEqual(stats, {'imported': 4, 'empty': 1, 'failed': 1, 'skipped': 0})
+        self.assertEqual(len(importer.diary_entry.get_entries()), 4)
+        notes = os.path.join(self.source, 'notes.txt')
+        self.assertEqual(importer.journal.get_status([notes])[notes][0], 'failed')
+
+    def test_rate_limiter_spaces_requests(self):
+        limiter = RateLimiter(per_minute=1200, burst=1)
+        start = datetime.datetime.now()
+        for _ in range(4):
+            limiter.acquire()
+        self.assertGreaterEqual((datetime.datetime.now() - start).total_seconds(), 0.14)
+
+
+if __name__ == '__main__':
+    unittest.main()
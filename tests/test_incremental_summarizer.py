@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.ai.incremental_summarizer import IncrementalSummarizer
+from src.data.storage import close_storage
+from src.data.summary_cache import SummaryCache
+
+
+class FakeExtractor:
+    def __init__(self):
+        self.calls = []
+        self.failing = False
+
+    def extract_context(self, entries, period, previous_contexts):
+        self.calls.append(('extract', [entry['id'] for entry in entries]))
+        return '+'.join(entry['content'] for entry in entries)
+
+    def extend_context(self, previous_summary, new_entries, period):
+        self.calls.append(('extend', [entry['id'] for entry in new_entries]))
+        if self.failing:
+            return None
+        return '+'.join([previous_summary] + [entry['content'] for entry in new_entries])
+
+
+def entry(entry_id, content):
+    return {'id': entry_id, 'timestamp': f"2024-05-01T10:00:0{entry_id}", 'content': content}
+
+
+class TestIncrementalSummarizer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = SummaryCache(self.tmp.name)
+        self.extractor = FakeExtractor()
+        self.summarizer = IncrementalSummarizer(self.extractor, self.cache)
+
+    def tearDown(self):
+        close_storage(self.cache.db_path)
+        self.tmp.cleanup()
+
+    def test_hit_extend_and_miss(self):
+        first = [entry(1, 'a'), entry(2, 'b')]
+        self.assertEqual(self.summarizer.summarize(first), 'a+b')
+        self.assertEqual(self.summarizer.summarize(list(reversed(first))), 'a+b')
+        self.assertEqual(self.summarizer.summarize(first + [entry(3, 'c')]), 'a+b+c')
+        self.assertEqual(self.summarizer.summarize([entry(1, 'edited'), entry(2, 'b')]), 'edited+b')
+        self.assertEqual(self.extractor.calls, [('extract', [1, 2]), ('extend', [3]), ('extract', [1, 2])])
+        self.assertEqual(self.summarizer.stats, {'hits': 1, 'extended': 1, 'misses': 2, 'stale': 0, 'prefetched': 0})
+
+    def test_prefetch_turns_next_lookup_into_hit(self):
+        self.summarizer.summarize([entry(1, 'a')])
+        self.summarizer.prefetch([entry(1, 'a'), entry(2, 'b')])
+        self.assertEqual(self.summarizer.summarize([entry(1, 'a'), entry(2, 'b')]), 'a+b')
+        self.assertEqual(self.summarizer.stats['hits'], 1)
+        self.assertEqual(self.summarizer.stats['prefetched'], 1)
+
+    def test_failed_extension_serves_the_stale_summary(self):
+        self.summarizer.summarize([entry(1, 'a')])
+        self.extractor.failing = True
+        self.summarizer.prefetch([entry(1, 'a'), entry(2, 'b')])
+        self.assertEqual(self.summarizer.summarize([entry(1, 'a'), entry(2, 'b')]), 'a')
+        self.assertEqual(self.summarizer.stats, {'hits': 0, 'extended': 0, 'misses': 1, 'stale': 1, 'prefetched': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
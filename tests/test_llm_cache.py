@@ -0,0 +1,107 @@
+import os
+import tempfile
+import time
+import unittest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from openai.types.chat import ChatCompletion
+from src.ai.cached_client import CachedClient
+from src.data.llm_cache import LLMCache
+from src.data.storage import close_storage
+
+
+def completion(content):
+    return ChatCompletion.model_validate({
+        'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-test',
+        'choices': [{'index': 0, 'finish_reason': 'stop',
+                     'message': {'role': 'assistant', 'content': content}}],
+    })
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return completion(f"answer {self.calls}")
+
+
+class FakeClient:
+    def __init__(self):
+        self.chat = type('Chat', (), {})()
+        self.chat.completions = FakeCompletions()
+        self.audio = 'audio'
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = LLMCache(self.tmp.name)
+        self.fake = FakeClient()
+        self.client = CachedClient(self.fake, self.cache)
+
+    def tearDown(self):
+        close_storage(self.cache.db_path)
+        self.tmp.cleanup()
+
+    def ask(self, text, **kwargs):
+        response = self.client.chat.completions.create(
+            model='gpt-test', messages=[{'role': 'user', 'content': text}], **kwargs)
+        return response.choices[0].message.content
+
+    def test_repeated_request_is_served_from_cache(self):
+        self.assertEqual(self.ask('hello'), 'answer 1')
+        self.assertEqual(self.ask('hello'), 'answer 1')
+        self.assertEqual(self.ask('other'), 'answer 2')
+        self.assertEqual(self.fake.chat.completions.calls, 2)
+        self.assertEqual(self.cache.stats['hits'], 1)
+        self.assertEqual(self.cache.stats['misses'], 2)
+        self.assertGreater(self.cache.stats['bytes_saved'], 0)
+
+    def test_cache_survives_restart(self):
+        self.ask('hello')
+        reopened = CachedClient(self.fake, LLMCache(self.tmp.name))
+        response = reopened.chat.completions.create(model='gpt-test', messages=[{'role': 'user', 'content': 'hello'}])
+        self.assertEqual(response.choices[0].message.content, 'answer 1')
+        self.assertEqual(self.fake.chat.completions.calls, 1)
+
+    def test_bypass_and_passthrough(self):
+        self.ask('hello')
+        self.assertEqual(self.ask('hello', cache_bypass=True), 'answer 2')
+        self.assertEqual(self.cache.stats['bypassed'], 1)
+        self.assertEqual(self.client.audio, 'audio')
+
+    def test_expired_entries_are_refetched(self):
+        self.cache.ttl_seconds = 60
+        self.ask('hello')
+        with self.cache.storage.transaction() as conn:
+            conn.execute('UPDATE llm_cache SET created_at = ?', (time.time() - 120,))
+        self.assertEqual(self.ask('hello'), 'answer 2')
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.ask('a')
+        size = self.cache.storage.execute('SELECT size FROM llm_cache').fetchone()[0]
+        self.cache.max_bytes = size * 2
+        self.ask('b')
+        self.ask('a')  # refresh 'a' so 'b' is the oldest
+        self.ask('c')
+        self.assertEqual(self.cache.stats['evicted'], 1)
+        self.assertEqual(self.ask('a'), 'answer 1')
+        self.assertEqual(self.ask('b'), 'answer 4')
+
+    def test_replaced_entries_are_not_counted_twice(self):
+        self.cache.put('a', 'gpt-test', 'x' * 100)
+        self.cache.max_bytes = 250
+        for _ in range(5):
+            self.cache.put('a', 'gpt-test', 'x' * 100)
+        self.cache.put('b', 'gpt-test', 'y' * 100)
+        self.assertEqual(self.cache.stats['evicted'], 0)
+        self.cache.put('c', 'gpt-test', 'z' * 100)
+        self.assertEqual(self.cache.stats['evicted'], 1)
+        self.assertIsNone(self.cache.get('a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import io
+import json
+import time
+import unittest
+
+from openai import APIStatusError, OpenAI
+from src.ai.chat import COACHING_FUNCTION
+from src.ai.local_server import LocalLLMServer
+from src.ai.stream_parser import JsonStringFieldStreamer
+
+
+class TestLocalServer(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalLLMServer(seed=1).start()
+        self.client = OpenAI(api_key='local', base_url=self.server.url, max_retries=0)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def coach(self, **kwargs):
+        return self.client.chat.completions.create(
+            model='gpt-test', messages=[{'role': 'user', 'content': 'I went for a run'}],
+            functions=[COACHING_FUNCTION], function_call={'name': 'provide_coaching_response'}, **kwargs)
+
+    def test_function_call_matches_schema_and_is_deterministic(self):
+        function_call = self.coach().choices[0].message.function_call
+        self.assertEqual(function_call.name, 'provide_coaching_response')
+        arguments = json.loads(function_call.arguments)
+        self.assertIsInstance(arguments['output'], str)
+        self.assertIsInstance(arguments['tasks'], list)
+        self.assertEqual(self.coach().choices[0].message.function_call.arguments, function_call.arguments)
+
+    def test_streamed_function_arguments_reassemble(self):
+        expected = json.loads(self.coach().choices[0].message.function_call.arguments)
+        streamer, arguments, output = JsonStringFieldStreamer('output'), [], []
+        for chunk in self.coach(stream=True):
+            delta = chunk.choices[0].delta.function_call
+            if delta and delta.arguments:
+                arguments.append(delta.arguments)
+                output.append(streamer.feed(delta.arguments))
+        self.assertEqual(json.loads(''.join(arguments)), expected)
+        self.assertEqual(''.join(output), expected['output'])
+
+    def test_plain_completion_and_transcription(self):
+        response = self.client.chat.completions.create(model='gpt-test', messages=[{'role': 'user', 'content': 'hi'}])
+        self.assertTrue(response.choices[0].message.content)
+        transcript = self.client.audio.transcriptions.create(
+            model='whisper-1', file=('a.wav', io.BytesIO(b'\0' * 16000)), response_format='text')
+        self.assertTrue(transcript.strip())
+
+    def test_latency_and_error_injection(self):
+        self.server.latency = 0.05
+        start = time.perf_counter()
+        self.coach()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+        self.server.error_rate = 1.0
+        with self.assertRaises(APIStatusError) as raised:
+            self.coach()
+        self.assertEqual(raised.exception.status_code, 500)
+        self.assertEqual(self.server.stats['errors'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from src.ai.prompt_builder import PromptBuilder, TokenCounter
+
+
+class HeuristicCounter(TokenCounter):
+    def __init__(self):
+        self.encoding = None
+
+
+class TestPromptBuilder(unittest.TestCase):
+    def setUp(self):
+        self.builder = PromptBuilder(HeuristicCounter(), budget=200, reserved_output_tokens=50)
+
+    def test_everything_fits(self):
+        sections = [("latest_entry", "Latest entry: hi\n\n", 0), ("user_context", "User Context: likes tea", 2)]
+        history = [{"role": "user", "content": "hello"}]
+        messages, report = self.builder.build(sections, "Respond.", history, history_summary="said hi before")
+        self.assertEqual(messages[0]["content"], "Latest entry: hi\n\nUser Context: likes tea")
+        self.assertEqual(messages[1]["content"], "Summary of the earlier conversation: said hi before")
+        self.assertEqual(messages[-1], history[0])
+        self.assertEqual(set(report), {"history_summary", "history", "latest_entry", "user_context", "total"})
+
+    def test_low_priority_sections_trimmed_first(self):
+        sections = [("latest_entry", "L" * 200, 0), ("previous_entries", "P" * 200, 1), ("user_context", "U" * 400, 2)]
+        messages, report = self.builder.build(sections, "Respond.", [{"role": "user", "content": "x"}])
+        self.assertEqual(report["latest_entry"], 50)
+        self.assertEqual(report["previous_entries"], 50)
+        self.assertTrue(0 < report["user_context"] < 100)
+        self.assertTrue(messages[0]["content"].endswith("U..."))
+        self.assertLessEqual(report["total"] + 50, 200)
+
+        sections.insert(1, ("retrieved", "R" * 400, 1))
+        _, report = self.builder.build(sections, "Respond.", [{"role": "user", "content": "x"}])
+        self.assertEqual(report["user_context"], 0)
+
+    def test_oldest_turns_dropped_when_required_sections_fill_budget(self):
+        history = [{"role": "user", "content": "t" * 160} for _ in range(5)]
+        messages, report = self.builder.build([("latest_entry", "L" * 200, 0)], "Respond.", history)
+        self.assertEqual(messages[-1], history[-1])
+        self.assertEqual(len(messages), 2 + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import random
+import unittest
+
+from src.ui.row_view import RowView, plan_render
+
+
+def rows_of(*keys, changed=()):
+    return [(key, f"row {key}{'!' if key in changed else ''}\n") for key in keys]
+
+
+def plan(old, new):
+    return plan_render([key for key, _ in old], dict(old), new)
+
+
+class TestPlanRender(unittest.TestCase):
+    def test_appended_and_prepended_rows_keep_the_rest(self):
+        old = rows_of(1, 2, 3)
+        self.assertEqual(plan(old, rows_of(1, 2, 3, 4)), ({1, 2, 3}, []))
+        self.assertEqual(plan(old, rows_of(0, 1, 2, 3)), ({1, 2, 3}, []))
+
+    def test_changed_and_missing_rows_are_removed(self):
+        kept, removed = plan(rows_of(1, 2, 3, 4), rows_of(1, 2, 4, changed={2}))
+        self.assertEqual(kept, {1, 4})
+        self.assertEqual(removed, [2, 3])
+
+    def test_a_moved_row_is_the_only_one_reinserted(self):
+        # A re-seen fact jumps to the top of a newest-first list
+        kept, removed = plan(rows_of(*range(10)), rows_of(7, 0, 1, 2, 3, 4, 5, 6, 8, 9))
+        self.assertEqual(removed, [7])
+        kept, removed = plan(rows_of(*range(10)), rows_of(1, 2, 3, 4, 5, 6, 7, 8, 9, 0))
+        self.assertEqual(removed, [0])
+
+    def test_nothing_kept_when_everything_changed(self):
+        self.assertEqual(plan(rows_of(1, 2), rows_of(3, 4)), (set(), [1, 2]))
+
+
+class TestRowView(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import tkinter as tk
+        try:
+            cls.root = tk.Tk()
+        except tk.TclError as e:
+            raise unittest.SkipTest(f"no display: {e}")
+        cls.root.withdraw()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.root.destroy()
+
+    def setUp(self):
+        import tkinter as tk
+        self.text = tk.Text(self.root)
+        self.view = RowView(self.text, 'test')
+
+    def tearDown(self):
+        self.text.destroy()
+
+    def content(self):
+        return self.text.get('1.0', 'end-1c')
+
+    def test_random_updates_match_a_full_render(self):
+        rng = random.Random(3)
+        rows = rows_of(*range(20))
+        for step in range(200):
+            rows = list(rows)
+            change = rng.randrange(4)
+            if change == 0 and rows:
+                rows.pop(rng.randrange(len(rows)))
+            elif change == 1:
+                rows.insert(rng.randint(0, len(rows)), (100 + step, f"new {step}\n"))
+            elif change == 2 and rows:
+                index = rng.randrange(len(rows))
+                rows[index] = (rows[index][0], rows[index][1] + "!")
+            elif rows:
+                rows.insert(rng.randint(0, len(rows) - 1), rows.pop(rng.randrange(len(rows))))
+            self.view.render(rows)
+            self.assertEqual(self.content(), ''.join(text for _, text in rows))
+
+    def test_small_changes_touch_only_their_rows(self):
+        rows = rows_of(*range(1000))
+        self.assertEqual(self.view.render(rows), (1000, 0))
+        self.assertEqual(self.view.render(rows + rows_of(1000)), (1, 0))
+        self.assertEqual(self.view.render(rows_of(*range(1001), changed={500})), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.ai.local_server import LocalLLMServer
+from src.server import SessionStore, start_service
+from src.utils.config import get_config
+
+
+async def request(port, method, path, payload=None, raw=None, user=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = raw if raw is not None else (json.dumps(payload).encode() if payload is not None else b'')
+    user_header = f"X-User-Id: {user}\r\n" if user else ""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n{user_header}"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    head, _, body = data.partition(b'\r\n\r\n')
+    status = int(head.split(b' ')[1])
+    if b'text/event-stream' in head:
+        events = [line[6:] for line in body.decode().split('\n\n') if line.startswith('data: ')]
+        return status, [json.loads(event) for event in events if event != '[DONE]']
+    return status, json.loads(body) if body else None
+
+
+class TestCoachService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.llm = LocalLLMServer(seed=1).start()
+        self.config_patch = mock.patch.dict(get_config(), {
+            'llm_backend': 'local', 'llm_base_url': self.llm.url, 'llm_cache_enabled': False})
+        self.config_patch.start()
+        self.service, self.server = await start_service(get_config(), '127.0.0.1', 0, self.tmp.name)
+        self.port = self.server.port
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.service.close()
+        self.config_patch.stop()
+        self.llm.stop()
+        self.tmp.cleanup()
+
+    async def new_session(self):
+        status, body = await request(self.port, 'POST', '/sessions')
+        self.assertEqual(status, 201)
+        return body['session_id']
+
+    async def test_chat_turns_keep_separate_session_histories(self):
+        first, second = await self.new_session(), await self.new_session()
+        replies = await asyncio.gather(
+            request(self.port, 'POST', '/chat', {'session_id': first, 'message': 'I slept well'}),
+            request(self.port, 'POST', '/chat', {'session_id': second, 'message': 'Busy day at work'}))
+        for status, reply in replies:
+            self.assertEqual(status, 200)
+            self.assertNotIn('error', reply)
+            self.assertTrue(reply['output'])
+
+        sessions = self.service.sessions
+        self.assertEqual([turn['content'] for turn in sessions.get(first).conversation.history], ['I slept well'])
+        self.assertEqual([turn['content'] for turn in sessions.get(second).conversation.history], ['Busy day at work'])
+        _, diary = await request(self.port, 'GET', '/diary')
+        self.assertEqual({entry['content'] for entry in diary['entries']}, {'I slept well', 'Busy day at work'})
+        _, tasks = await request(self.port, 'GET', '/tasks')
+        self.assertEqual(len(tasks['tasks']), 2)
+
+    async def test_streamed_chat_sends_tokens_then_response(self):
+        session = await self.new_session()
+        status, events = await request(self.port, 'POST', '/chat',
+                                       {'session_id': session, 'message': 'Went running', 'stream': True})
+        self.assertEqual(status, 200)
+        tokens = ''.join(event['token'] for event in events if 'token' in event)
+        self.assertEqual(events[-1]['response']['output'], tokens)
+
+    async def test_streamed_chat_reports_failures_as_an_event(self):
+        session = await self.new_session()
+        with mock.patch('src.data.diary_entry.DiaryEntry.save_entry', side_effect=RuntimeError("disk full")):
+            status, events = await request(self.port, 'POST', '/chat',
+                                           {'session_id': session, 'message': 'Went running', 'stream': True})
+        self.assertEqual(status, 200)
+        self.assertEqual(events, [{'error': {'status': 500, 'message': 'disk full'}}])
+
+    async def test_diary_and_tasks_endpoints(self):
+        self.assertEqual((await request(self.port, 'POST', '/diary', {'text': 'Planted tomatoes'}))[0], 201)
+        status, found = await request(self.port, 'GET', '/diary/search?q=tomatoes')
+        self.assertEqual(status, 200)
+        self.assertEqual(len(found['results']), 1)
+
+        await request(self.port, 'POST', '/tasks', {'tasks': ['Water the garden']})
+        _, tasks = await request(self.port, 'GET', '/tasks')
+        task_id = tasks['tasks'][0]['id']
+        self.assertEqual((await request(self.port, 'POST', f'/tasks/{task_id}/complete'))[0], 204)
+        _, tasks = await request(self.port, 'GET', '/tasks')
+        self.assertTrue(tasks['tasks'][0]['completed'])
+
+    async def test_concurrent_writes_all_succeed(self):
+        results = await asyncio.gather(*(request(self.port, 'POST', '/diary', {'text': f'Entry {i}'})
+                                         for i in range(32)))
+        self.assertEqual({status for status, _ in results}, {201})
+        _, diary = await request(self.port, 'GET', '/diary?limit=100')
+        self.assertEqual(len(diary['entries']), 32)
+
+    async def test_users_have_separate_data_and_sessions(self):
+        await request(self.port, 'POST', '/diary', {'text': 'Alice was here'}, user='alice')
+        await request(self.port, 'POST', '/diary', {'text': 'Bob was here'}, user='bob')
+        _, alice = await request(self.port, 'GET', '/diary', user='alice')
+        self.assertEqual([entry['content'] for entry in alice['entries']], ['Alice was here'])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, 'bob', 'user_data.db')))
+
+        _, session = await request(self.port, 'POST', '/sessions', user='alice')
+        status, _ = await request(self.port, 'POST', '/chat', {'session_id': session['session_id'], 'message': 'hi'},
+                                  user='bob')
+        self.assertEqual(status, 404)
+        self.assertEqual((await request(self.port, 'GET', '/diary', user='../etc'))[0], 400)
+
+    async def test_user_reopened_during_eviction_gets_fresh_services(self):
+        service, registry = self.service, self.service.tenants
+        registry.max_open = 1
+        tenant, alice = service._open_user('alice')
+        registry.release(tenant)
+        close_user, reopened = registry.on_evict, []
+
+        def on_evict(evicted):
+            # A request for alice racing with her eviction, before her services are dropped
+            tenant, user = service._open_user('alice')
+            registry.release(tenant)
+            reopened.append(user)
+            close_user(evicted)
+
+        registry.on_evict = on_evict
+        tenant, _ = service._open_user('bob')
+        registry.release(tenant)
+        self.assertEqual(len(reopened), 1)
+        self.assertIsNot(reopened[0], alice)
+        self.assertTrue(reopened[0].chatbot._context_loader.submit(lambda: True).result())
+
+    async def test_errors_are_json(self):
+        self.assertEqual((await request(self.port, 'GET', '/nope'))[0], 404)
+        self.assertEqual((await request(self.port, 'GET', '/chat'))[0], 405)
+        status, body = await request(self.port, 'POST', '/chat', raw=b'{not json')
+        self.assertEqual(status, 400)
+        self.assertIn('Invalid JSON', body['error']['message'])
+        status, _ = await request(self.port, 'POST', '/chat', {'session_id': 'missing', 'message': 'hi'})
+        self.assertEqual(status, 404)
+
+
+class TestSessionStore(unittest.TestCase):
+    def test_idle_sessions_expire_and_size_is_bounded(self):
+        store = SessionStore(idle_seconds=60, max_sessions=2)
+        first, second = store.create(), store.create()
+        store.get(first.id)
+        third = store.create()
+        self.assertIsNone(store.get(second.id))
+        self.assertIs(store.get(first.id), first)
+
+        with mock.patch('src.server.sessions.time.monotonic', return_value=third.last_used + 61):
+            self.assertIsNone(store.get(third.id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.ai.backend import LazyClient, shared_client
+from src.utils.startup import ImportTimer, StartupProfiler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_after(code):
+    """
+    Names of the watched modules loaded after running `code` in a fresh interpreter.
+    """
+    script = code + "\nimport sys\nprint(','.join(name for name in " \
+                    "('openai', 'sounddevice', 'soundfile', 'src.ui.main_window') if name in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True,
+                            env=dict(os.environ, OPENAI_API_KEY='test-key'))
+    if result.returncode:
+        raise AssertionError(result.stderr)
+    return set(filter(None, result.stdout.strip().split(',')))
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_submodules_do_not_pull_in_heavy_dependencies(self):
+        self.assertEqual(loaded_after("import src.ui.row_view, src.audio.vad, src.data, src.ai"), set())
+
+    def test_main_window_defers_the_sdk_and_audio_stack(self):
+        self.assertEqual(loaded_after("import src.ui.main_window"), {'src.ui.main_window'})
+
+    def test_package_exports_resolve_on_use(self):
+        from src import audio, data
+        self.assertEqual(audio.VoiceActivitySegmenter.__name__, 'VoiceActivitySegmenter')
+        self.assertIs(data.Tenant, sys.modules['src.data.tenant'].Tenant)
+        with self.assertRaises(AttributeError):
+            audio.NoSuchThing
+
+
+class TestSharedClient(unittest.TestCase):
+    def test_one_client_per_backend(self):
+        config = {'llm_backend': 'local', 'llm_base_url': 'http://127.0.0.1:9/v1', 'openai_api_key': 'key'}
+        client = shared_client(config)
+        self.assertIsInstance(client, LazyClient)
+        self.assertIs(shared_client(dict(config)), client)
+        self.assertIsNot(shared_client(dict(config, llm_base_url='http://127.0.0.1:10/v1')), client)
+
+    def test_client_is_built_on_first_use(self):
+        client = shared_client({'llm_backend': 'local', 'llm_base_url': 'http://127.0.0.1:11/v1'})
+        self.assertIsNone(client._client)
+        self.assertTrue(str(client.base_url).startswith('http://127.0.0.1:11'))
+        self.assertIs(client.resolve(), client._client)
+
+
+class TestStartupProfiler(unittest.TestCase):
+    def test_import_timer_records_nested_imports(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, 'startup_outer.py'), 'w') as f:
+                f.write("import time\nimport startup_inner\ntime.sleep(0.01)\n")
+            with open(os.path.join(tmp, 'startup_inner.py'), 'w') as f:
+                f.write("import time\ntime.sleep(0.02)\n")
+            sys.path.insert(0, tmp)
+            timer = ImportTimer().install()
+            try:
+                import startup_outer  # noqa: F401
+            finally:
+                timer.uninstall()
+                sys.path.remove(tmp)
+                sys.modules.pop('startup_outer', None)
+                sys.modules.pop('startup_inner', None)
+        records = {name: (total, own) for name, _, total, own in timer.records}
+        self.assertGreaterEqual(records['startup_inner'][1], 0.02)
+        outer_total, outer_own = records['startup_outer']
+        self.assertGreaterEqual(outer_total, 0.03)
+        self.assertLess(outer_own, outer_total - 0.015)
+        packages = timer.by_package()
+        self.assertIn('startup_outer', packages)
+        self.assertEqual(timer.by_package(main_thread=False), {})
+
+    def test_report_lists_phases(self):
+        profiler = StartupProfiler(imports=False)
+        with profiler.phase('config'):
+            pass
+        report = profiler.report()
+        self.assertIn("Time to window", report)
+        self.assertIn("config", report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from src.data.storage import StorageEngine
+
+
+class TestStorageEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = StorageEngine(os.path.join(self.tmp.name, 'test.db'))
+        with self.engine.transaction() as conn:
+            conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+
+    def tearDown(self):
+        self.engine.close()
+        self.tmp.cleanup()
+
+    def test_wal_mode_enabled(self):
+        mode = self.engine.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode.lower(), 'wal')
+
+    def test_connection_reused_per_thread(self):
+        self.assertIs(self.engine.connection(), self.engine.connection())
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.engine.connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], self.engine.connection())
+
+    def test_nested_transaction_rolls_back_as_a_whole(self):
+        with self.assertRaises(RuntimeError):
+            with self.engine.transaction() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('outer')")
+                with self.engine.transaction() as inner:
+                    inner.execute("INSERT INTO items (name) VALUES ('inner')")
+                raise RuntimeError("abort")
+        count = self.engine.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_reads_not_blocked_by_open_write_transaction(self):
+        with self.engine.transaction() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('committed')")
+        started, release = threading.Event(), threading.Event()
+
+        def writer():
+            with self.engine.transaction() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('pending')")
+                started.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        started.wait(5)
+        count = self.engine.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+        release.set()
+        thread.join()
+        self.assertEqual(count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import json
+import unittest
+
+from src.ai.stream_parser import JsonStringFieldStreamer
+
+
+def stream(text, chunk_size):
+    streamer = JsonStringFieldStreamer('output')
+    return ''.join(streamer.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size))
+
+
+class TestJsonStringFieldStreamer(unittest.TestCase):
+    def test_extracts_field_in_any_chunking(self):
+        payload = {
+            "user_profile": ["says \"output\": \"not this\""],
+            "tasks": [{"output": "nested"}],
+            "output": "Line one\nTab\there \"quoted\" \\ slash é \U0001F600 done",
+            "new_user_info": [],
+        }
+        text = json.dumps(payload)
+        for chunk_size in (1, 2, 3, 7, len(text)):
+            self.assertEqual(stream(text, chunk_size), payload["output"])
+
+    def test_non_ascii_output_without_escapes(self):
+        text = json.dumps({"output": "Привет, мир"}, ensure_ascii=False)
+        self.assertEqual(stream(text, 1), "Привет, мир")
+
+    def test_partial_stream_returns_prefix(self):
+        streamer = JsonStringFieldStreamer('output')
+        self.assertEqual(streamer.feed('{"tasks": [], "out'), '')
+        self.assertEqual(streamer.feed('put": "Hel'), 'Hel')
+        self.assertEqual(streamer.feed('lo\\'), 'lo')
+        self.assertEqual(streamer.feed('n'), '\n')
+        self.assertFalse(streamer.done)
+        self.assertEqual(streamer.feed('", "tasks2": "x"}'), '')
+        self.assertTrue(streamer.done)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import random
+import time
+import unittest
+
+import numpy as np
+
+try:
+    from src.audio.streaming_transcriber import StreamingTranscriber
+    from src.audio.vad import VoiceActivitySegmenter
+except OSError as e:
+    # src.audio imports sounddevice, which needs the PortAudio system library
+    raise unittest.SkipTest(f"audio stack unavailable: {e}")
+
+RATE = 16000
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds):
+    return np.random.default_rng(0).normal(0, 0.001, int(RATE * seconds)).astype(np.float32)
+
+
+def blocks(signal, size=1024):
+    return [signal[i:i + size].reshape(-1, 1) for i in range(0, signal.size, size)]
+
+
+class FakeTranscriber:
+    """Transcribes an utterance as its duration in tenths of a second, out of order."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.calls = 0
+
+    def transcribe_samples(self, samples, sample_rate, language=None):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("upload failed")
+        time.sleep(random.uniform(0, 0.05))
+        return f" {round(samples.size / sample_rate * 10)} "
+
+
+class TestVoiceActivitySegmenter(unittest.TestCase):
+    def test_cuts_utterances_at_pauses(self):
+        utterances = []
+        segmenter = VoiceActivitySegmenter(RATE, utterances.append, padding_ms=0)
+        signal = np.concatenate([silence(1), tone(1), silence(1), tone(0.5), silence(1), tone(0.1), silence(1)])
+        for block in blocks(signal):
+            segmenter.feed(block)
+        segmenter.flush()
+        # The 100 ms blip is below min_speech_ms
+        self.assertEqual(len(utterances), 2)
+        self.assertAlmostEqual(utterances[0].size / RATE, 1.0, delta=0.1)
+        self.assertAlmostEqual(utterances[1].size / RATE, 0.5, delta=0.1)
+
+    def test_flush_emits_trailing_speech_and_long_speech_is_split(self):
+        utterances = []
+        segmenter = VoiceActivitySegmenter(RATE, utterances.append, max_utterance_s=2.0)
+        for block in blocks(tone(5)):
+            segmenter.feed(block)
+        segmenter.flush()
+        self.assertEqual(len(utterances), 3)
+
+    def test_loud_background_noise_is_learned(self):
+        utterances = []
+        segmenter = VoiceActivitySegmenter(RATE, utterances.append, padding_ms=0)
+        # Noise around -30 dB, well above threshold_db, with one second of speech in it
+        noise = np.random.default_rng(1).normal(0, 0.03, RATE * 12).astype(np.float32)
+        noise[RATE * 8:RATE * 9] += tone(1)
+        for block in blocks(noise):
+            segmenter.feed(block)
+        segmenter.flush()
+        # Cut at pauses rather than at max_utterance_s
+        self.assertTrue(all(utterance.size / RATE < 5 for utterance in utterances))
+        self.assertTrue(any(abs(utterance.size / RATE - 1.0) < 0.15 for utterance in utterances))
+
+    def test_integer_samples(self):
+        utterances = []
+        segmenter = VoiceActivitySegmenter(RATE, utterances.append)
+        segmenter.feed((tone(1) * 32767).astype(np.int16))
+        segmenter.flush()
+        self.assertEqual(len(utterances), 1)
+
+
+class TestStreamingTranscriber(unittest.TestCase):
+    def record(self, streaming, signal):
+        for block in blocks(signal):
+            streaming.feed(block)
+        streaming.close()
+
+    def test_transcripts_are_stitched_in_order(self):
+        streaming = StreamingTranscriber(FakeTranscriber(), RATE, max_workers=4, padding_ms=0)
+        self.record(streaming, np.concatenate([tone(1), silence(1), tone(0.5), silence(1), tone(2), silence(1)]))
+        self.assertEqual(streaming.finish(timeout=5), "10 5 20")
+
+    def test_failures_and_no_speech_fall_back(self):
+        failing = StreamingTranscriber(FakeTranscriber(fail_on=2), RATE, padding_ms=0)
+        self.record(failing, np.concatenate([tone(1), silence(1), tone(1), silence(1)]))
+        self.assertIsNone(failing.finish(timeout=5))
+
+        quiet = StreamingTranscriber(FakeTranscriber(), RATE)
+        self.record(quiet, silence(2))
+        self.assertIsNone(quiet.finish(timeout=5))
+
+        unclosed = StreamingTranscriber(FakeTranscriber(), RATE)
+        self.assertIsNone(unclosed.finish(timeout=0.01))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.data.similarity import MinHasher, SimilarityIndex, similarity
+from src.data.storage import close_storage
+from src.data.task_manager import TaskManager
+
+
+class TestSimilarity(unittest.TestCase):
+    def test_estimates_track_jaccard(self):
+        hasher = MinHasher()
+        walk = hasher.signature("Go for a 20-minute walk after lunch")
+        self.assertEqual(similarity(walk, hasher.signature("go for a 20 minute walk after lunch!")), 1.0)
+        self.assertGreater(similarity(walk, hasher.signature("Take a 20 minute walk after lunch")), 0.6)
+        self.assertLess(similarity(walk, hasher.signature("Read 20 pages of a novel")), 0.3)
+
+    def test_index_finds_only_live_neighbours(self):
+        hasher = MinHasher()
+        index = SimilarityIndex()
+        index.add(1, hasher.signature("Call your sister this weekend"))
+        index.add(2, hasher.signature("Plan meals for the week"))
+        self.assertEqual(index.query(hasher.signature("Call your sister this weekend!"))[0], 1)
+        self.assertIsNone(index.query(hasher.signature("Renew the car insurance")))
+        index.remove(1)
+        self.assertIsNone(index.query(hasher.signature("Call your sister this weekend")))
+        self.assertEqual(set().union(*index.buckets[0].values()), {2})
+
+
+class TestTaskDedup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        close_storage(os.path.join(self.tmp.name, 'user_data.db'))
+        self.tmp.cleanup()
+
+    def test_paraphrases_merge_into_the_open_task(self):
+        tasks = TaskManager(self.tmp.name, dedup='merge')
+        self.assertEqual(tasks.add_tasks(["Go for a 20-minute walk after lunch", "Plan meals for the week"]),
+                         {'added': 2, 'merged': 0, 'flagged': 0})
+        counts = tasks.add_tasks(["Take a 20 minute walk after lunch", "Go for a 20 minute walk after lunch.",
+                                  "Renew the car insurance"])
+        self.assertEqual(counts, {'added': 1, 'merged': 2, 'flagged': 0})
+        rows = {row['task']: row for row in tasks.get_tasks()}
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows["Go for a 20-minute walk after lunch"]['mentions'], 3)
+
+    def test_completed_tasks_can_be_suggested_again(self):
+        tasks = TaskManager(self.tmp.name, dedup='merge')
+        tasks.add_tasks(["Stretch for ten minutes"])
+        tasks.complete_task(tasks.get_tasks()[0]['id'])
+        self.assertEqual(tasks.add_tasks(["Stretch for ten minutes"])['added'], 1)
+
+    def test_flag_mode_keeps_the_duplicate(self):
+        tasks = TaskManager(self.tmp.name, dedup='flag')
+        tasks.add_tasks(["Write three things you are grateful for"])
+        tasks.add_tasks(["Write down three things you're grateful for"])
+        first, second = tasks.get_tasks()
+        self.assertEqual(second['duplicate_of'], first['id'])
+
+    def test_signatures_persist_and_legacy_rows_are_backfilled(self):
+        TaskManager(self.tmp.name, dedup='off').add_tasks(["Book a dentist appointment"])
+        tasks = TaskManager(self.tmp.name, dedup='merge')
+        self.assertEqual(tasks.add_tasks(["Book a dentist appointment."])['merged'], 1)
+        with tasks.storage.transaction() as conn:
+            missing = conn.execute('SELECT COUNT(*) FROM tasks WHERE signature IS NULL').fetchone()[0]
+        self.assertEqual(missing, 0)
+        # A fresh manager rebuilds its index from the stored signatures
+        self.assertEqual(TaskManager(self.tmp.name).add_tasks(["book a dentist appointment"])['merged'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
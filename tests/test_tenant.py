@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from contextlib import ExitStack
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.data import storage
+from src.data.diary_entry import DiaryEntry
+from src.data.tenant import Tenant, TenantRegistry
+
+
+class TestTenantRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.evicted = []
+        self.registry = TenantRegistry(self.tmp.name, max_open=3, on_evict=self.evicted.append)
+
+    def tearDown(self):
+        self.registry.close()
+        self.tmp.cleanup()
+
+    def open_engines(self):
+        return [path for path in storage._engines if path.startswith(self.tmp.name)]
+
+    def test_each_user_gets_an_isolated_database(self):
+        DiaryEntry(self.registry.get('alice')).save_entry("alice's entry")
+        bob = DiaryEntry(self.registry.get('bob'))
+        self.assertEqual(bob.get_entries(), [])
+        self.assertEqual(bob.db_path, os.path.join(self.tmp.name, 'bob', 'user_data.db'))
+
+    def test_least_recently_used_tenants_are_closed(self):
+        for index in range(10):
+            DiaryEntry(self.registry.get(f'user{index}')).save_entry("hello")
+        self.assertEqual(self.registry.open_count(), 3)
+        self.assertEqual(len(self.open_engines()), 3)
+        self.assertEqual([tenant.user_id for tenant in self.evicted], [f'user{index}' for index in range(7)])
+
+    def test_leased_tenants_are_not_evicted(self):
+        with self.registry.lease('pinned') as pinned:
+            diary = DiaryEntry(pinned)
+            for index in range(5):
+                self.registry.get(f'user{index}')
+            self.assertNotIn(pinned, self.evicted)
+            diary.save_entry("still open")
+        self.registry.get('another')
+        self.assertIn(pinned, self.evicted)
+
+    def test_stores_reopen_after_eviction(self):
+        diary = DiaryEntry(self.registry.get('first'))
+        diary.save_entry("before eviction")
+        for index in range(3):
+            self.registry.get(f'user{index}')
+        self.assertEqual([entry['content'] for entry in diary.get_entries()], ["before eviction"])
+        Tenant(diary.tenant.folder).close()
+
+    def test_user_reacquired_during_eviction_keeps_an_open_database(self):
+        # A request for 'alice' comes in while 'bob' evicts her and is mid-transaction when the close runs
+        requests = ExitStack()
+        connections = []
+
+        def on_evict(tenant):
+            if tenant.user_id == 'alice':
+                alice = requests.enter_context(self.registry.lease('alice'))
+                connections.append(requests.enter_context(alice.storage.transaction()))
+                connections[0].execute('SELECT COUNT(*) FROM diary_entries')
+
+        self.registry = TenantRegistry(self.tmp.name, max_open=1, on_evict=on_evict)
+        DiaryEntry(self.registry.get('alice')).save_entry("alice's entry")
+        with requests:
+            self.registry.get('bob')
+            count = connections[0].execute('SELECT COUNT(*) FROM diary_entries').fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_rejects_unsafe_user_ids(self):
+        for user_id in ('', '../escape', 'a/b', '.hidden', None):
+            with self.assertRaises(ValueError):
+                self.registry.get(user_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.utils.tracing import NULL_SPAN, Tracer, percentile
+
+
+class TestTracing(unittest.TestCase):
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer()
+        with tracer.span('stage', bytes=10) as span:
+            span.tag(tokens=5)
+        self.assertIs(tracer.span('stage'), NULL_SPAN)
+        self.assertEqual(tracer.spans(), [])
+
+    def test_spans_carry_tags_and_errors(self):
+        tracer = Tracer(enabled=True)
+        with tracer.span('transcribe', bytes=10) as span:
+            span.tag(chars=3)
+        with self.assertRaises(ValueError):
+            with tracer.span('llm'):
+                raise ValueError("boom")
+        first, second = tracer.spans()
+        self.assertEqual(first.tags, {'bytes': 10, 'chars': 3})
+        self.assertGreaterEqual(first.duration, 0)
+        self.assertEqual(second.tags['error'], 'ValueError')
+
+    def test_ring_buffer_keeps_newest(self):
+        tracer = Tracer(capacity=3, enabled=True)
+        for i in range(5):
+            with tracer.span(f"stage-{i}"):
+                pass
+        self.assertEqual([span.name for span in tracer.spans()], ['stage-2', 'stage-3', 'stage-4'])
+
+    def test_percentiles_and_stats(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([7], 95), 7)
+        tracer = Tracer(enabled=True)
+        for _ in range(4):
+            with tracer.span('db'):
+                pass
+        self.assertEqual(tracer.stats()['db']['count'], 4)
+
+    def test_exports(self):
+        tracer = Tracer(enabled=True)
+        with tracer.span('turn', tokens=12):
+            with tracer.span('llm'):
+                pass
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl_path = os.path.join(tmp, 'trace.jsonl')
+            chrome_path = os.path.join(tmp, 'trace.json')
+            self.assertEqual(tracer.export_jsonl(jsonl_path), 2)
+            tracer.export_chrome_trace(chrome_path)
+            with open(jsonl_path) as f:
+                lines = [json.loads(line) for line in f]
+            with open(chrome_path) as f:
+                events = json.load(f)['traceEvents']
+        self.assertEqual([line['name'] for line in lines], ['llm', 'turn'])
+        complete = [event for event in events if event['ph'] == 'X']
+        self.assertEqual(complete[1]['args'], {'tokens': 12})
+        self.assertTrue(any(event['ph'] == 'M' for event in events))
+
+
+if __name__ == '__main__':
+    unittest.main()
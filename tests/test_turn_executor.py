@@ -0,0 +1,139 @@
+import threading
+import time
+import unittest
+
+from src.utils.turn_executor import AfterDispatcher, TurnCancelled, TurnExecutor
+
+
+class FakeWidget:
+    """
+    Stands in for the Tk root: records `after` calls, run by pump() on the test thread.
+    """
+
+    def __init__(self):
+        self.scheduled = []
+        self.after_calls = 0
+        self.lock = threading.Lock()
+
+    def after(self, ms, callback):
+        with self.lock:
+            self.after_calls += 1
+            self.scheduled.append(callback)
+
+    def pump(self):
+        with self.lock:
+            callbacks, self.scheduled = self.scheduled, []
+        for callback in callbacks:
+            callback()
+
+
+class TestTurnExecutor(unittest.TestCase):
+    def setUp(self):
+        self.widget = FakeWidget()
+        self.dispatcher = AfterDispatcher(self.widget)
+        self.applied = []
+        self.idle = threading.Event()
+        self.executor = TurnExecutor(self.dispatcher, on_idle=self.idle.set)
+
+    def tearDown(self):
+        self.executor.close(timeout=5)
+
+    def drain(self):
+        # Wait for the worker to finish, then run what it posted (on_idle included)
+        deadline = time.monotonic() + 5
+        while (not self.idle.is_set() or self.executor.pending()) and time.monotonic() < deadline:
+            time.sleep(0.005)
+            self.widget.pump()
+        self.assertTrue(self.idle.is_set())
+        self.assertEqual(self.executor.pending(), 0)
+        self.widget.pump()
+
+    def test_turns_run_and_apply_in_submission_order(self):
+        def job(turn, name, delay):
+            time.sleep(delay)
+            for step in range(3):
+                turn.post(self.applied.append, (name, step))
+
+        # The first turn is the slowest; it must still be applied first
+        for name, delay in (('a', 0.05), ('b', 0.0), ('c', 0.01)):
+            self.executor.submit(job, name, delay)
+        self.drain()
+        self.assertEqual(self.applied, [(name, step) for name in 'abc' for step in range(3)])
+
+    def test_cancelled_turns_apply_nothing(self):
+        release = threading.Event()
+
+        def running(turn):
+            turn.post(self.applied.append, 'before')
+            release.wait(5)
+            turn.post(self.applied.append, 'after')
+
+        def queued(turn):
+            self.applied.append('queued ran')
+
+        cancelled = []
+        first = self.executor.submit(running, on_cancel=cancelled.append)
+        second = self.executor.submit(queued, on_cancel=cancelled.append)
+        third = self.executor.submit(lambda turn: turn.post(self.applied.append, 'third'))
+        self.assertTrue(first.cancel())
+        self.assertTrue(second.cancel())
+        self.assertFalse(second.cancel())
+        release.set()
+        self.drain()
+        self.assertEqual(self.applied, ['third'])
+        self.assertEqual(cancelled, [first, second])
+        self.assertTrue(second.done.is_set())
+
+    def test_timeout_cancels_a_running_turn(self):
+        def slow(turn):
+            self.assertIsNotNone(turn.remaining())
+            while True:
+                turn.check()
+                time.sleep(0.005)
+
+        reasons = []
+        turn = self.executor.submit(slow, timeout=0.05, on_cancel=lambda turn: reasons.append(turn.reason))
+        self.drain()
+        self.assertTrue(turn.done.is_set())
+        self.assertEqual(reasons, ['timed out'])
+        with self.assertRaises(TurnCancelled):
+            turn.check()
+
+    def test_a_failing_turn_does_not_stop_the_queue(self):
+        def failing(turn):
+            raise ValueError("boom")
+
+        self.executor.submit(failing)
+        self.executor.submit(lambda turn: turn.post(self.applied.append, 'next'))
+        self.drain()
+        self.assertEqual(self.applied, ['next'])
+
+
+class TestAfterDispatcher(unittest.TestCase):
+    def test_posts_are_batched_into_one_after(self):
+        widget = FakeWidget()
+        dispatcher = AfterDispatcher(widget)
+        applied = []
+        for index in range(100):
+            dispatcher.post(applied.append, index)
+        self.assertEqual(widget.after_calls, 1)
+        widget.pump()
+        self.assertEqual(applied, list(range(100)))
+        dispatcher.post(applied.append, 100)
+        self.assertEqual(widget.after_calls, 2)
+
+    def test_a_long_batch_yields_and_resumes_in_order(self):
+        widget = FakeWidget()
+        dispatcher = AfterDispatcher(widget, budget_ms=0)
+        applied = []
+        for index in range(5):
+            dispatcher.post(applied.append, index)
+        widget.pump()
+        self.assertEqual(applied, [0])
+        while widget.scheduled:
+            widget.pump()
+        self.assertEqual(applied, list(range(5)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import os
+import datetime
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.ai.chat import ChatBot
+from src.ai.local_server import LocalLLMServer
+from src.data.diary_entry import DiaryEntry
+from src.data.embedder import ClientEmbedder, HashingEmbedder
+from src.data.tenant import Tenant
+from src.data.vector_index import VectorIndex
+from src.utils.config import get_config
+from src.utils.turn_executor import TurnCancelled
+
+PAST_ENTRIES = [
+    "Went for a long run by the river, legs sore but I feel great.",
+    "Tense meeting with my manager about the project deadline.",
+    "Called mum, she is worried about dad's health again.",
+    "Couldn't sleep, kept thinking about money and the budget.",
+    "My sister visited and we cooked dinner together.",
+]
+
+
+class TestHashingEmbedder(unittest.TestCase):
+    def test_vectors_are_normalized_and_deterministic(self):
+        embedder = HashingEmbedder(dim=256)
+        vectors = embedder.embed(["Running by the river", "Running by the river", ""])
+        self.assertEqual(vectors.shape, (3, 256))
+        self.assertEqual(vectors.dtype, np.float32)
+        self.assertAlmostEqual(float(np.linalg.norm(vectors[0])), 1.0, places=5)
+        np.testing.assert_array_equal(vectors[0], vectors[1])
+        self.assertFalse(vectors[2].any())
+
+    def test_word_forms_overlap(self):
+        run, running, budget = HashingEmbedder().embed(["run", "running", "budget"])
+        self.assertGreater(run @ running, run @ budget)
+
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tenant = Tenant(self.tmp.name)
+        self.diary = DiaryEntry(self.tenant)
+        for text in PAST_ENTRIES:
+            self.diary.save_entry(text)
+
+    def tearDown(self):
+        self.tenant.close()
+        self.tmp.cleanup()
+
+    def test_saved_entries_are_indexed_incrementally(self):
+        self.assertEqual(len(self.diary.vectors), len(PAST_ENTRIES))
+        self.diary.save_entry("Gym session: squats and deadlifts.")
+        self.assertEqual(len(self.diary.vectors), len(PAST_ENTRIES) + 1)
+        self.assertEqual(self.diary.vectors.sync(), 0)
+
+    def test_finds_related_entries(self):
+        related = self.diary.find_related("I'm stressed about the deadline my manager set", limit=2)
+        self.assertEqual(related[0]['content'], PAST_ENTRIES[1])
+        self.assertGreaterEqual(related[0]['score'], related[1]['score'])
+        excluded = self.diary.find_related("deadline with my manager", limit=2, exclude_ids=[related[0]['id']])
+        self.assertNotIn(related[0]['id'], [entry['id'] for entry in excluded])
+
+    def test_bulk_inserts_and_deletes_are_reflected(self):
+        self.diary.save_entries([(datetime.datetime(2023, 5, 1, 9), "Planted tomatoes in the garden.")])
+        planted = self.diary.find_related("gardening and tomatoes", limit=1)[0]
+        self.assertEqual(planted['content'], "Planted tomatoes in the garden.")
+        self.diary.delete_entry(planted['id'])
+        self.assertNotIn(planted['id'], [entry['id'] for entry in self.diary.find_related("tomatoes garden")])
+
+    def test_index_persists_and_rebuilds_for_another_embedder(self):
+        self.tenant.close()
+        reopened = VectorIndex(self.tmp.name, self.tenant.db_path, HashingEmbedder())
+        self.assertEqual(len(reopened), len(PAST_ENTRIES))
+        self.assertEqual(reopened.sync(), 0)
+        self.assertEqual(reopened.search("money budget", limit=1)[0][0], 4)
+        reopened.close()
+        rebuilt = VectorIndex(self.tmp.name, self.tenant.db_path, HashingEmbedder(dim=128))
+        self.assertEqual(len(rebuilt), 0)
+        self.assertEqual(rebuilt.sync(), len(PAST_ENTRIES))
+        rebuilt.close()
+
+    def test_many_entries_grow_the_mapped_files(self):
+        self.diary.save_entries([(datetime.datetime(2022, 1, 1) + datetime.timedelta(hours=index),
+                                  f"Routine note number {index}") for index in range(3000)])
+        self.assertEqual(self.diary.vectors.sync(), 3000)
+        self.assertEqual(self.diary.find_related("long run by the river", limit=1)[0]['content'], PAST_ENTRIES[0])
+
+
+class RejectingEmbeddings:
+    """
+    Embeddings endpoint that, like the real one, fails a whole batch with a
+    400 if any input is empty or too long.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.calls = 0
+
+    def create(self, model, input):
+        self.calls += 1
+        if any(not text or len(text) > self.limit or 'poison' in text for text in input):
+            error = ValueError("invalid input")
+            error.status_code = 400
+            raise error
+        data = [mock.Mock(embedding=[float(len(text)), 1.0, 0.0]) for text in input]
+        return mock.Mock(data=data)
+
+
+class TestClientEmbedder(unittest.TestCase):
+    def test_rejected_inputs_become_zero_vectors(self):
+        embeddings = RejectingEmbeddings(limit=50)
+        embedder = ClientEmbedder(mock.Mock(embeddings=embeddings), 'test-model', max_chars=50)
+        matrix = embedder.embed(["fine", "", "x" * 500, "poison pill", "also fine"])
+        self.assertEqual(matrix.shape, (5, 3))
+        self.assertTrue(np.allclose(np.linalg.norm(matrix, axis=1), [1, 0, 1, 0, 1]))
+
+    def test_sync_moves_past_a_rejected_entry(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            diary = DiaryEntry(tmp)
+            diary.index_vectors = False
+            for text in ("first", "poison entry", "   ", "last"):
+                diary.save_entry(text)
+            embedder = ClientEmbedder(mock.Mock(embeddings=RejectingEmbeddings(limit=1000)), 'test-model')
+            index = VectorIndex(tmp, diary.db_path, embedder)
+            self.assertEqual(index.sync(), 4)
+            diary.save_entry("later")
+            self.assertEqual(index.sync(), 1)
+            index.close()
+            Tenant(tmp).close()
+
+    def test_transient_errors_propagate(self):
+        client = mock.Mock()
+        client.embeddings.create.side_effect = ConnectionError("offline")
+        with self.assertRaises(ConnectionError):
+            ClientEmbedder(client, 'test-model').embed(["hello"])
+
+
+class TestChatRetrieval(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.llm = LocalLLMServer(seed=1).start()
+        self.config_patch = mock.patch.dict(get_config(), {
+            'llm_backend': 'local', 'llm_base_url': self.llm.url, 'llm_cache_enabled': False,
+            'retrieval_top_k': 2, 'retrieval_max_chars': 60})
+        self.config_patch.start()
+        DiaryEntry(self.tmp.name).save_entries(
+            [(datetime.datetime(2023, 1, 1 + index), text) for index, text in enumerate(PAST_ENTRIES)])
+        self.chatbot = ChatBot(self.tmp.name)
+
+    def tearDown(self):
+        self.chatbot.close()
+        Tenant(self.tmp.name).close()
+        self.config_patch.stop()
+        self.llm.stop()
+        self.tmp.cleanup()
+
+    def system_prompt(self, message, retrieval):
+        messages, _ = self.chatbot.build_messages(message, self.chatbot.conversation, retrieval)
+        return messages[0]['content']
+
+    def test_related_entries_are_added_under_the_size_cap(self):
+        prompt = self.system_prompt("Another tense meeting with my manager", True)
+        self.assertIn("Related past entries:\n- (2023-01-02) Tense meeting with my manag...", prompt)
+        section = prompt.split("Related past entries:\n")[1].split("\n\n")[0]
+        self.assertLessEqual(len(section.splitlines()), 2)
+        self.assertTrue(all(len(line) <= 30 + len("- (2023-01-02) ") for line in section.splitlines()))
+        self.assertNotIn("Related past entries", self.system_prompt("Another tense meeting", False))
+
+    def test_cancelled_stream_is_not_reported_as_an_error(self):
+        def on_token(token):
+            raise TurnCancelled("stopped")
+
+        with self.assertRaises(TurnCancelled):
+            self.chatbot.get_response("How was my week?", on_token=on_token)
+
+
+if __name__ == '__main__':
+    unittest.main()